@@ -19,11 +19,13 @@ from .alexa_utils import get_utc_timestamp
 
 class AlexaDiscoverResponse:
 
-    def __init__(self, request):
+    def __init__(self, request, validation=None):
         self.message_id = str(uuid.uuid4())
         self.name = 'Discover.Response'
         self.payload_version = request["directive"]["header"]["payloadVersion"]
         self.endpoints = []
+        # Optionally validates each endpoint as it is added, see add_endpoint
+        self.validation = validation
 
     def add_endpoint(self, thing):
         # Translate the AWS IoT Thing attributes
@@ -31,7 +33,11 @@ class AlexaDiscoverResponse:
         # HACK Using the thing name as the friendly name!
         friendly_name_value = thing['thingName'].replace('_', ' ')
         # NOTE SWITCH is currently hardcoded into the endpoint
-        self.endpoints.append(self.create_endpoint(endpoint_id=endpoint_id_value, friendly_name=friendly_name_value, display_categories=['SWITCH']))
+        endpoint = self.create_endpoint(endpoint_id=endpoint_id_value, friendly_name=friendly_name_value, display_categories=['SWITCH'])
+        # Validating each endpoint as it is added surfaces errors before the whole response is built
+        if self.validation is not None:
+            self.validation.add_endpoint(endpoint)
+        self.endpoints.append(endpoint)
 
     def create_capability(self, **kwargs):
         capability = {}
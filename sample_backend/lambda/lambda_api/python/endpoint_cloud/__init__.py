@@ -3,3 +3,4 @@ from .api_handler import ApiHandler
 from .api_response import ApiResponse
 from .api_response_body import ApiResponseBody
 from .api_utils import ApiUtils
+from .api_validation import ApiDiscoveryValidation, ApiValidation, ApiValidationPolicy
@@ -16,10 +16,11 @@ import json
 import boto3
 from botocore.exceptions import ClientError
 from datetime import datetime, timedelta
-from jsonschema import validate, SchemaError, ValidationError
+from jsonschema import SchemaError, ValidationError
 
 from alexa.skills.smarthome import AlexaAcceptGrantResponse, AlexaChangeReport, AlexaDiscoverResponse, AlexaError, AlexaPowerController, AlexaResponse
 from .api_auth import ApiAuth
+from .api_validation import ApiValidation
 
 dynamodb_aws = boto3.client('dynamodb')
 iot_aws = boto3.client('iot')
@@ -37,6 +38,8 @@ class _Directive:
         print('LOG api.ApiHandler.directive.process.request:', request)
 
         response = None
+        # Set when the response was validated as it was built, see Alexa.Discovery
+        validation = None
         # Only process if there is an actual body to process otherwise return an ErrorResponse
         json_body = request['body']
         if json_body:
@@ -121,14 +124,20 @@ class _Directive:
                     user_id = response_user_id['user_id']
                     print('LOG api.ApiHandler.directive.process.discovery.user_id:', user_id)
 
-                alexa_discover_response = AlexaDiscoverResponse(json_object)
+                # Validate the endpoints as they are added, rather than the whole response once it is built
+                discovery_validation = ApiValidation.get_discovery_validation()
+                alexa_discover_response = AlexaDiscoverResponse(json_object, validation=discovery_validation)
 
                 # Get the list of endpoints to return for a User ID and add them to the response
                 list_response = iot_aws.list_things(attributeName='user_id', attributeValue=user_id)
-                for thing in list_response['things']:
-                    alexa_discover_response.add_endpoint(thing)
-
-                response = alexa_discover_response.get_response()
+                try:
+                    for thing in list_response['things']:
+                        alexa_discover_response.add_endpoint(thing)
+                    response = alexa_discover_response.get_response()
+                    validation = discovery_validation
+                except ValidationError as ve:
+                    print('LOG api.ApiHandler.directive.process.discovery: Invalid endpoint', ve.message)
+                    response = AlexaError(message='Failed to validate message against the schema').get_response()
 
             if namespace == "Alexa.PowerController":
                 value = json_object['directive']['header']['name']
@@ -170,18 +179,19 @@ class _Directive:
             response = AlexaError(message='No response processed').get_response()
         else:
             # Validate the Response
-            if not self.validate_response(response):
+            if not self.validate_response(response, validation):
                 response = AlexaError(message='Failed to validate message against the schema').get_response()
 
         print('LOG api.ApiHandler.directive.response', response)
-        return json.dumps(response)
+        return response
 
-    def validate_response(self, response):
+    def validate_response(self, response, validation=None):
         valid = False
         try:
-            with open('alexa_smart_home_message_schema.json', 'r') as schema_file:
-                json_schema = json.load(schema_file)
-                validate(response, json_schema)
+            if validation is None:
+                ApiValidation.validate(response)
+            else:
+                validation.validate(response)
             valid = True
         except SchemaError as se:
             print('LOG validate_response: Invalid Schema')
@@ -0,0 +1,250 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2017 Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Amazon Software License (the "License"). You may not use this file except in
+# compliance with the License. A copy of the License is located at
+#
+#    http://aws.amazon.com/asl/
+#
+# or in the "license" file accompanying this file. This file is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, express or implied. See the License for the specific
+# language governing permissions and limitations under the License.
+
+import json
+import os
+import threading
+from collections import Counter, defaultdict
+
+from jsonschema.compiler import compile_schema, find_discriminator
+from jsonschema.exceptions import ValidationError
+from jsonschema.streaming import ArrayStream
+from jsonschema.validators import validator_for
+
+
+class ApiValidationPolicy:
+    """
+    Decide which responses get validated against the Alexa Smart Home message schema
+    :param mode: 'always', 'sampled' or 'off'
+    :param rate: When sampling, validate one in every rate messages of each message type, starting with the first
+    :param rates: A dict of message types, either (namespace, name) or just a name, to their own rate, 0 skips them
+    """
+    ALWAYS = 'always'
+    SAMPLED = 'sampled'
+    OFF = 'off'
+
+    def __init__(self, mode=ALWAYS, rate=1, rates=None):
+        if mode not in (self.ALWAYS, self.SAMPLED, self.OFF):
+            raise ValueError('Unknown validation mode: {0}'.format(mode))
+        self.mode = mode
+        self.rate = rate
+        self.rates = dict(rates or {})
+        self._seen = Counter()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_environment(cls, environ=os.environ):
+        """
+        Build the policy from the validation_mode, validation_sample_rate and validation_rates Environment Variables
+
+        validation_rates holds the rates of particular message types, as comma-separated name=rate or
+        namespace:name=rate entries, e.g. 'Discover.Response=10,Alexa:ErrorResponse=1'. Invalid values are logged
+        and replaced by the defaults, validating every response, instead of failing the container's initialization.
+        :return: ApiValidationPolicy
+        """
+        mode = environ.get('validation_mode', cls.ALWAYS)
+        if mode not in (cls.ALWAYS, cls.SAMPLED, cls.OFF):
+            print('WARN api.ApiValidationPolicy.from_environment: Unknown validation_mode', mode, 'using', cls.ALWAYS)
+            mode = cls.ALWAYS
+
+        try:
+            rate = int(environ.get('validation_sample_rate', 1))
+        except ValueError:
+            print('WARN api.ApiValidationPolicy.from_environment: Invalid validation_sample_rate',
+                  environ['validation_sample_rate'], 'using 1')
+            rate = 1
+
+        rates = {}
+        for entry in environ.get('validation_rates', '').split(','):
+            if not entry.strip():
+                continue
+            message_type, _, value = entry.partition('=')
+            namespace, _, name = message_type.strip().rpartition(':')
+            try:
+                rates[(namespace, name) if namespace else name] = int(value)
+            except ValueError:
+                print('WARN api.ApiValidationPolicy.from_environment: Ignoring invalid validation_rates entry', entry)
+        return cls(mode=mode, rate=rate, rates=rates)
+
+    def should_validate(self, message_type):
+        if self.mode == self.ALWAYS:
+            return True
+        if self.mode == self.OFF:
+            return False
+
+        rate = self.rates.get(message_type)
+        if rate is None:
+            rate = self.rates.get(message_type[1], self.rate)
+        if rate <= 0:
+            return False
+        with self._lock:
+            seen = self._seen[message_type]
+            self._seen[message_type] += 1
+        return seen % rate == 0
+
+
+class ApiValidation:
+    """
+    Validates responses against the Alexa Smart Home message schema under an ApiValidationPolicy
+
+    The schema is loaded, checked and compiled once per container, and the counts of validated, skipped and
+    failed messages are kept per message type for the life of the container.
+    """
+    schema_path = 'alexa_smart_home_message_schema.json'
+    policy = ApiValidationPolicy.from_environment()
+
+    discovery_message_type = ('Alexa.Discovery', 'Discover.Response')
+    discovery_endpoints_path = ('event', 'payload', 'endpoints')
+
+    _validator = None
+    _discovery_stream = None
+    _stats = defaultdict(Counter)
+    _stats_lock = threading.Lock()
+
+    @classmethod
+    def get_validator(cls):
+        """
+        The compiled validator for the message schema, loaded on first use
+        :return: CompiledValidator
+        """
+        validator = cls._validator
+        if validator is None:
+            with open(cls.schema_path, 'r') as schema_file:
+                schema = json.load(schema_file)
+            validator_class = validator_for(schema)
+            validator_class.check_schema(schema)
+            validator = cls._validator = compile_schema(schema, validator_class)
+        return validator
+
+    @classmethod
+    def get_discovery_validation(cls):
+        """
+        Start validating a Discover.Response whose endpoints are added one at a time, if the policy selects it
+        :return: ApiDiscoveryValidation
+        """
+        message_type = cls.discovery_message_type
+        if not cls.policy.should_validate(message_type):
+            cls._count(message_type, 'skipped')
+            return ApiDiscoveryValidation(None)
+
+        cls._count(message_type, 'validated')
+        stream = cls._discovery_stream
+        if stream is None:
+            stream = cls._discovery_stream = cls._create_discovery_stream()
+        elif stream:
+            stream.reset()
+        return ApiDiscoveryValidation(stream)
+
+    @classmethod
+    def _create_discovery_stream(cls):
+        """
+        An ArrayStream for the endpoints of the schema's Discover.Response message, or False if the schema has no
+        message that only Discover.Response messages can match
+        """
+        validator = cls.get_validator()
+        messages = validator.schema.get('oneOf', [])
+        discriminator = find_discriminator(validator.validator, messages)
+        if discriminator is None:
+            return False
+
+        path, values, unconstrained = discriminator
+        indices = values.get(cls.discovery_message_type[1], [])
+        if path != ('event', 'header', 'name') or unconstrained or len(indices) != 1:
+            return False
+        try:
+            return ArrayStream(validator, cls.discovery_endpoints_path, schema=messages[indices[0]],
+                               schema_path=('oneOf', indices[0]))
+        except ValueError:
+            return False
+
+    @staticmethod
+    def get_message_type(message):
+        """
+        The namespace and name of a message's event header
+        :return: tuple (namespace, name), or (None, None) if the message has no event header
+        """
+        try:
+            header = message['event']['header']
+            return header['namespace'], header['name']
+        except (KeyError, TypeError):
+            return None, None
+
+    @classmethod
+    def validate(cls, response):
+        """
+        Validate the response if the policy selects it, raising a ValidationError if it is invalid
+        :return: boolean Whether the response was validated
+        """
+        message_type = cls.get_message_type(response)
+        if not cls.policy.should_validate(message_type):
+            cls._count(message_type, 'skipped')
+            return False
+
+        cls._count(message_type, 'validated')
+        try:
+            cls.get_validator().validate(response)
+        except ValidationError:
+            cls._count(message_type, 'failed')
+            raise
+        return True
+
+    @classmethod
+    def get_stats(cls):
+        """
+        The validated, skipped and failed counts per message type, failed messages are also counted as validated
+        :return: dict
+        """
+        with cls._stats_lock:
+            return dict((message_type, dict(counts)) for message_type, counts in cls._stats.items())
+
+    @classmethod
+    def _count(cls, message_type, outcome):
+        with cls._stats_lock:
+            cls._stats[message_type][outcome] += 1
+
+
+class ApiDiscoveryValidation:
+    """
+    Validates a Discover.Response one endpoint at a time as it is built, then its envelope once it is complete
+    :param stream: The ArrayStream for the endpoints, False to validate the complete response as a whole, or None if
+    the policy skips this response
+    """
+    def __init__(self, stream):
+        self.stream = stream
+
+    def add_endpoint(self, endpoint):
+        """
+        Validate the next endpoint of the response, raising a ValidationError if it is invalid
+        """
+        if self.stream:
+            self._checked(self.stream.append, endpoint)
+
+    def validate(self, response):
+        """
+        Validate the complete response, raising a ValidationError if it is invalid
+        :return: boolean Whether the response was validated
+        """
+        if self.stream is None:
+            return False
+        if self.stream:
+            self._checked(self.stream.finish, response)
+        else:
+            self._checked(ApiValidation.get_validator().validate, response)
+        return True
+
+    def _checked(self, validate, instance):
+        try:
+            validate(instance)
+        except ValidationError:
+            ApiValidation._count(ApiValidation.discovery_message_type, 'failed')
+            raise
@@ -69,12 +69,11 @@ def handler(request, context):
         if http_method == 'POST' and resource == '/directives':
             response = api_handler.directive.process(request, env_client_id, env_client_secret, get_api_url(env_api_id, env_aws_default_region, 'auth-redirect'))
             print('LOG api.index.handler.request.api_handler.directive.process.response:', response)
-            response_name = json.loads(response)
-            if response_name['event']['header']['name'] == 'ErrorResponse':
+            if response['event']['header']['name'] == 'ErrorResponse':
                 api_response.statusCode = 500
             else:
                 api_response.statusCode = 200
-            api_response.body = response
+            api_response.body = json.dumps(response)
 
         # POST to endpoints : Create an Endpoint
         if http_method == 'POST' and resource == '/endpoints':
@@ -1,9 +1,24 @@
+from collections import OrderedDict, namedtuple
 import itertools
 import json
+import numbers
 import pkgutil
 import re
+import threading
 
-from jsonschema.compat import str_types, MutableMapping, urlsplit
+from jsonschema.compat import (
+    iteritems, lru_cache, str_types, MutableMapping, urlsplit,
+)
+
+
+#: Compile (and cache) the regular expressions of ``pattern`` and
+#: ``patternProperties``. Being an :func:`functools.lru_cache`, its
+#: ``cache_info()`` shows whether patterns are being recompiled.
+compile_pattern = lru_cache(1024)(re.compile)
+
+#: The most subschemas for which lookups are kept in each index (see
+#: :func:`remember`)
+INDEX_SIZE = 4096
 
 
 class URIDict(MutableMapping):
@@ -38,6 +53,63 @@ class URIDict(MutableMapping):
         return repr(self.store)
 
 
+CacheInfo = namedtuple("CacheInfo", ["hits", "misses", "maxsize", "currsize"])
+
+
+class LRUCache(object):
+    """
+    A thread-safe mapping which evicts its least recently used entries.
+
+    Arguments:
+
+        maxsize (int):
+
+            the number of entries to keep
+
+    """
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self.hits = self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            try:
+                value = self._entries.pop(key)
+            except KeyError:
+                self.misses += 1
+                return default
+            self.hits += 1
+            self._entries[key] = value
+            return value
+
+    def __setitem__(self, key, value):
+        with self._lock:
+            if key in self._entries:
+                del self._entries[key]
+            elif len(self._entries) >= self.maxsize:
+                self._entries.popitem(last=False)
+            self._entries[key] = value
+
+    def __len__(self):
+        return len(self._entries)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+
+    def info(self):
+        """
+        Return the cache's statistics, as ``lru_cache().cache_info()`` does.
+
+        """
+
+        return CacheInfo(self.hits, self.misses, self.maxsize, len(self))
+
+
 class Unset(object):
     """
     An as-of-yet unset attribute or unprovided default parameter.
@@ -101,11 +173,253 @@ def find_additional_properties(instance, schema):
     patterns = "|".join(schema.get("patternProperties", {}))
     for property in instance:
         if property not in properties:
-            if patterns and re.search(patterns, property):
+            if patterns and compile_pattern(patterns).search(property):
                 continue
             yield property
 
 
+def additional_properties(index, instance, schema):
+    """
+    Return a list of the additional properties of ``instance``, in order.
+
+    The properties allowed by ``schema`` are worked out the first time it is
+    used and kept in ``index`` (if provided), so that they are then checked
+    with a single set operation in the common case of there being none.
+    Otherwise, or if ``schema`` has invalid ``patternProperties`` (whose
+    error then surfaces as it would without the index), this falls back on
+    :func:`find_additional_properties`.
+
+    """
+
+    plan = None if index is None else index.get(id(schema))
+    if plan is None or plan[0] is not schema:
+        if index is None:
+            return list(find_additional_properties(instance, schema))
+        plan = remember(index, schema, _plan_additional_properties(schema))
+
+    _, allowed, search = plan
+    if allowed is None:
+        return list(find_additional_properties(instance, schema))
+    elif allowed.issuperset(instance):
+        return []
+    elif search is None:
+        return [property for property in instance if property not in allowed]
+    return [
+        property for property in instance
+        if property not in allowed and not search(property)
+    ]
+
+
+def _plan_additional_properties(schema):
+    patterns = schema.get(u"patternProperties", {})
+    try:
+        allowed = frozenset(schema.get(u"properties", {}))
+        search = compile_pattern(u"|".join(patterns)).search
+    except (re.error, TypeError):
+        return None, None
+    return allowed, search if patterns else None
+
+
+def enum_contains(index, enums, instance):
+    """
+    Check whether ``instance`` is one of ``enums``, as ``instance in enums``.
+
+    A hash-based lookup for ``enums`` is built the first time it is used and
+    kept in ``index`` (if provided), and otherwise this falls back on
+    scanning it.
+
+    """
+
+    indexed = None if index is None else index.get(id(enums))
+    if indexed is None or indexed[0] is not enums:
+        if index is None or not isinstance(enums, list):
+            return instance in enums
+        indexed = remember(index, enums, _index_enum(enums))
+
+    _, hashable, unhashable = indexed
+    try:
+        if instance in hashable:
+            return True
+    except TypeError:
+        pass
+    return bool(unhashable) and instance in unhashable
+
+
+def _index_enum(enums):
+    hashable, unhashable = set(), []
+    for each in enums:
+        try:
+            hashable.add(each)
+        except TypeError:
+            unhashable.append(each)
+    return frozenset(hashable), unhashable
+
+
+def remember(index, node, entry):
+    """
+    Keep ``entry`` for the (sub)schema ``node`` in ``index``.
+
+    Entries are keyed by ``id(node)`` and keep ``node`` itself as their
+    first item, so that its ``id()`` cannot be reused while the entry is
+    alive, nor mistaken for another node's. At most :data:`INDEX_SIZE`
+    entries are kept, so that schemas built on the fly (rather than found
+    within a validator's schema) cannot grow ``index`` without bound.
+
+    Returns:
+
+        tuple: the kept entry, ``node`` followed by the items of ``entry``
+
+    """
+
+    entry = (node,) + tuple(entry)
+    if len(index) < INDEX_SIZE:
+        index[id(node)] = entry
+    return entry
+
+
+def freeze(instance, keys=None):
+    """
+    Return a hashable key which is equal only for structurally equal instances.
+
+    Unlike ``==``, the key tells apart values of different types (``True``
+    and ``1``, or ``1`` and ``1.0``), since they may validate differently.
+
+    Arguments:
+
+        keys (dict):
+
+            if provided, the keys of the objects and arrays within
+            ``instance`` are looked up in (and added to) it by their
+            ``id()``, so that each is only frozen once however many of its
+            ancestors are frozen too. It must not outlive any change to them.
+
+    Raises:
+
+        TypeError: if ``instance`` contains something unhashable which is
+        neither a dict nor a list
+
+    """
+
+    if isinstance(instance, str_types):
+        return instance
+    elif not isinstance(instance, (dict, list, tuple)):
+        hash(instance)
+        return type(instance), instance
+
+    if keys is not None:
+        kept = keys.get(id(instance))
+        if kept is not None and kept[0] is instance:
+            return kept[1]
+
+    if isinstance(instance, dict):
+        frozen = dict, frozenset(
+            (key, freeze(value, keys)) for key, value in iteritems(instance)
+        )
+    else:
+        frozen = type(instance), tuple(freeze(each, keys) for each in instance)
+
+    if keys is not None:
+        keys[id(instance)] = instance, frozen
+    return frozen
+
+
+def uniq_key(instance, nested=False):
+    """
+    Return a hashable key which is equal exactly when ``uniq`` finds two
+    instances to be duplicates.
+
+    That is, as for ``==``, except that at the top level (as for ``unbool``)
+    ``True`` and ``False`` are told apart from ``1`` and ``0``.
+
+    Raises:
+
+        TypeError: if ``instance`` contains something unhashable which is
+        neither a dict nor a list
+
+    """
+
+    if isinstance(instance, str_types):
+        return instance
+    elif isinstance(instance, dict):
+        return dict, frozenset(
+            (key, uniq_key(value, nested=True))
+            for key, value in iteritems(instance)
+        )
+    elif isinstance(instance, list):
+        return list, tuple(uniq_key(each, nested=True) for each in instance)
+    elif isinstance(instance, tuple):
+        return tuple, tuple(uniq_key(each, nested=True) for each in instance)
+    elif isinstance(instance, bool) and not nested:
+        return bool, instance
+    hash(instance)
+    return instance
+
+
+def _shallow_uniq_key(instance):
+    """
+    Return a cheap hashable key which is equal whenever ``uniq_key`` is.
+
+    Only the values of dicts which are not themselves dicts or lists are
+    looked at, and only the length of lists, so instances with equal keys
+    may still be different.
+
+    """
+
+    if isinstance(instance, dict):
+        return dict, frozenset(
+            item for item in iteritems(instance)
+            if not isinstance(item[1], (dict, list, tuple))
+        )
+    elif isinstance(instance, list):
+        return list, len(instance)
+    elif isinstance(instance, tuple):
+        return tuple, len(instance)
+    return uniq_key(instance)
+
+
+class Distinct(object):
+    """
+    Tell whether each of a sequence of instances is a duplicate of an earlier
+    one, as for ``uniq``, in time linear in their size.
+
+    Instances are bucketed by :func:`_shallow_uniq_key`, and their (more
+    expensive) :func:`uniq_key` is only computed for buckets holding more
+    than one, so that e.g. objects with distinct ids are never fully hashed.
+
+    """
+
+    def __init__(self):
+        self._first = {}
+        self._keys = {}
+
+    def add(self, instance):
+        """
+        Record ``instance``, returning whether it was not seen before.
+
+        Raises:
+
+            TypeError: if ``instance`` contains something unhashable which is
+            neither a dict nor a list
+
+        """
+
+        shallow = _shallow_uniq_key(instance)
+        keys = self._keys.get(shallow)
+        if keys is None:
+            if shallow not in self._first:
+                self._first[shallow] = instance
+                return True
+            keys = self._keys[shallow] = set(
+                [uniq_key(self._first.pop(shallow))],
+            )
+
+        key = uniq_key(instance)
+        if key in keys:
+            return False
+        keys.add(key)
+        return True
+
+
 def extras_msg(extras):
     """
     Create an error message for extra items or properties.
@@ -162,6 +476,27 @@ def flatten(suitable_for_isinstance):
     return tuple(types)
 
 
+def type_checks(types):
+    """
+    Precompute how to check instances against each of ``types``.
+
+    Returns a mapping from each type name to a flattened tuple of its Python
+    types, and whether booleans must be rejected despite passing an
+    ``isinstance`` check for them (because ``bool`` inherits from ``int``, so
+    that they aren't reported as numbers unless ``bool`` is itself listed).
+
+    """
+
+    checks = {}
+    for name, pytypes in iteritems(types):
+        pytypes = flatten(pytypes)
+        reject_bool = bool not in pytypes and any(
+            issubclass(pytype, numbers.Number) for pytype in pytypes
+        )
+        checks[name] = pytypes, reject_bool
+    return checks
+
+
 def ensure_list(thing):
     """
     Wrap ``thing`` in a list if it's a single str.
@@ -193,13 +528,20 @@ def uniq(container):
     Check if all of a container's elements are unique.
 
     Successively tries first to rely that the elements are hashable, then
-    falls back on them being sortable, and finally falls back on brute
-    force.
+    on them being JSON (so that they can be keyed structurally, see
+    :class:`Distinct`), then falls back on them being sortable, and finally
+    falls back on brute force.
 
     """
 
     try:
         return len(set(unbool(i) for i in container)) == len(container)
+    except TypeError:
+        pass
+
+    try:
+        distinct = Distinct()
+        return all(distinct.add(each) for each in container)
     except TypeError:
         try:
             sort = sorted(unbool(i) for i in container)
@@ -1,7 +1,5 @@
-import re
-
 from jsonschema import _utils
-from jsonschema.exceptions import FormatError, ValidationError
+from jsonschema.exceptions import FormatError, ValidationError, _LazyMessage
 from jsonschema.compat import iteritems
 
 
@@ -10,8 +8,9 @@ def patternProperties(validator, patternProperties, instance, schema):
         return
 
     for pattern, subschema in iteritems(patternProperties):
+        search = _utils.compile_pattern(pattern).search
         for k, v in iteritems(instance):
-            if re.search(pattern, k):
+            if search(k):
                 for error in validator.descend(
                     v, subschema, path=k, schema_path=pattern,
                 ):
@@ -22,7 +21,8 @@ def additionalProperties(validator, aP, instance, schema):
     if not validator.is_type(instance, "object"):
         return
 
-    extras = set(_utils.find_additional_properties(instance, schema))
+    index = getattr(validator, "_additional_properties", None)
+    extras = set(_utils.additional_properties(index, instance, schema))
 
     if validator.is_type(aP, "object"):
         for extra in extras:
@@ -95,7 +95,7 @@ def minimum(validator, minimum, instance, schema):
 
     if failed:
         yield ValidationError(
-            "%r is %s the minimum of %r" % (instance, cmp, minimum)
+            _LazyMessage("%r is %s the minimum of %r", instance, cmp, minimum)
         )
 
 
@@ -112,7 +112,7 @@ def maximum(validator, maximum, instance, schema):
 
     if failed:
         yield ValidationError(
-            "%r is %s the maximum of %r" % (instance, cmp, maximum)
+            _LazyMessage("%r is %s the maximum of %r", instance, cmp, maximum)
         )
 
 
@@ -127,17 +127,19 @@ def multipleOf(validator, dB, instance, schema):
         failed = instance % dB
 
     if failed:
-        yield ValidationError("%r is not a multiple of %r" % (instance, dB))
+        yield ValidationError(
+            _LazyMessage("%r is not a multiple of %r", instance, dB)
+        )
 
 
 def minItems(validator, mI, instance, schema):
     if validator.is_type(instance, "array") and len(instance) < mI:
-        yield ValidationError("%r is too short" % (instance,))
+        yield ValidationError(_LazyMessage("%r is too short", instance))
 
 
 def maxItems(validator, mI, instance, schema):
     if validator.is_type(instance, "array") and len(instance) > mI:
-        yield ValidationError("%r is too long" % (instance,))
+        yield ValidationError(_LazyMessage("%r is too long", instance))
 
 
 def uniqueItems(validator, uI, instance, schema):
@@ -146,15 +148,19 @@ def uniqueItems(validator, uI, instance, schema):
         validator.is_type(instance, "array") and
         not _utils.uniq(instance)
     ):
-        yield ValidationError("%r has non-unique elements" % (instance,))
+        yield ValidationError(
+            _LazyMessage("%r has non-unique elements", instance)
+        )
 
 
 def pattern(validator, patrn, instance, schema):
     if (
         validator.is_type(instance, "string") and
-        not re.search(patrn, instance)
+        not _utils.compile_pattern(patrn).search(instance)
     ):
-        yield ValidationError("%r does not match %r" % (instance, patrn))
+        yield ValidationError(
+            _LazyMessage("%r does not match %r", instance, patrn)
+        )
 
 
 def format(validator, format, instance, schema):
@@ -167,12 +173,12 @@ def format(validator, format, instance, schema):
 
 def minLength(validator, mL, instance, schema):
     if validator.is_type(instance, "string") and len(instance) < mL:
-        yield ValidationError("%r is too short" % (instance,))
+        yield ValidationError(_LazyMessage("%r is too short", instance))
 
 
 def maxLength(validator, mL, instance, schema):
     if validator.is_type(instance, "string") and len(instance) > mL:
-        yield ValidationError("%r is too long" % (instance,))
+        yield ValidationError(_LazyMessage("%r is too long", instance))
 
 
 def dependencies(validator, dependencies, instance, schema):
@@ -198,11 +204,21 @@ def dependencies(validator, dependencies, instance, schema):
 
 
 def enum(validator, enums, instance, schema):
-    if instance not in enums:
-        yield ValidationError("%r is not one of %r" % (instance, enums))
+    index = getattr(validator, "_enums", None)
+    if not _utils.enum_contains(index, enums, instance):
+        yield ValidationError(
+            _LazyMessage("%r is not one of %r", instance, enums)
+        )
 
 
 def ref(validator, ref, instance, schema):
+    bind = getattr(validator.resolver, "bind", None)
+    bound = None if bind is None else bind(schema)
+    if bound is not None:
+        for error in validator.descend(instance, bound):
+            yield error
+        return
+
     resolve = getattr(validator.resolver, "resolve", None)
     if resolve is None:
         with validator.resolver.resolving(ref) as resolved:
@@ -270,7 +286,7 @@ def disallow_draft3(validator, disallow, instance, schema):
     for disallowed in _utils.ensure_list(disallow):
         if validator.is_valid(instance, {"type": [disallowed]}):
             yield ValidationError(
-                "%r is disallowed for %r" % (disallowed, instance)
+                _LazyMessage("%r is disallowed for %r", disallowed, instance)
             )
 
 
@@ -288,7 +304,9 @@ def type_draft4(validator, types, instance, schema):
     types = _utils.ensure_list(types)
 
     if not any(validator.is_type(instance, type) for type in types):
-        yield ValidationError(_utils.types_msg(instance, types))
+        yield ValidationError(
+            _LazyMessage(_utils.types_msg, instance, types)
+        )
 
 
 def properties_draft4(validator, properties, instance, schema):
@@ -317,7 +335,7 @@ def required_draft4(validator, required, instance, schema):
 def minProperties_draft4(validator, mP, instance, schema):
     if validator.is_type(instance, "object") and len(instance) < mP:
         yield ValidationError(
-            "%r does not have enough properties" % (instance,)
+            _LazyMessage("%r does not have enough properties", instance)
         )
 
 
@@ -325,7 +343,9 @@ def maxProperties_draft4(validator, mP, instance, schema):
     if not validator.is_type(instance, "object"):
         return
     if validator.is_type(instance, "object") and len(instance) > mP:
-        yield ValidationError("%r has too many properties" % (instance,))
+        yield ValidationError(
+            _LazyMessage("%r has too many properties", instance)
+        )
 
 
 def allOf_draft4(validator, allOf, instance, schema):
@@ -336,44 +356,71 @@ def allOf_draft4(validator, allOf, instance, schema):
 
 def oneOf_draft4(validator, oneOf, instance, schema):
     subschemas = enumerate(oneOf)
-    all_errors = []
     for index, subschema in subschemas:
-        errs = list(validator.descend(instance, subschema, schema_path=index))
-        if not errs:
+        if validator.is_valid(instance, subschema):
             first_valid = subschema
             break
-        all_errors.extend(errs)
     else:
         yield ValidationError(
-            "%r is not valid under any of the given schemas" % (instance,),
-            context=all_errors,
+            _LazyMessage(
+                "%r is not valid under any of the given schemas", instance,
+            ),
+            context=_branch_errors(validator, oneOf, instance),
         )
 
     more_valid = [s for i, s in subschemas if validator.is_valid(instance, s)]
     if more_valid:
         more_valid.append(first_valid)
-        reprs = ", ".join(repr(schema) for schema in more_valid)
         yield ValidationError(
-            "%r is valid under each of %s" % (instance, reprs)
+            _LazyMessage(_valid_under_each_msg, instance, more_valid)
         )
 
 
 def anyOf_draft4(validator, anyOf, instance, schema):
-    all_errors = []
-    for index, subschema in enumerate(anyOf):
-        errs = list(validator.descend(instance, subschema, schema_path=index))
-        if not errs:
-            break
-        all_errors.extend(errs)
-    else:
+    if not any(validator.is_valid(instance, each) for each in anyOf):
         yield ValidationError(
-            "%r is not valid under any of the given schemas" % (instance,),
-            context=all_errors,
+            _LazyMessage(
+                "%r is not valid under any of the given schemas", instance,
+            ),
+            context=_branch_errors(validator, anyOf, instance),
         )
 
 
+def _valid_under_each_msg(instance, subschemas):
+    reprs = ", ".join(repr(schema) for schema in subschemas)
+    return "%r is valid under each of %s" % (instance, reprs)
+
+
+def _branch_errors(validator, subschemas, instance):
+    """
+    The errors of each of the (failing) subschemas, created only when read.
+
+    They may be read long after validation has moved on, so they are
+    collected within the resolution scope that is current now. Resolvers
+    which cannot re-enter a scope get their errors collected right away.
+
+    """
+
+    resolved_scope = getattr(validator.resolver, "_resolved_scope", None)
+    if resolved_scope is None:
+        return list(_descend_each(validator, subschemas, instance))
+    scope = validator.resolver.resolution_scope
+
+    def errors():
+        with resolved_scope(scope):
+            for error in _descend_each(validator, subschemas, instance):
+                yield error
+    return errors()
+
+
+def _descend_each(validator, subschemas, instance):
+    for index, subschema in enumerate(subschemas):
+        for error in validator.descend(instance, subschema, schema_path=index):
+            yield error
+
+
 def not_draft4(validator, not_schema, instance, schema):
     if validator.is_valid(instance, not_schema):
         yield ValidationError(
-            "%r is not allowed for %r" % (not_schema, instance)
+            _LazyMessage("%r is not allowed for %r", not_schema, instance)
         )
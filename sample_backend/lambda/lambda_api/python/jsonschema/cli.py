@@ -1,9 +1,13 @@
 from __future__ import absolute_import
+from timeit import default_timer
 import argparse
+import glob
 import json
+import os
 import sys
 
 from jsonschema._reflect import namedAny
+from jsonschema.batch import validate_many
 from jsonschema.validators import validator_for
 
 
@@ -18,6 +22,72 @@ def _json_file(path):
         return json.load(file)
 
 
+def _jobs(value):
+    jobs = int(value)
+    if jobs < 0:
+        raise argparse.ArgumentTypeError(
+            "%r is not a number of processes" % (value,),
+        )
+    return jobs
+
+
+class _Unloadable(object):
+    """
+    Stands in for an instance that could not be loaded, saying why.
+
+    """
+
+    def __init__(self, message):
+        self.message = message
+
+
+def _load(path):
+    try:
+        return _json_file(path)
+    except EnvironmentError as error:
+        return _Unloadable("%s: %s" % (path, error.strerror or error))
+    except ValueError as error:
+        return _Unloadable("%s: %s" % (path, error))
+
+
+def _json_files(directory):
+    for root, directories, files in os.walk(directory):
+        directories.sort()
+        for name in sorted(files):
+            if name.endswith(".json"):
+                yield _load(os.path.join(root, name))
+
+
+def _instances(paths, stdin=None):
+    """
+    Lazily load the instances found at each of ``paths``.
+
+    A path may be a file, a directory (whose ``.json`` files are loaded), a
+    glob pattern, or ``-`` for newline-delimited JSON on standard input.
+    Instances that cannot be read or parsed are yielded as ``_Unloadable``\\ s
+    naming their path (and line), so that the others are still validated.
+
+    """
+
+    for path in paths:
+        if path == "-":
+            for number, line in enumerate(stdin or sys.stdin, 1):
+                if not line.strip():
+                    continue
+                try:
+                    yield json.loads(line)
+                except ValueError as error:
+                    yield _Unloadable("<stdin>:%d: %s" % (number, error))
+            continue
+
+        for each in sorted(glob.glob(path)) or [path]:
+            if os.path.isdir(each):
+                for instance in _json_files(each):
+                    yield instance
+            else:
+                yield _load(each)
+
+
 parser = argparse.ArgumentParser(
     description="JSON Schema Validation CLI",
 )
@@ -25,12 +95,26 @@ parser.add_argument(
     "-i", "--instance",
     action="append",
     dest="instances",
-    type=_json_file,
     help=(
-        "a path to a JSON instance (i.e. filename.json)"
-        "to validate (may be specified multiple times)"
+        "a path to a JSON instance (i.e. filename.json) to validate, a "
+        "directory or glob of them, or - for newline-delimited JSON "
+        "instances on stdin (may be specified multiple times)"
+    ),
+)
+parser.add_argument(
+    "-j", "--jobs",
+    default=1,
+    type=_jobs,
+    help=(
+        "the number of processes to validate instances with (0 for one per "
+        "CPU). The validator must then be importable by the processes."
     ),
 )
+parser.add_argument(
+    "--summary",
+    action="store_true",
+    help="print the number of instances, throughput and latency to stdout",
+)
 parser.add_argument(
     "-F", "--error-format",
     default="{error.instance}: {error.message}\n",
@@ -60,6 +144,7 @@ def parse_args(args):
     arguments = vars(parser.parse_args(args=args or ["--help"]))
     if arguments["validator"] is None:
         arguments["validator"] = validator_for(arguments["schema"])
+    arguments["instances"] = _instances(arguments["instances"] or ())
     return arguments
 
 
@@ -73,9 +158,68 @@ def run(arguments, stdout=sys.stdout, stderr=sys.stderr):
 
     validator.check_schema(arguments["schema"])
 
-    errored = False
-    for instance in arguments["instances"] or ():
-        for error in validator.iter_errors(instance):
+    unloadable = []
+    instances = _loaded(arguments["instances"] or (), stderr, unloadable)
+    jobs = arguments.get("jobs", 1)
+    if jobs == 1:
+        results = _timed(validator, instances)
+    else:
+        results = validate_many(
+            instances,
+            arguments["schema"],
+            cls=arguments["validator"],
+            workers=jobs or None,
+            timed=True,
+        )
+
+    start = default_timer()
+    count = invalid = 0
+    latencies = []
+    for _, errors, latency in results:
+        count += 1
+        latencies.append(latency)
+        if errors:
+            invalid += 1
+        for error in errors:
             stderr.write(error_format.format(error=error))
-            errored = True
-    return errored
+
+    if arguments.get("summary"):
+        elapsed = default_timer() - start
+        _write_summary(
+            stdout, count, invalid, len(unloadable), elapsed, latencies,
+        )
+    return invalid > 0 or bool(unloadable)
+
+
+def _loaded(instances, stderr, unloadable):
+    for instance in instances:
+        if isinstance(instance, _Unloadable):
+            stderr.write(instance.message + "\n")
+            unloadable.append(instance)
+        else:
+            yield instance
+
+
+def _timed(validator, instances):
+    for index, instance in enumerate(instances):
+        start = default_timer()
+        errors = list(validator.iter_errors(instance))
+        yield index, errors, default_timer() - start
+
+
+def _write_summary(stdout, count, invalid, unloadable, elapsed, latencies):
+    rate = count / elapsed if elapsed else 0.0
+    stdout.write("%d instances (%d invalid" % (count, invalid))
+    if unloadable:
+        stdout.write(", %d unloadable" % (unloadable,))
+    stdout.write(
+        ") in %.3fs, %.1f instances/s" % (elapsed, rate),
+    )
+    if latencies:
+        mean = sum(latencies) / len(latencies)
+        stdout.write(
+            ", latency mean %.3fms max %.3fms" % (
+                mean * 1000, max(latencies) * 1000,
+            ),
+        )
+    stdout.write("\n")
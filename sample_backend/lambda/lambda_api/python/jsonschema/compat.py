@@ -9,6 +9,9 @@ except ImportError:
 
 PY3 = sys.version_info[0] >= 3
 
+# Whether json.loads takes bytes, telling UTF-8, -16 and -32 (and BOMs) apart
+JSON_LOADS_BYTES = sys.version_info >= (3, 6)
+
 if PY3:
     zip = zip
     from functools import lru_cache
@@ -0,0 +1,978 @@
+"""
+Ahead-of-time compilation of schemas into specialized Python functions.
+
+:class:`CompiledValidator` walks a schema once and generates one Python
+function per subschema, with every keyword the schema uses already inlined.
+Answering "is this instance valid?" then no longer interprets the schema
+dict, dispatches through ``VALIDATORS`` or creates error objects.
+
+Only the success path is compiled. When an instance turns out to be invalid,
+the errors are produced by the regular (interpreting) validator, so they are
+identical to the ones :meth:`IValidator.iter_errors` would produce.
+
+A compiled validator can be saved with :meth:`CompiledValidator.dump` and
+later loaded with :func:`load`, which skips walking the schema and compiling
+the generated source again (e.g. on the cold start of a new process).
+
+"""
+
+from __future__ import division
+
+import marshal
+import pickle
+import platform
+import re
+import sys
+
+from jsonschema import _utils, _validators
+from jsonschema._format import FormatChecker
+from jsonschema.compat import iteritems, str_types
+from jsonschema.exceptions import RefResolutionError
+from jsonschema.validators import validator_for
+
+
+_HEADER = "from __future__ import division\n"
+
+# Compiled code objects can only be loaded by the interpreter which made them
+_ARTIFACT_MAGIC = (
+    "jsonschema-compiled 1 %s-%d.%d\n" % (
+        (platform.python_implementation(),) + tuple(sys.version_info[:2])
+    )
+).encode("ascii")
+
+
+class CompiledValidator(object):
+    """
+    A validator whose schema has been compiled into Python functions.
+
+    It exposes the same ``validate`` / ``is_valid`` / ``iter_errors`` API as
+    the validator class it was compiled for.
+
+    Arguments:
+
+        schema (dict):
+
+            The schema to compile
+
+        cls (:class:`IValidator`):
+
+            The validator class whose semantics (keywords, types, meta
+            schema) the compiled functions follow. If not provided, it is
+            chosen from the schema's ``$schema`` like :func:`validate` does.
+
+    Any other provided positional and keyword arguments (``types``,
+    ``resolver``, ``format_checker``) are passed on when instantiating
+    ``cls``.
+
+    """
+
+    def __init__(self, schema, cls=None, *args, **kwargs):
+        if cls is None:
+            cls = validator_for(schema)
+        self.validator = cls(schema, *args, **kwargs)
+        compiler = _Compiler(self.validator)
+        self._check = compiler.compile(schema)
+        self._compiled = compiler.code, compiler.constants, compiler.recipes
+        self.source = compiler.source
+
+    def dump(self, file):
+        """
+        Save this validator to a file, to be loaded again by :func:`load`.
+
+        Arguments:
+
+            file:
+
+                A file opened for writing in binary mode
+
+        The schema, validator class and constants used by the compiled code
+        must be picklable.
+
+        """
+
+        code, constants, recipes = self._compiled
+        file.write(_ARTIFACT_MAGIC)
+        pickle.dump(
+            {
+                "cls": type(self.validator),
+                "schema": self.schema,
+                "root": self._check.__name__,
+                "code": marshal.dumps(code),
+                "source": self.source,
+                "constants": constants,
+                "recipes": recipes,
+            },
+            file,
+            protocol=2,
+        )
+
+    @property
+    def schema(self):
+        return self.validator.schema
+
+    @property
+    def resolver(self):
+        return self.validator.resolver
+
+    @property
+    def format_checker(self):
+        return self.validator.format_checker
+
+    def check_schema(self, schema):
+        self.validator.check_schema(schema)
+
+    def is_type(self, instance, type):
+        return self.validator.is_type(instance, type)
+
+    def is_valid(self, instance, _schema=None):
+        if _schema is not None:
+            return self.validator.is_valid(instance, _schema)
+        return self._check(instance)
+
+    def iter_errors(self, instance, _schema=None):
+        if _schema is None and self._check(instance):
+            return iter(())
+        return self.validator.iter_errors(instance, _schema)
+
+    def validate(self, *args, **kwargs):
+        for error in self.iter_errors(*args, **kwargs):
+            raise error
+
+
+def compile_schema(schema, cls=None, *args, **kwargs):
+    """
+    Compile ``schema`` and return a :class:`CompiledValidator` for it.
+
+    """
+
+    return CompiledValidator(schema, cls, *args, **kwargs)
+
+
+def load(file, *args, **kwargs):
+    """
+    Load a validator saved by :meth:`CompiledValidator.dump`.
+
+    Arguments:
+
+        file:
+
+            A file opened for reading in binary mode
+
+    Any other provided positional and keyword arguments are passed on when
+    instantiating the validator class, as for :class:`CompiledValidator`.
+    The schema is not checked again.
+
+    Returns:
+
+        :class:`CompiledValidator`
+
+    Raises:
+
+        :exc:`ValueError` if the file is not a saved validator, or was saved
+        by another version of Python, whose compiled code cannot be loaded
+
+    """
+
+    magic = file.readline()
+    if magic != _ARTIFACT_MAGIC:
+        raise ValueError(
+            "Not a compiled validator for this Python: %r" % (magic,),
+        )
+    artifact = pickle.load(file)
+
+    compiled = CompiledValidator.__new__(CompiledValidator)
+    compiled.validator = validator = artifact["cls"](
+        artifact["schema"], *args, **kwargs
+    )
+    code = marshal.loads(artifact["code"])
+    constants, recipes = artifact["constants"], artifact["recipes"]
+
+    namespace = _namespace()
+    namespace.update(constants)
+    for name, (kind, recipe_args) in iteritems(recipes):
+        namespace[name] = _RECIPES[kind](validator, *recipe_args)
+    exec(code, namespace)
+
+    compiled._check = namespace[artifact["root"]]
+    compiled._compiled = code, constants, recipes
+    compiled.source = artifact["source"]
+    return compiled
+
+
+def find_discriminator(validator, subschemas):
+    """
+    Find a property path whose value selects among ``subschemas``.
+
+    Looks for an ``enum`` reached only through ``properties`` (following
+    ``$ref``, ``allOf``, ``anyOf`` and ``oneOf``) in the subschemas, such as
+    the ``event.header.name`` of an Alexa message. An instance whose value
+    at that path is not allowed by a subschema can never be valid under it.
+
+    Arguments:
+
+        validator (:class:`IValidator`):
+
+            The validator whose keywords and resolver the subschemas use
+
+        subschemas (list):
+
+            The subschemas of an ``anyOf`` or ``oneOf``
+
+    Returns:
+
+        ``None`` if no path tells two subschemas apart, otherwise a tuple of
+        the path, a dict mapping each allowed value to the indices of the
+        subschemas allowing it, and the indices of the subschemas which do
+        not constrain the path.
+
+    """
+
+    if not all(
+        validator.VALIDATORS.get(keyword) is function
+        for keyword, function in iteritems(_DISCRIMINATING)
+    ):
+        return None
+
+    constraints = [
+        _enum_constraints(validator, subschema, set())
+        for subschema in subschemas
+    ]
+
+    best, best_score = None, None
+    for path in set(path for each in constraints for path in each):
+        values, unconstrained = {}, []
+        for index, each in enumerate(constraints):
+            if path not in each:
+                unconstrained.append(index)
+                continue
+            for value in each[path]:
+                values.setdefault(value, []).append(index)
+        worst = max(len(indices) for indices in values.values())
+        score = worst + len(unconstrained), len(unconstrained), len(path)
+        if best_score is None or score < best_score:
+            best, best_score = (path, values, unconstrained), score
+
+    if best is None or best_score[0] >= len(subschemas):
+        return None
+    return best
+
+
+def _enum_constraints(validator, schema, seen, depth=0):
+    """
+    Return a dict from property paths to the values ``schema`` allows there.
+
+    """
+
+    if not isinstance(schema, dict) or id(schema) in seen or depth > 8:
+        return {}
+
+    ref = schema.get(u"$ref")
+    if ref is not None:
+        resolve = getattr(validator.resolver, "resolve", None)
+        if resolve is None:
+            return {}
+        try:
+            url, resolved = resolve(ref)
+        except RefResolutionError:
+            return {}
+        seen.add(id(schema))
+        validator.resolver.push_scope(url)
+        try:
+            return _enum_constraints(validator, resolved, seen, depth)
+        finally:
+            validator.resolver.pop_scope()
+            seen.discard(id(schema))
+
+    if schema.get(u"id"):
+        # Refs below would need to be resolved in the new scope.
+        return {}
+
+    seen.add(id(schema))
+    try:
+        constraints = {}
+
+        def narrow(path, values):
+            if path in constraints:
+                values = constraints[path] & values
+            constraints[path] = values
+
+        enums = schema.get(u"enum")
+        if isinstance(enums, (list, tuple)):
+            hashable = []
+            for value in enums:
+                try:
+                    hash(value)
+                except TypeError:
+                    continue
+                hashable.append(value)
+            narrow((), frozenset(hashable))
+
+        properties = schema.get(u"properties")
+        if isinstance(properties, dict) and depth < 8:
+            for property, subschema in iteritems(properties):
+                found = _enum_constraints(
+                    validator, subschema, seen, depth + 1,
+                )
+                for path, values in iteritems(found):
+                    narrow((property,) + path, values)
+
+        for subschema in schema.get(u"allOf", ()):
+            found = _enum_constraints(validator, subschema, seen, depth)
+            for path, values in iteritems(found):
+                narrow(path, values)
+
+        for keyword in u"anyOf", u"oneOf":
+            branches = [
+                _enum_constraints(validator, subschema, seen, depth)
+                for subschema in schema.get(keyword, ())
+            ]
+            if not branches:
+                continue
+            for path in set.intersection(*(set(each) for each in branches)):
+                narrow(path, frozenset().union(*(b[path] for b in branches)))
+
+        return constraints
+    finally:
+        seen.discard(id(schema))
+
+
+_DISCRIMINATING = {
+    u"$ref": _validators.ref,
+    u"allOf": _validators.allOf_draft4,
+    u"anyOf": _validators.anyOf_draft4,
+    u"enum": _validators.enum,
+    u"oneOf": _validators.oneOf_draft4,
+    u"properties": _validators.properties_draft4,
+}
+
+
+class _Compiler(object):
+    """
+    Generate the source of, and then build, the functions for one schema.
+
+    Every function takes the instance as its only argument and returns
+    whether it is valid under its subschema.
+
+    """
+
+    def __init__(self, validator):
+        self.validator = validator
+        self.resolver = validator.resolver
+        self.namespace = _namespace()
+        self.constants = {}
+        self.recipes = {}
+        self.code = None
+        self.functions = {}
+        self.definitions = []
+        self._names = {}
+        self._schemas = []
+        self._base_scope = self._scope()
+
+    @property
+    def source(self):
+        return _HEADER + "\n".join(self.definitions)
+
+    def compile(self, schema):
+        name = self.function_for(schema)
+        self.code = compile(self.source, "<compiled schema>", "exec")
+        exec(self.code, self.namespace)
+        return self.namespace[name]
+
+    def constant(self, value, prefix="c"):
+        """
+        Bind ``value`` in the generated module and return its name.
+
+        """
+
+        key = prefix, id(value)
+        name = self._names.get(key)
+        if name is None:
+            name = self._names[key] = "%s%d" % (prefix, len(self._names))
+            self.namespace[name] = self.constants[name] = value
+        return name
+
+    def recipe(self, kind, *args, **kwargs):
+        """
+        Bind the value ``_RECIPES[kind]`` builds from ``args``, by name.
+
+        Unlike constants, these (e.g. closures over the validator) are not
+        saved by :meth:`CompiledValidator.dump` but built again on load.
+
+        """
+
+        prefix = kwargs.pop("prefix", "f")
+        key = (prefix, kind) + tuple(id(arg) for arg in args)
+        name = self._names.get(key)
+        if name is None:
+            name = self._names[key] = "%s%d" % (prefix, len(self._names))
+            self.namespace[name] = _RECIPES[kind](self.validator, *args)
+            self.recipes[name] = kind, args
+        return name
+
+    def function_for(self, schema):
+        """
+        Return the name of the function checking ``schema``.
+
+        Functions are generated once per (subschema, resolution scope), so
+        recursive and repeated references share a single function.
+
+        """
+
+        key = id(schema), self._scope()
+        name = self.functions.get(key)
+        if name is not None:
+            return name
+
+        name = self.functions[key] = "s%d" % (len(self.functions),)
+        self._schemas.append(schema)
+
+        if not isinstance(schema, dict):
+            body = ["if not %s(i): return False" % (self.fallback(schema),)]
+            self.definitions.append(_function(name, body))
+            return name
+
+        scope = schema.get(u"id")
+        if scope and self._can_scope():
+            self.resolver.push_scope(scope)
+        try:
+            body = _Body()
+            ref = schema.get(u"$ref")
+            if ref is not None:
+                keywords = [(u"$ref", ref)]
+            else:
+                keywords = iteritems(schema)
+            for keyword, value in keywords:
+                validator = self.validator.VALIDATORS.get(keyword)
+                if validator is None:
+                    continue
+                emit = _EMITTERS.get(validator)
+                if emit is None or not emit(self, body, value, schema):
+                    body.line(
+                        "if not %s(i): return False" % (
+                            self.fallback(schema, keyword),
+                        )
+                    )
+        finally:
+            if scope and self._can_scope():
+                self.resolver.pop_scope()
+
+        self.definitions.append(_function(name, body.lines()))
+        return name
+
+    def fallback(self, schema, keyword=None):
+        """
+        Delegate a keyword the compiler does not know to the interpreter.
+
+        """
+
+        scope = self._scope()
+        if scope == self._base_scope:
+            scope = None
+        return self.recipe("fallback", schema, keyword, scope, prefix="f")
+
+    def type_check(self, type, variable="i"):
+        """
+        Return an expression checking ``variable`` against a type name.
+
+        Returns ``None`` for types the validator does not know, which the
+        interpreter reports by raising :exc:`UnknownType`.
+
+        """
+
+        try:
+            pytypes, reject_bool = self.validator._type_checks[type]
+        except (KeyError, TypeError):
+            return None
+
+        name = self.constant(pytypes, prefix="t")
+        expression = "isinstance(%s, %s)" % (variable, name)
+        if reject_bool:
+            expression += " and not isinstance(%s, bool)" % (variable,)
+        return expression
+
+    def guard(self, body, type):
+        """
+        Open a block only entered when the instance is of the given type.
+
+        """
+
+        expression = self.type_check(type)
+        if expression is None:
+            return False
+        body.line("if %s:" % (expression,))
+        return True
+
+    def _scope(self):
+        return getattr(self.resolver, "resolution_scope", None)
+
+    def _can_scope(self):
+        return hasattr(self.resolver, "push_scope")
+
+
+class _Body(object):
+    def __init__(self):
+        self._lines = []
+        self.depth = 0
+
+    def line(self, line):
+        self._lines.append("    " * self.depth + line)
+
+    def lines(self):
+        return self._lines
+
+
+def _function(name, body):
+    lines = ["def %s(i):" % (name,)]
+    lines.extend("    " + line for line in body)
+    lines.append("    return True")
+    return "\n".join(lines) + "\n"
+
+
+def _subschemas_block(compiler, body, type, emit_inner):
+    if not compiler.guard(body, type):
+        return False
+    body.depth += 1
+    emit_inner()
+    body.line("pass")
+    body.depth -= 1
+    return True
+
+
+def _ref(compiler, body, ref, schema):
+    resolver = compiler.resolver
+    if getattr(resolver, "resolve", None) is None:
+        return False
+    try:
+        url, resolved = resolver.resolve(ref)
+    except RefResolutionError:
+        return False
+    resolver.push_scope(url)
+    try:
+        name = compiler.function_for(resolved)
+    finally:
+        resolver.pop_scope()
+    body.line("if not %s(i): return False" % (name,))
+    return True
+
+
+def _properties(compiler, body, properties, schema):
+    def inner():
+        for property, subschema in iteritems(properties):
+            key = compiler.constant(property, prefix="k")
+            name = compiler.function_for(subschema)
+            body.line(
+                "if %s in i and not %s(i[%s]): return False" % (key, name, key)
+            )
+    return _subschemas_block(compiler, body, "object", inner)
+
+
+def _required(compiler, body, required, schema):
+    def inner():
+        for property in required:
+            key = compiler.constant(property, prefix="k")
+            body.line("if %s not in i: return False" % (key,))
+    return _subschemas_block(compiler, body, "object", inner)
+
+
+def _additionalProperties(compiler, body, aP, schema):
+    properties = compiler.constant(
+        frozenset(schema.get("properties", {})), prefix="p",
+    )
+    patterns = "|".join(schema.get("patternProperties", {}))
+    if patterns:
+        try:
+            regex = compiler.constant(re.compile(patterns), prefix="r")
+        except re.error:
+            return False
+        extra = "k not in %s and not %s.search(k)" % (properties, regex)
+    else:
+        regex = None
+        extra = "k not in %s" % (properties,)
+
+    if compiler.validator.is_type(aP, "object"):
+        name = compiler.function_for(aP)
+
+        def inner():
+            body.line("for k in i:")
+            body.line(
+                "    if %s and not %s(i[k]): return False" % (extra, name)
+            )
+    elif not aP:
+        def inner():
+            if regex is None:
+                body.line("if not %s.issuperset(i): return False" % (
+                    properties,
+                ))
+            else:
+                body.line("for k in i:")
+                body.line("    if %s: return False" % (extra,))
+    else:
+        return True
+    return _subschemas_block(compiler, body, "object", inner)
+
+
+def _patternProperties(compiler, body, patternProperties, schema):
+    checks = []
+    for pattern, subschema in iteritems(patternProperties):
+        try:
+            regex = compiler.constant(re.compile(pattern), prefix="r")
+        except re.error:
+            return False
+        checks.append((regex, compiler.function_for(subschema)))
+
+    def inner():
+        for regex, name in checks:
+            body.line("for k, v in iteritems(i):")
+            body.line(
+                "    if %s.search(k) and not %s(v): return False" % (
+                    regex, name,
+                )
+            )
+    return _subschemas_block(compiler, body, "object", inner)
+
+
+def _items(compiler, body, items, schema):
+    if compiler.validator.is_type(items, "object"):
+        name = compiler.function_for(items)
+
+        def inner():
+            body.line("for v in i:")
+            body.line("    if not %s(v): return False" % (name,))
+    else:
+        names = [compiler.function_for(subschema) for subschema in items]
+
+        def inner():
+            body.line("n = len(i)")
+            for index, name in enumerate(names):
+                body.line(
+                    "if n > %d and not %s(i[%d]): return False" % (
+                        index, name, index,
+                    )
+                )
+    return _subschemas_block(compiler, body, "array", inner)
+
+
+def _additionalItems(compiler, body, aI, schema):
+    if compiler.validator.is_type(schema.get("items", {}), "object"):
+        return True
+
+    len_items = len(schema.get("items", []))
+    if compiler.validator.is_type(aI, "object"):
+        name = compiler.function_for(aI)
+
+        def inner():
+            body.line("for v in i[%d:]:" % (len_items,))
+            body.line("    if not %s(v): return False" % (name,))
+    elif not aI:
+        def inner():
+            body.line("if len(i) > %d: return False" % (len_items,))
+    else:
+        return True
+    return _subschemas_block(compiler, body, "array", inner)
+
+
+def _bound(operator, exclusive_operator, exclusive_keyword):
+    def emit(compiler, body, bound, schema):
+        if schema.get(exclusive_keyword, False):
+            comparison = exclusive_operator
+        else:
+            comparison = operator
+        limit = compiler.constant(bound)
+
+        def inner():
+            body.line("if i %s %s: return False" % (comparison, limit))
+        return _subschemas_block(compiler, body, "number", inner)
+    return emit
+
+
+def _multipleOf(compiler, body, dB, schema):
+    divisor = compiler.constant(dB)
+
+    def inner():
+        if isinstance(dB, float):
+            body.line("q = i / %s" % (divisor,))
+            body.line("if int(q) != q: return False")
+        else:
+            body.line("if i %% %s: return False" % (divisor,))
+    return _subschemas_block(compiler, body, "number", inner)
+
+
+def _length(type, operator):
+    def emit(compiler, body, length, schema):
+        limit = compiler.constant(length)
+
+        def inner():
+            body.line("if len(i) %s %s: return False" % (operator, limit))
+        return _subschemas_block(compiler, body, type, inner)
+    return emit
+
+
+def _uniqueItems(compiler, body, uI, schema):
+    if not uI:
+        return True
+
+    def inner():
+        body.line("if not uniq(i): return False")
+    return _subschemas_block(compiler, body, "array", inner)
+
+
+def _pattern(compiler, body, patrn, schema):
+    try:
+        regex = compiler.constant(re.compile(patrn), prefix="r")
+    except re.error:
+        return False
+
+    def inner():
+        body.line("if not %s.search(i): return False" % (regex,))
+    return _subschemas_block(compiler, body, "string", inner)
+
+
+def _format(compiler, body, format, schema):
+    format_checker = compiler.validator.format_checker
+    if format_checker is None:
+        return True
+    checker = compiler.recipe("format_checker", prefix="c")
+    body.line("if not %s.conforms(i, %s): return False" % (
+        checker, compiler.constant(format),
+    ))
+    return True
+
+
+def _dependencies(compiler, body, dependencies, schema):
+    checks = []
+    for property, dependency in iteritems(dependencies):
+        key = compiler.constant(property, prefix="k")
+        if compiler.validator.is_type(dependency, "object"):
+            checks.append(
+                "if %s in i and not %s(i): return False" % (
+                    key, compiler.function_for(dependency),
+                )
+            )
+        else:
+            for each in _utils.ensure_list(dependency):
+                checks.append(
+                    "if %s in i and %s not in i: return False" % (
+                        key, compiler.constant(each, prefix="k"),
+                    )
+                )
+
+    def inner():
+        for check in checks:
+            body.line(check)
+    return _subschemas_block(compiler, body, "object", inner)
+
+
+def _enum(compiler, body, enums, schema):
+    if not isinstance(enums, (list, tuple)):
+        return False
+
+    hashable, unhashable = [], []
+    for each in enums:
+        try:
+            hash(each)
+        except TypeError:
+            unhashable.append(each)
+        else:
+            hashable.append(each)
+    members = compiler.constant(frozenset(hashable), prefix="e")
+
+    body.line("try:")
+    if unhashable:
+        others = compiler.constant(unhashable, prefix="e")
+        body.line("    if i not in %s and i not in %s: return False" % (
+            members, others,
+        ))
+        body.line("except TypeError:")
+        body.line("    if i not in %s: return False" % (others,))
+    else:
+        body.line("    if i not in %s: return False" % (members,))
+        body.line("except TypeError:")
+        body.line("    return False")
+    return True
+
+
+def _type(compiler, body, types, schema):
+    types = _utils.ensure_list(types)
+    checks = []
+    for type in types:
+        if not isinstance(type, str_types):
+            return False
+        check = compiler.type_check(type)
+        if check is None:
+            return False
+        checks.append("(%s)" % (check,))
+    if not checks:
+        body.line("return False")
+    else:
+        body.line("if not (%s): return False" % (" or ".join(checks),))
+    return True
+
+
+def _allOf(compiler, body, allOf, schema):
+    for subschema in allOf:
+        body.line(
+            "if not %s(i): return False" % (compiler.function_for(subschema),)
+        )
+    return True
+
+
+def _anyOf(compiler, body, anyOf, schema):
+    names = [compiler.function_for(subschema) for subschema in anyOf]
+    if not names:
+        body.line("return False")
+        return True
+    body.line("if not (%s): return False" % (
+        " or ".join("%s(i)" % (name,) for name in names),
+    ))
+    return True
+
+
+def _oneOf(compiler, body, oneOf, schema):
+    names = [compiler.function_for(subschema) for subschema in oneOf]
+
+    def exactly_one(indices):
+        body.line("m = False")
+        for index in indices:
+            body.line("if %s(i):" % (names[index],))
+            body.line("    if m: return False")
+            body.line("    m = True")
+        body.line("if not m: return False")
+
+    discriminator = find_discriminator(compiler.validator, oneOf)
+    if discriminator is None:
+        exactly_one(range(len(names)))
+        return True
+
+    # Branches are grouped by the values they allow at the discriminator
+    # path, and the instance's value picks the one group that can match.
+    path, values, unconstrained = discriminator
+    groups, table = {}, {}
+    for value, indices in iteritems(values):
+        indices = tuple(sorted(set(indices) | set(unconstrained)))
+        table[value] = groups.setdefault(indices, len(groups))
+    default = groups.setdefault(tuple(unconstrained), len(groups))
+
+    body.line("g = %s(i)" % (
+        compiler.recipe("group", path, table, default, prefix="x"),
+    ))
+    for indices, group in sorted(iteritems(groups), key=lambda x: x[1]):
+        body.line("%s g == %d:" % ("if" if not group else "elif", group))
+        body.depth += 1
+        if indices:
+            exactly_one(indices)
+        else:
+            body.line("return False")
+        body.depth -= 1
+    body.line("else:")
+    body.depth += 1
+    exactly_one(range(len(names)))
+    body.depth -= 1
+    return True
+
+
+def _namespace():
+    return {"iteritems": iteritems, "uniq": _utils.uniq}
+
+
+def _fallback(validator, schema, keyword, scope):
+    """
+    Check ``schema`` (or only its ``keyword``) with the interpreter.
+
+    """
+
+    if keyword is None:
+        def check(instance):
+            return validator.is_valid(instance, schema)
+        return check
+
+    predicate = getattr(validator, "PREDICATES", {}).get(keyword)
+    if predicate is None:
+        function = validator.VALIDATORS[keyword]
+
+        def predicate(validator, value, instance, schema):
+            errors = function(validator, value, instance, schema)
+            return next(iter(errors or ()), None) is None
+
+    value = schema[keyword]
+
+    def check(instance):
+        if scope is None:
+            return predicate(validator, value, instance, schema)
+        with validator.resolver._resolved_scope(scope):
+            return predicate(validator, value, instance, schema)
+    return check
+
+
+def _format_checker(validator):
+    # Formats are not checked without a checker, as in the interpreter, even
+    # if the compiled code was generated for one.
+    if validator.format_checker is None:
+        return FormatChecker(formats=())
+    return validator.format_checker
+
+
+def _group_lookup(validator, path, table, default):
+    """
+    Map an instance to the group of branches allowing its value at ``path``.
+
+    Returns ``-1`` when the instance has no (hashable) value there, in which
+    case every branch has to be tried.
+
+    """
+
+    is_type = validator.is_type
+
+    def lookup(instance):
+        for key in path:
+            if not is_type(instance, u"object") or key not in instance:
+                return -1
+            instance = instance[key]
+        try:
+            return table.get(instance, default)
+        except TypeError:
+            return -1
+    return lookup
+
+
+def _not(compiler, body, not_schema, schema):
+    body.line(
+        "if %s(i): return False" % (compiler.function_for(not_schema),)
+    )
+    return True
+
+
+_EMITTERS = {
+    _validators.ref: _ref,
+    _validators.additionalItems: _additionalItems,
+    _validators.additionalProperties: _additionalProperties,
+    _validators.allOf_draft4: _allOf,
+    _validators.anyOf_draft4: _anyOf,
+    _validators.dependencies: _dependencies,
+    _validators.enum: _enum,
+    _validators.format: _format,
+    _validators.items: _items,
+    _validators.maxItems: _length("array", ">"),
+    _validators.maxLength: _length("string", ">"),
+    _validators.maxProperties_draft4: _length("object", ">"),
+    _validators.maximum: _bound(">", ">=", "exclusiveMaximum"),
+    _validators.minItems: _length("array", "<"),
+    _validators.minLength: _length("string", "<"),
+    _validators.minProperties_draft4: _length("object", "<"),
+    _validators.minimum: _bound("<", "<=", "exclusiveMinimum"),
+    _validators.multipleOf: _multipleOf,
+    _validators.not_draft4: _not,
+    _validators.oneOf_draft4: _oneOf,
+    _validators.pattern: _pattern,
+    _validators.patternProperties: _patternProperties,
+    _validators.properties_draft4: _properties,
+    _validators.required_draft4: _required,
+    _validators.type_draft4: _type,
+    _validators.uniqueItems: _uniqueItems,
+}
+
+
+_RECIPES = {
+    "fallback": _fallback,
+    "format_checker": _format_checker,
+    "group": _group_lookup,
+}
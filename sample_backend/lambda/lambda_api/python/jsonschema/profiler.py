@@ -0,0 +1,180 @@
+"""
+Measurement of where validation spends its time, per subschema and keyword.
+
+A :class:`Profiler` is attached to one validator instance, whose keyword
+functions it then wraps. Validators it is not attached to are unaffected, so
+profiling costs nothing unless it is in use.
+
+"""
+
+from timeit import default_timer
+
+from jsonschema.compat import iteritems, str_types
+
+
+class Profiler(object):
+    """
+    Record the calls and time spent in each keyword of each subschema.
+
+    Times are cumulative (including the time spent in the subschemas a keyword
+    descends into) and self (excluding it). They include the time spent
+    producing errors, which for generators is only spent as they are
+    consumed.
+
+    Attributes:
+
+        stats (dict):
+
+            A mapping from ``(schema pointer, keyword)`` to a list of the
+            number of calls, the cumulative time and the self time
+
+    """
+
+    def __init__(self):
+        self.stats = {}
+        self._pointers = {}
+        self._running = []
+
+    def attach(self, validator):
+        """
+        Start profiling ``validator``.
+
+        """
+
+        self._pointers.update(_pointers(validator.schema))
+        cls = type(validator)
+        validator.VALIDATORS = dict(
+            (keyword, self._profiled_validator(keyword, function))
+            for keyword, function in iteritems(cls.VALIDATORS)
+        )
+        validator.PREDICATES = dict(
+            (keyword, self._profiled_predicate(keyword, function))
+            for keyword, function in iteritems(getattr(cls, "PREDICATES", {}))
+        )
+        return validator
+
+    def detach(self, validator):
+        """
+        Stop profiling ``validator``.
+
+        """
+
+        for attribute in "VALIDATORS", "PREDICATES":
+            validator.__dict__.pop(attribute, None)
+
+    def reset(self):
+        self.stats.clear()
+
+    def report(self, limit=None, sort="self"):
+        """
+        Return a table of the stats, most expensive first.
+
+        Arguments:
+
+            limit (int):
+
+                The number of rows to include, by default all of them
+
+            sort (str):
+
+                ``"self"``, ``"cumulative"`` or ``"calls"``
+
+        """
+
+        column = {"calls": 0, "cumulative": 1, "self": 2}[sort]
+        rows = sorted(
+            iteritems(self.stats),
+            key=lambda row: row[1][column],
+            reverse=True,
+        )
+        lines = ["%8s %12s %12s  %s" % ("calls", "cumulative", "self", "at")]
+        for (pointer, keyword), (calls, cumulative, self_time) in rows[:limit]:
+            lines.append(
+                "%8d %12.6f %12.6f  %s/%s" % (
+                    calls, cumulative, self_time, pointer, keyword,
+                ),
+            )
+        return "\n".join(lines)
+
+    def _start(self):
+        self._running.append(0.0)
+        return default_timer()
+
+    def _stop(self, key, start, call):
+        elapsed = default_timer() - start
+        children = self._running.pop()
+        if self._running:
+            self._running[-1] += elapsed
+
+        stats = self.stats.get(key)
+        if stats is None:
+            stats = self.stats[key] = [0, 0.0, 0.0]
+        stats[0] += call
+        stats[1] += elapsed
+        stats[2] += elapsed - children
+
+    def _key(self, schema, keyword):
+        pointer = self._pointers.get(id(schema))
+        if pointer is None or pointer[0] is not schema:
+            return u"(unknown)", keyword
+        return pointer[1], keyword
+
+    def _profiled_validator(self, keyword, function):
+        def profiled(validator, value, instance, schema):
+            key = self._key(schema, keyword)
+            start = self._start()
+            try:
+                errors = function(validator, value, instance, schema)
+            finally:
+                self._stop(key, start, call=1)
+            return self._timed(key, errors or ())
+        return profiled
+
+    def _timed(self, key, errors):
+        errors = iter(errors)
+        while True:
+            start = self._start()
+            try:
+                error = next(errors)
+            except StopIteration:
+                return
+            finally:
+                self._stop(key, start, call=0)
+            yield error
+
+    def _profiled_predicate(self, keyword, function):
+        def profiled(validator, value, instance, schema):
+            key = self._key(schema, keyword)
+            start = self._start()
+            try:
+                return function(validator, value, instance, schema)
+            finally:
+                self._stop(key, start, call=1)
+        return profiled
+
+
+def _pointers(schema):
+    """
+    Map the ``id()`` of each subschema to it and its JSON pointer.
+
+    """
+
+    pointers = {}
+    stack = [(schema, u"#")]
+    while stack:
+        node, pointer = stack.pop()
+        if isinstance(node, dict):
+            if id(node) in pointers:
+                continue
+            pointers[id(node)] = node, pointer
+            children = iteritems(node)
+        elif isinstance(node, list):
+            children = enumerate(node)
+        else:
+            continue
+        for key, child in children:
+            if not isinstance(key, str_types):
+                key = str(key)
+            escaped = key.replace(u"~", u"~0").replace(u"/", u"~1")
+            stack.append((child, pointer + u"/" + escaped))
+    return pointers
@@ -0,0 +1,366 @@
+"""
+Splitting a schema into shards which are only loaded once they are needed.
+
+A schema for many kinds of message (such as the Alexa Smart Home message
+schema) is often a ``oneOf`` of branches told apart by the value at some path,
+like the name in each message's header (see
+:func:`jsonschema.compiler.find_discriminator`). :func:`split` writes each
+branch into a shard of its own along with only the ``definitions`` it refers
+to, and a :class:`ShardedValidator` reads (and compiles) the shards of the
+branches an instance could be valid under the first time it sees one. A
+process which only ever sees a few kinds of message never loads the rest.
+
+Run ``python -m jsonschema.shards SCHEMA DIRECTORY`` to split a schema file.
+
+"""
+
+import argparse
+import json
+import os
+
+from jsonschema import _validators
+from jsonschema.compat import iteritems, str_types, unquote
+from jsonschema.compiler import compile_schema, find_discriminator, load
+from jsonschema.validators import _schema_digest, validator_for
+
+
+_INDEX = "index.json"
+
+# The keywords whose branches can be told apart and split
+_SPLITTABLE = [
+    (u"oneOf", _validators.oneOf_draft4),
+    (u"anyOf", _validators.anyOf_draft4),
+]
+
+
+def split(schema, directory, cls=None, compiled=False):
+    """
+    Split ``schema`` into shards, one per branch, written to ``directory``.
+
+    Arguments:
+
+        schema (dict):
+
+            The schema to split. Its root must have a ``oneOf`` or ``anyOf``
+            whose branches are told apart by a discriminator, and its
+            ``$ref``\\ s must all point into its ``definitions``.
+
+        directory (str):
+
+            The directory to write the shards to, created if missing
+
+        cls (:class:`IValidator`):
+
+            The validator class to check the schema with, chosen from the
+            schema's ``$schema`` if not provided
+
+        compiled (bool):
+
+            Whether to also save each shard's :class:`CompiledValidator`, to
+            be loaded by a :class:`ShardedValidator` compiling its shards
+
+    Raises:
+
+        :exc:`ValueError` if the schema cannot be split
+
+    """
+
+    if cls is None:
+        cls = validator_for(schema)
+    cls.check_schema(schema)
+    validator = cls(schema)
+
+    keyword = _keyword(validator, schema)
+    discriminator = find_discriminator(validator, schema[keyword])
+    if discriminator is None:
+        raise ValueError("Nothing tells the %s branches apart" % (keyword,))
+    path, values, unconstrained = discriminator
+
+    root = dict(
+        (each, value) for each, value in iteritems(schema)
+        if each not in (u"definitions", keyword)
+    )
+    if not os.path.isdir(directory):
+        os.makedirs(directory)
+
+    shards = []
+    for index, branch in enumerate(schema[keyword]):
+        shard = dict(root)
+        shard[u"definitions"] = _definitions(schema, [root, branch])
+        shard[keyword] = [branch]
+
+        name = "%d.json" % (index,)
+        _dump(shard, os.path.join(directory, name))
+        if compiled:
+            with open(os.path.join(directory, _compiled(name)), "wb") as file:
+                compile_schema(shard, cls).dump(file)
+        shards.append(name)
+
+    root[u"definitions"] = _definitions(schema, [root])
+    _dump(
+        {
+            "keyword": keyword,
+            "path": list(path),
+            "values": [[value, each] for value, each in iteritems(values)],
+            "unconstrained": unconstrained,
+            "shards": shards,
+            "compiled": compiled,
+            "root": root,
+            "digest": _schema_digest(schema),
+        },
+        os.path.join(directory, _INDEX),
+    )
+
+
+class ShardedValidator(object):
+    """
+    A validator for a schema split by :func:`split`.
+
+    The shards an instance needs are loaded the first time one is validated,
+    and then kept. It exposes the same ``validate`` / ``is_valid`` /
+    ``iter_errors`` API as the validator class it uses, except that only
+    whole instances can be validated.
+
+    Arguments:
+
+        directory (str):
+
+            The directory the shards were written to
+
+        cls (:class:`IValidator`):
+
+            The validator class to validate with, chosen from the schema's
+            ``$schema`` if not provided
+
+        compiled (bool):
+
+            Whether to compile the shards, loading the compiled validators
+            saved by :func:`split` instead if there are any
+
+    """
+
+    def __init__(self, directory, cls=None, compiled=False):
+        index = _load(os.path.join(directory, _INDEX))
+        if cls is None:
+            cls = validator_for(index[u"root"])
+
+        self.directory = directory
+        self.cls = cls
+        self.compiled = compiled
+        self.keyword = index[u"keyword"]
+        self.root = index[u"root"]
+
+        values = {}
+        for value, indices in index[u"values"]:
+            try:
+                values[value] = indices
+            except TypeError:
+                # Unhashable instances are looked up in every shard anyway
+                pass
+        self.discriminator = (
+            tuple(index[u"path"]), values, index[u"unconstrained"],
+        )
+
+        self._shards = index[u"shards"]
+        self._saved = index[u"compiled"]
+        self._digest = index.get(u"digest")
+        self._is_type = cls(self.root).is_type
+        self._validators = {}
+
+    def indices_for(self, instance):
+        """
+        Return the indices of the branches ``instance`` may be valid under.
+
+        """
+
+        path, values, unconstrained = self.discriminator
+        for key in path:
+            if not self._is_type(instance, u"object") or key not in instance:
+                return tuple(range(len(self._shards)))
+            instance = instance[key]
+        try:
+            indices = values.get(instance, ())
+        except TypeError:
+            return tuple(range(len(self._shards)))
+        return tuple(sorted(set(indices) | set(unconstrained)))
+
+    def was_split_from(self, schema):
+        """
+        Return whether the shards were split from ``schema``, as it is now.
+
+        The shards are told apart by a digest of the contents of the schema
+        they were split from, rather than e.g. by when they were written.
+
+        """
+
+        digest = _schema_digest(schema)
+        return digest is not None and digest == self._digest
+
+    def load(self, indices):
+        """
+        Return a validator for the schema with only the branches at
+        ``indices``, loading their shards if they were not yet.
+
+        """
+
+        indices = tuple(indices)
+        validator = self._validators.get(indices)
+        if validator is None:
+            validator = self._validators[indices] = self._load(indices)
+        return validator
+
+    def is_valid(self, instance):
+        return self.load(self.indices_for(instance)).is_valid(instance)
+
+    def iter_errors(self, instance):
+        indices = self.indices_for(instance)
+        for error in self.load(indices).iter_errors(instance):
+            # Errors in the branches are located as in the whole schema
+            if list(error.relative_schema_path) == [self.keyword]:
+                for suberror in error.context:
+                    branch = suberror.relative_schema_path[0]
+                    suberror.relative_schema_path[0] = indices[branch]
+            yield error
+
+    def validate(self, instance):
+        for error in self.iter_errors(instance):
+            raise error
+
+    def _load(self, indices):
+        if len(indices) == 1:
+            path = os.path.join(self.directory, self._shards[indices[0]])
+            if self.compiled and self._saved:
+                try:
+                    with open(_compiled(path), "rb") as file:
+                        return load(file)
+                except (EnvironmentError, ValueError):
+                    # e.g. saved by another version of Python
+                    pass
+            schema = _load(path)
+        else:
+            schema = dict(self.root)
+            schema[self.keyword] = []
+            for index in indices:
+                path = os.path.join(self.directory, self._shards[index])
+                shard = _load(path)
+                schema[u"definitions"] = _merged(
+                    schema[u"definitions"], shard[u"definitions"],
+                )
+                schema[self.keyword].extend(shard[self.keyword])
+
+        if self.compiled:
+            return compile_schema(schema, self.cls)
+        return self.cls(schema)
+
+
+def _keyword(validator, schema):
+    if u"$ref" not in schema:
+        for keyword, function in _SPLITTABLE:
+            if validator.VALIDATORS.get(keyword) is function:
+                if keyword in schema:
+                    return keyword
+    raise ValueError("The schema has no oneOf or anyOf at its root to split")
+
+
+def _definitions(schema, nodes):
+    """
+    Return the part of the ``definitions`` of ``schema`` which ``nodes``
+    refer to, directly or through other definitions.
+
+    """
+
+    pending, seen, pointers = list(_refs(nodes)), set(), []
+    while pending:
+        ref = pending.pop()
+        if ref in seen:
+            continue
+        seen.add(ref)
+        if not ref.startswith(u"#/definitions/"):
+            raise ValueError("%r does not point into the definitions" % (ref,))
+
+        parts, target = [], schema
+        for part in unquote(ref[2:]).split(u"/"):
+            part = part.replace(u"~1", u"/").replace(u"~0", u"~")
+            if isinstance(target, list):
+                part = int(part) if part.isdigit() else part
+            try:
+                target = target[part]
+            except (TypeError, LookupError):
+                raise ValueError("Unresolvable reference %r" % (ref,))
+            parts.append(part)
+        pointers.append(parts)
+        pending.extend(_refs(target))
+
+    # Copy only the referenced subschemas (or those containing them, within
+    # arrays), shortest pointers first so that nothing is copied twice.
+    copied = {}
+    for parts in sorted(pointers, key=len):
+        source, target = schema, copied
+        for depth, part in enumerate(parts):
+            value = source[part]
+            if depth == len(parts) - 1 or not isinstance(value, dict):
+                target[part] = value
+                break
+            elif target.get(part) is value:
+                break
+            source, target = value, target.setdefault(part, {})
+    return copied.get(u"definitions", {})
+
+
+def _refs(node):
+    if isinstance(node, dict):
+        ref = node.get(u"$ref")
+        if isinstance(ref, str_types):
+            yield ref
+        node = node.values()
+    elif not isinstance(node, list):
+        return
+    for each in node:
+        for ref in _refs(each):
+            yield ref
+
+
+def _merged(one, other):
+    merged = dict(one)
+    for key, value in iteritems(other):
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            value = _merged(merged[key], value)
+        merged[key] = value
+    return merged
+
+
+def _compiled(path):
+    return os.path.splitext(path)[0] + ".compiled"
+
+
+def _load(path):
+    with open(path) as file:
+        return json.load(file)
+
+
+def _dump(instance, path):
+    with open(path, "w") as file:
+        json.dump(instance, file, separators=(",", ":"))
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(
+        description="Split a JSON Schema into shards, one per branch",
+    )
+    parser.add_argument("schema", help="the JSON Schema file to split")
+    parser.add_argument("directory", help="the directory to write them to")
+    parser.add_argument(
+        "--compiled",
+        action="store_true",
+        help="also save the compiled validator of each shard",
+    )
+    arguments = parser.parse_args(args)
+    split(
+        _load(arguments.schema),
+        arguments.directory,
+        compiled=arguments.compiled,
+    )
+
+
+if __name__ == "__main__":
+    main()
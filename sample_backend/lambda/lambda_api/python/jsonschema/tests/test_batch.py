@@ -0,0 +1,59 @@
+import pickle
+
+from jsonschema import Draft3Validator, SchemaError
+from jsonschema.batch import validate_many
+from jsonschema.tests.compat import unittest
+
+
+SCHEMA = {"items": {"type": "integer"}, "maxItems": 2}
+INSTANCES = [[1], [1, "2"], [1, 2, 3], "foo", ["1", "2"]]
+
+
+class TestValidateMany(unittest.TestCase):
+    def assertValidatesAsOne(self, workers):
+        results = list(validate_many(INSTANCES, SCHEMA, workers=workers))
+        self.assertEqual([index for index, _ in results], [0, 1, 2, 3, 4])
+        self.assertEqual(
+            [[error.message for error in errors] for _, errors in results],
+            [
+                [],
+                ["'2' is not of type 'integer'"],
+                ["[1, 2, 3] is too long"],
+                [],
+                [
+                    "'1' is not of type 'integer'",
+                    "'2' is not of type 'integer'",
+                ],
+            ],
+        )
+        _, (error, _) = results[4]
+        self.assertEqual(list(error.path), [0])
+
+    def test_in_the_current_process(self):
+        self.assertValidatesAsOne(workers=1)
+
+    def test_in_a_pool(self):
+        self.assertValidatesAsOne(workers=2)
+
+    def test_instances_are_streamed(self):
+        instances = iter(INSTANCES)
+        results = validate_many(instances, SCHEMA, workers=1)
+        self.assertEqual(next(results), (0, []))
+        self.assertEqual(len(list(instances)), 4)
+
+    def test_the_schema_is_checked_first(self):
+        with self.assertRaises(SchemaError):
+            validate_many([], {"type": 12}, workers=2)
+
+    def test_validator_class(self):
+        results = validate_many(
+            [{}, {"foo": 1}],
+            {"properties": {"foo": {"required": True}}},
+            cls=Draft3Validator,
+            workers=2,
+        )
+        self.assertEqual([len(errors) for _, errors in results], [1, 0])
+
+    def test_registered_validators_can_be_pickled(self):
+        pickled = pickle.dumps(Draft3Validator)
+        self.assertIs(pickle.loads(pickled), Draft3Validator)
@@ -1,3 +1,8 @@
+import json
+import os
+import shutil
+import tempfile
+
 from jsonschema import Draft4Validator, ValidationError, cli
 from jsonschema.compat import StringIO
 from jsonschema.exceptions import SchemaError
@@ -58,6 +63,84 @@ class TestParser(unittest.TestCase):
         )
         self.assertIs(arguments["validator"], Draft4Validator)
 
+    def test_negative_jobs_are_rejected(self):
+        stderr = StringIO()
+        with mock.patch("sys.stderr", stderr):
+            with self.assertRaises(SystemExit):
+                cli.parse_args(["--jobs", "-1", "schema.json"])
+        self.assertIn("'-1' is not a number of processes", stderr.getvalue())
+
+    def test_instances_are_loaded_lazily(self):
+        arguments = cli.parse_args(
+            [
+                "--validator", "Draft4Validator",
+                "--instance", "foo.json",
+                "schema.json",
+            ]
+        )
+        self.assertEqual(cli.open.call_count, 1)
+        self.assertEqual(len(list(arguments["instances"])), 1)
+        cli.open.assert_called_with("foo.json")
+
+
+class TestInstances(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def write(self, path, instance):
+        path = os.path.join(self.directory, path)
+        if not os.path.isdir(os.path.dirname(path)):
+            os.makedirs(os.path.dirname(path))
+        with open(path, "w") as file:
+            json.dump(instance, file)
+
+    def test_ndjson_on_stdin(self):
+        stdin = StringIO(u'{"a": 1}\n\n[2]\n3\n')
+        instances = cli._instances(["-"], stdin=stdin)
+        self.assertEqual(list(instances), [{"a": 1}, [2], 3])
+
+    def test_directories_are_walked(self):
+        self.write("b.json", 2)
+        self.write("a.json", 1)
+        self.write("c/d.json", 3)
+        self.write("notes.txt", 4)
+        instances = cli._instances([self.directory])
+        self.assertEqual(list(instances), [1, 2, 3])
+
+    def test_globs(self):
+        self.write("a.response.json", 1)
+        self.write("a.request.json", 2)
+        self.write("b.response.json", 3)
+        pattern = os.path.join(self.directory, "*.response.json")
+        self.assertEqual(list(cli._instances([pattern])), [1, 3])
+
+    def test_malformed_ndjson_lines_are_reported_by_line(self):
+        stdin = StringIO(u'1\n{"a": \n3\n')
+        first, malformed, third = cli._instances(["-"], stdin=stdin)
+        self.assertEqual((first, third), (1, 3))
+        self.assertTrue(malformed.message.startswith("<stdin>:2: "))
+
+    def test_missing_files_are_reported_by_path(self):
+        path = os.path.join(self.directory, "missing*.json")
+        missing, = cli._instances([path])
+        self.assertEqual(
+            missing.message, path + ": No such file or directory",
+        )
+
+    def test_malformed_files_are_reported_by_path(self):
+        self.write("a.json", 1)
+        with open(os.path.join(self.directory, "b.json"), "w") as file:
+            file.write("{")
+        self.write("c.json", 3)
+        first, malformed, third = cli._instances([self.directory])
+        self.assertEqual((first, third), (1, 3))
+        self.assertTrue(
+            malformed.message.startswith(
+                os.path.join(self.directory, "b.json") + ": ",
+            ),
+        )
+
 
 class TestCLI(unittest.TestCase):
     def test_draft3_schema_draft4_validator(self):
@@ -133,3 +216,82 @@ class TestCLI(unittest.TestCase):
         self.assertFalse(stdout.getvalue())
         self.assertEqual(stderr.getvalue(), "1 - 9\t1 - 8\t2 - 7\t")
         self.assertEqual(exit_code, 1)
+
+    def test_jobs(self):
+        stdout, stderr = StringIO(), StringIO()
+        exit_code = cli.run(
+            {
+                "validator": Draft4Validator,
+                "schema": {"type": "integer"},
+                "instances": iter([1, "2", 3, "4"]),
+                "error_format": "{error.message}\n",
+                "jobs": 2,
+            },
+            stdout=stdout,
+            stderr=stderr,
+        )
+        self.assertEqual(
+            stderr.getvalue(),
+            "'2' is not of type 'integer'\n'4' is not of type 'integer'\n",
+        )
+        self.assertEqual(exit_code, 1)
+
+    def test_summary(self):
+        stdout, stderr = StringIO(), StringIO()
+        cli.run(
+            {
+                "validator": fake_validator([], [ValidationError("7")]),
+                "schema": {},
+                "instances": [1, 2, 3],
+                "error_format": "{error.message}",
+                "summary": True,
+            },
+            stdout=stdout,
+            stderr=stderr,
+        )
+        self.assertTrue(
+            stdout.getvalue().startswith("3 instances (1 invalid) in "),
+        )
+        self.assertIn("latency mean", stdout.getvalue())
+
+    def test_summary_with_jobs(self):
+        stdout, stderr = StringIO(), StringIO()
+        cli.run(
+            {
+                "validator": Draft4Validator,
+                "schema": {"type": "integer"},
+                "instances": iter([1, "2", 3]),
+                "error_format": "{error.message}\n",
+                "jobs": 2,
+                "summary": True,
+            },
+            stdout=stdout,
+            stderr=stderr,
+        )
+        self.assertTrue(
+            stdout.getvalue().startswith("3 instances (1 invalid) in "),
+        )
+        self.assertIn("latency mean", stdout.getvalue())
+
+    def test_unloadable_instances(self):
+        stdout, stderr = StringIO(), StringIO()
+        exit_code = cli.run(
+            {
+                "validator": fake_validator(),
+                "schema": {},
+                "instances": cli._instances(
+                    ["-"], stdin=StringIO(u'1\n{"a": \n3\n'),
+                ),
+                "error_format": "{error.message}",
+                "summary": True,
+            },
+            stdout=stdout,
+            stderr=stderr,
+        )
+        self.assertTrue(stderr.getvalue().startswith("<stdin>:2: "))
+        self.assertTrue(
+            stdout.getvalue().startswith(
+                "2 instances (0 invalid, 1 unloadable) in ",
+            ),
+        )
+        self.assertEqual(exit_code, 1)
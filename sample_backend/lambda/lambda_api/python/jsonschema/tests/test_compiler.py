@@ -0,0 +1,370 @@
+import io
+
+from jsonschema import FormatChecker, ValidationError
+from jsonschema.compiler import (
+    CompiledValidator, compile_schema, find_discriminator, load,
+)
+from jsonschema.tests.compat import unittest
+from jsonschema.validators import (
+    Draft3Validator, Draft4Validator, RefResolver, extend,
+)
+
+
+SCHEMAS_AND_INSTANCES = [
+    (
+        {"type": "integer"},
+        [1, 1.0, 1.5, True, "1", None],
+    ),
+    (
+        {"type": ["string", "null"], "minLength": 2, "maxLength": 3},
+        ["", "ab", "abcd", None, 12],
+    ),
+    (
+        {"minimum": 1, "maximum": 3, "exclusiveMaximum": True},
+        [0, 1, 2.5, 3, "foo", True],
+    ),
+    (
+        {"multipleOf": 0.5},
+        [1, 1.5, 1.2, "foo"],
+    ),
+    (
+        {"multipleOf": 3},
+        [9, 10, 9.0],
+    ),
+    (
+        {"pattern": "^a+$"},
+        ["aaa", "ab", 12],
+    ),
+    (
+        {"enum": [1, "foo", {"bar": [1]}, [2]]},
+        [1, True, 1.0, "foo", {"bar": [1]}, {"bar": [2]}, [2], [3], None],
+    ),
+    (
+        {
+            "type": "object",
+            "required": ["name"],
+            "properties": {"name": {"type": "string"}},
+            "patternProperties": {"^x-": {"type": "integer"}},
+            "additionalProperties": False,
+        },
+        [
+            {"name": "foo"},
+            {"name": 1},
+            {},
+            {"name": "foo", "x-count": 1},
+            {"name": "foo", "x-count": "1"},
+            {"name": "foo", "other": 1},
+            [],
+        ],
+    ),
+    (
+        {"additionalProperties": {"type": "string"}, "properties": {"a": {}}},
+        [{"a": 1, "b": "c"}, {"a": 1, "b": 2}],
+    ),
+    (
+        {"minProperties": 1, "maxProperties": 2},
+        [{}, {"a": 1}, {"a": 1, "b": 2, "c": 3}, "abc"],
+    ),
+    (
+        {"dependencies": {"a": ["b"], "c": {"required": ["d"]}}},
+        [{"a": 1}, {"a": 1, "b": 2}, {"c": 1}, {"c": 1, "d": 2}, 12],
+    ),
+    (
+        {
+            "items": [{"type": "integer"}, {"type": "string"}],
+            "additionalItems": False,
+        },
+        [[], [1], [1, "a"], [1, 2], [1, "a", None]],
+    ),
+    (
+        {"items": {"type": "integer"}, "minItems": 1, "maxItems": 2},
+        [[], [1], [1, 2, 3], [1, "a"]],
+    ),
+    (
+        {"uniqueItems": True},
+        [[1, 2], [1, 1], [1, True], [{"a": 1}, {"a": 1}], [[1], [True]]],
+    ),
+    (
+        {"allOf": [{"type": "integer"}, {"minimum": 2}]},
+        [1, 2, "2"],
+    ),
+    (
+        {"anyOf": [{"type": "integer"}, {"minimum": 2}]},
+        [1, 2.5, 1.5, "foo"],
+    ),
+    (
+        {"oneOf": [{"type": "integer"}, {"minimum": 2}]},
+        [1, 2.5, 3, 1.5],
+    ),
+    (
+        {"not": {"type": "integer"}},
+        [1, "foo"],
+    ),
+    (
+        {
+            "definitions": {
+                "node": {
+                    "type": "object",
+                    "properties": {
+                        "value": {"type": "integer"},
+                        "next": {"$ref": "#/definitions/node"},
+                    },
+                },
+            },
+            "$ref": "#/definitions/node",
+        },
+        [
+            {"value": 1},
+            {"value": 1, "next": {"value": 2, "next": {"value": 3}}},
+            {"value": 1, "next": {"value": "2"}},
+        ],
+    ),
+]
+
+
+class TestCompiledValidator(unittest.TestCase):
+    def assertAgreesWithInterpreter(self, schema, instances, cls=None, **kw):
+        interpreted = (cls or Draft4Validator)(schema, **kw)
+        compiled = CompiledValidator(schema, cls, **kw)
+        for instance in instances:
+            self.assertEqual(
+                compiled.is_valid(instance),
+                interpreted.is_valid(instance),
+                "%r under %r" % (instance, schema),
+            )
+            self.assertEqual(
+                [error.message for error in compiled.iter_errors(instance)],
+                [error.message for error in interpreted.iter_errors(instance)],
+            )
+
+    def test_agrees_with_the_interpreter(self):
+        for schema, instances in SCHEMAS_AND_INSTANCES:
+            self.assertAgreesWithInterpreter(schema, instances)
+
+    def test_validate_raises_the_interpreters_error(self):
+        compiled = compile_schema({"properties": {"foo": {"type": "string"}}})
+        with self.assertRaises(ValidationError) as e:
+            compiled.validate({"foo": 12})
+        self.assertEqual(e.exception.message, "12 is not of type 'string'")
+        self.assertEqual(list(e.exception.path), ["foo"])
+
+    def test_validator_class_is_chosen_from_the_schema(self):
+        schema = {"$schema": "http://json-schema.org/draft-03/schema#"}
+        self.assertIsInstance(
+            CompiledValidator(schema).validator, Draft3Validator,
+        )
+
+    def test_unknown_keywords_fall_back_to_the_interpreter(self):
+        def even(validator, value, instance, schema):
+            if value and instance % 2:
+                yield ValidationError("%r is odd" % (instance,))
+
+        Validator = extend(Draft4Validator, {"even": even})
+        self.assertAgreesWithInterpreter(
+            {"properties": {"a": {"even": True}}},
+            [{"a": 2}, {"a": 3}],
+            cls=Validator,
+        )
+
+    def test_draft3_keywords_fall_back_to_the_interpreter(self):
+        self.assertAgreesWithInterpreter(
+            {"properties": {"a": {"required": True}}, "disallow": "array"},
+            [{"a": 1}, {}, []],
+            cls=Draft3Validator,
+        )
+
+    def test_custom_types(self):
+        self.assertAgreesWithInterpreter(
+            {"type": "array", "items": {"type": "integer"}},
+            [(1, 2), [1, 2], (1, "2")],
+            types={"array": (list, tuple)},
+        )
+
+    def test_format_is_checked_only_with_a_format_checker(self):
+        schema = {"format": "ipv4"}
+        self.assertTrue(CompiledValidator(schema).is_valid("foo"))
+        self.assertAgreesWithInterpreter(
+            schema, ["127.0.0.1", "foo"], format_checker=FormatChecker(),
+        )
+
+    def test_refs_in_nested_scopes(self):
+        schema = {
+            "id": "http://example.com/root.json",
+            "properties": {
+                "foo": {
+                    "id": "http://example.com/nested/",
+                    "properties": {"bar": {"$ref": "item.json"}},
+                },
+            },
+        }
+        resolver = RefResolver.from_schema(
+            schema,
+            store={"http://example.com/nested/item.json": {"type": "integer"}},
+        )
+        self.assertAgreesWithInterpreter(
+            schema,
+            [{"foo": {"bar": 1}}, {"foo": {"bar": "1"}}],
+            resolver=resolver,
+        )
+
+    def test_unresolvable_refs_only_fail_when_reached(self):
+        compiled = CompiledValidator(
+            {"properties": {"foo": {"$ref": "#/definitions/missing"}}},
+        )
+        self.assertTrue(compiled.is_valid({}))
+
+
+class TestDumpAndLoad(unittest.TestCase):
+    def reload(self, compiled, *args, **kwargs):
+        file = io.BytesIO()
+        compiled.dump(file)
+        file.seek(0)
+        return load(file, *args, **kwargs)
+
+    def test_loaded_validators_agree_with_the_interpreter(self):
+        for schema, instances in SCHEMAS_AND_INSTANCES + [(MESSAGES, [
+            {"event": {"header": {"name": "Response"}}},
+            {"event": {"header": {"name": "Other"}, "payload": {}}},
+            {"event": {"header": {"name": "Unknown"}}},
+        ])]:
+            interpreted = Draft4Validator(schema)
+            loaded = self.reload(CompiledValidator(schema))
+            self.assertEqual(loaded.schema, schema)
+            for instance in instances:
+                self.assertEqual(
+                    loaded.is_valid(instance),
+                    interpreted.is_valid(instance),
+                    "%r under %r" % (instance, schema),
+                )
+
+    def test_fallbacks_are_rebuilt(self):
+        schema = {"properties": {"a": {"required": True}}, "disallow": "array"}
+        loaded = self.reload(CompiledValidator(schema, Draft3Validator))
+        self.assertIsInstance(loaded.validator, Draft3Validator)
+        self.assertTrue(loaded.is_valid({"a": 1}))
+        self.assertFalse(loaded.is_valid({}))
+        self.assertFalse(loaded.is_valid([]))
+
+    def test_arguments_are_passed_to_the_validator_class(self):
+        compiled = CompiledValidator(
+            {"format": "ipv4"}, format_checker=FormatChecker(),
+        )
+        loaded = self.reload(compiled, format_checker=FormatChecker())
+        self.assertFalse(loaded.is_valid("foo"))
+        self.assertTrue(self.reload(compiled).is_valid("foo"))
+
+    def test_errors_come_from_the_interpreter(self):
+        loaded = self.reload(CompiledValidator({"type": "string"}))
+        with self.assertRaises(ValidationError) as e:
+            loaded.validate(12)
+        self.assertEqual(e.exception.message, "12 is not of type 'string'")
+
+    def test_other_files_are_rejected(self):
+        with self.assertRaises(ValueError):
+            load(io.BytesIO(b"jsonschema-compiled 1 OtherPython-1.0\n"))
+
+
+MESSAGES = {
+    "definitions": {
+        "header": {
+            "type": "object",
+            "properties": {"name": {"enum": ["Response", "StateReport"]}},
+        },
+    },
+    "oneOf": [
+        {
+            "properties": {
+                "event": {
+                    "properties": {
+                        "header": {
+                            "properties": {
+                                "name": {"enum": ["ErrorResponse"]},
+                            },
+                        },
+                        "payload": {"required": ["type"]},
+                    },
+                },
+            },
+        },
+        {
+            "properties": {
+                "event": {
+                    "properties": {"header": {"$ref": "#/definitions/header"}},
+                },
+            },
+            "required": ["event"],
+        },
+        {
+            "properties": {
+                "event": {
+                    "allOf": [
+                        {
+                            "properties": {
+                                "header": {
+                                    "properties": {
+                                        "name": {
+                                            "enum": ["ErrorResponse", "Other"],
+                                        },
+                                    },
+                                },
+                            },
+                        },
+                    ],
+                    "required": ["payload"],
+                },
+            },
+        },
+        {"not": {"type": "object"}},
+    ],
+}
+
+
+class TestDiscriminator(unittest.TestCase):
+    def test_finds_the_path_telling_branches_apart(self):
+        validator = Draft4Validator(MESSAGES)
+        path, values, unconstrained = find_discriminator(
+            validator, MESSAGES["oneOf"],
+        )
+        self.assertEqual(path, ("event", "header", "name"))
+        self.assertEqual(
+            values,
+            {
+                "ErrorResponse": [0, 2],
+                "Response": [1],
+                "StateReport": [1],
+                "Other": [2],
+            },
+        )
+        self.assertEqual(unconstrained, [3])
+
+    def test_no_discriminator_without_enums(self):
+        validator = Draft4Validator({})
+        subschemas = [{"type": "integer"}, {"type": "string"}]
+        self.assertIsNone(find_discriminator(validator, subschemas))
+
+    def test_dispatch_agrees_with_the_interpreter(self):
+        interpreted = Draft4Validator(MESSAGES)
+        compiled = CompiledValidator(MESSAGES)
+        instances = [
+            {"event": {"header": {"name": "Response"}}},
+            {"event": {"header": {"name": "ErrorResponse"}, "payload": {}}},
+            {
+                "event": {
+                    "header": {"name": "ErrorResponse"},
+                    "payload": {"type": "FOO"},
+                },
+            },
+            {"event": {"header": {"name": "Other"}, "payload": {}}},
+            {"event": {"header": {"name": "Unknown"}}},
+            {"event": {"header": {"name": ["unhashable"]}}},
+            {"event": {"header": {}}},
+            {"event": {"header": "name"}},
+            {},
+            12,
+        ]
+        for instance in instances:
+            self.assertEqual(
+                compiled.is_valid(instance),
+                interpreted.is_valid(instance),
+                instance,
+            )
@@ -1,3 +1,4 @@
+import pickle
 import textwrap
 
 from jsonschema import Draft4Validator, exceptions
@@ -398,3 +399,49 @@ class TestErrorInitReprStr(unittest.TestCase):
         )
         str(error)
         self.assertFalse(instance.__eq__.called)
+
+    def test_lazy_message_is_only_rendered_when_read(self):
+        reprs = []
+
+        class Instance(object):
+            def __repr__(self):
+                reprs.append(self)
+                return "<instance>"
+
+        error = self.make_error(
+            message=exceptions._LazyMessage("%r is bad", Instance()),
+        )
+        self.assertFalse(reprs)
+        self.assertEqual(error.message, "<instance> is bad")
+        self.assertEqual(len(reprs), 1)
+
+    def test_lazy_message_from_a_callable(self):
+        message = exceptions._LazyMessage(u"{0} and {1}".format, 1, 2)
+        self.assertEqual(self.make_error(message=message).message, "1 and 2")
+
+    def test_lazy_context_is_only_consumed_when_read(self):
+        child = exceptions.ValidationError("child")
+        consumed = []
+
+        def context():
+            consumed.append(True)
+            yield child
+
+        error = self.make_error(context=context())
+        self.assertFalse(consumed)
+        self.assertEqual(error.context, [child])
+        self.assertIs(child.parent, error)
+
+    def test_lazy_errors_can_be_pickled(self):
+        error = self.make_error(
+            message=exceptions._LazyMessage("%r is bad", 5),
+            context=iter([exceptions.ValidationError("child")]),
+            path=["foo"],
+        )
+        unpickled = pickle.loads(pickle.dumps(error))
+        self.assertEqual(unpickled.message, "5 is bad")
+        self.assertEqual(unpickled.path, error.path)
+        self.assertEqual(
+            [each.message for each in unpickled.context], ["child"],
+        )
+        self.assertIs(unpickled.context[0].parent, unpickled)
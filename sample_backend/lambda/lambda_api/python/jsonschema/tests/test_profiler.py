@@ -0,0 +1,74 @@
+from jsonschema import Draft4Validator
+from jsonschema.profiler import Profiler
+from jsonschema.tests.compat import unittest
+
+
+SCHEMA = {
+    "definitions": {"name/part": {"type": "string", "minLength": 1}},
+    "properties": {
+        "names": {"items": {"$ref": "#/definitions/name~1part"}},
+        "size": {"anyOf": [{"type": "integer"}, {"type": "null"}]},
+    },
+}
+
+
+class TestProfiler(unittest.TestCase):
+    def setUp(self):
+        self.profiler = Profiler()
+        self.validator = Draft4Validator(SCHEMA, profiler=self.profiler)
+
+    def calls(self):
+        return dict(
+            (key, calls) for key, (calls, _, _) in self.profiler.stats.items()
+        )
+
+    def test_counts_calls_per_subschema_and_keyword(self):
+        errors = list(
+            self.validator.iter_errors({"names": ["a", "", 3], "size": 2})
+        )
+        self.assertEqual(len(errors), 2)
+        self.assertEqual(
+            self.calls(), {
+                ("#", "properties"): 1,
+                ("#/properties/names", "items"): 1,
+                ("#/properties/names/items", "$ref"): 3,
+                ("#/definitions/name~1part", "type"): 3,
+                ("#/definitions/name~1part", "minLength"): 3,
+                ("#/properties/size", "anyOf"): 1,
+                ("#/properties/size/anyOf/0", "type"): 1,
+            },
+        )
+
+    def test_is_valid_is_profiled(self):
+        self.assertFalse(self.validator.is_valid({"size": "big"}))
+        calls = self.calls()
+        self.assertEqual(calls[("#/properties/size", "anyOf")], 1)
+        self.assertEqual(calls[("#/properties/size/anyOf/1", "type")], 1)
+
+    def test_cumulative_time_includes_self_time(self):
+        self.validator.is_valid({"names": ["a"] * 50})
+        for calls, cumulative, self_time in self.profiler.stats.values():
+            self.assertGreaterEqual(cumulative, self_time)
+        _, cumulative, self_time = self.profiler.stats["#", "properties"]
+        self.assertGreater(cumulative, self_time)
+
+    def test_report_is_sorted(self):
+        self.validator.is_valid({"names": ["a", "b"]})
+        lines = self.profiler.report(sort="calls").splitlines()
+        self.assertEqual(len(lines), 6)
+        self.assertEqual(
+            lines[0].split(), ["calls", "cumulative", "self", "at"],
+        )
+        calls = [int(line.split()[0]) for line in lines[1:]]
+        self.assertEqual(calls, sorted(calls, reverse=True))
+        self.assertEqual(len(self.profiler.report(limit=2).splitlines()), 3)
+
+    def test_detach(self):
+        self.profiler.detach(self.validator)
+        self.validator.is_valid({"names": ["a"]})
+        self.assertEqual(self.profiler.stats, {})
+        self.assertIs(self.validator.VALIDATORS, Draft4Validator.VALIDATORS)
+
+    def test_other_validators_are_not_profiled(self):
+        Draft4Validator(SCHEMA).is_valid({"names": ["a"]})
+        self.assertEqual(self.profiler.stats, {})
@@ -0,0 +1,209 @@
+import json
+import os
+import shutil
+import tempfile
+
+from jsonschema import Draft4Validator, shards
+from jsonschema.compiler import CompiledValidator
+from jsonschema.tests.compat import mock, unittest
+
+
+SCHEMA = {
+    "$schema": "http://json-schema.org/draft-04/schema#",
+    "definitions": {
+        "common": {
+            "name": {"type": "string", "minLength": 1},
+            "names": {
+                "type": "array",
+                "items": {"$ref": "#/definitions/common/name"},
+            },
+            "unused": {"type": "null"},
+        },
+        "a.properties": {"kind": {"enum": ["a"]}},
+        "b/c": {"kind": {"enum": ["b", "c"]}},
+    },
+    "type": "object",
+    "oneOf": [
+        {
+            "properties": {
+                "kind": {"$ref": "#/definitions/a.properties/kind"},
+                "name": {"$ref": "#/definitions/common/name"},
+            },
+        },
+        {
+            "properties": {
+                "kind": {"$ref": "#/definitions/b~1c/kind"},
+                "names": {"$ref": "#/definitions/common/names"},
+            },
+        },
+        {"properties": {"kind": {"enum": ["c", "d"]}}, "required": ["size"]},
+    ],
+}
+
+
+class TestSplit(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def shard(self, name):
+        with open(os.path.join(self.directory, name)) as file:
+            return json.load(file)
+
+    def test_shards_keep_only_referenced_definitions(self):
+        shards.split(SCHEMA, self.directory)
+        self.assertEqual(
+            sorted(os.listdir(self.directory)),
+            ["0.json", "1.json", "2.json", "index.json"],
+        )
+
+        first = self.shard("0.json")
+        self.assertEqual(first["oneOf"], SCHEMA["oneOf"][:1])
+        self.assertEqual(first["type"], "object")
+        self.assertEqual(
+            first["definitions"], {
+                "common": {"name": {"type": "string", "minLength": 1}},
+                "a.properties": {"kind": {"enum": ["a"]}},
+            },
+        )
+        self.assertEqual(
+            self.shard("1.json")["definitions"], {
+                "common": {
+                    "name": SCHEMA["definitions"]["common"]["name"],
+                    "names": SCHEMA["definitions"]["common"]["names"],
+                },
+                "b/c": SCHEMA["definitions"]["b/c"],
+            },
+        )
+        self.assertEqual(self.shard("2.json")["definitions"], {})
+
+    def test_index(self):
+        shards.split(SCHEMA, self.directory)
+        index = self.shard("index.json")
+        self.assertEqual(index["path"], ["kind"])
+        self.assertEqual(
+            sorted(index["values"]),
+            [["a", [0]], ["b", [1]], ["c", [1, 2]], ["d", [2]]],
+        )
+        self.assertEqual(index["unconstrained"], [])
+        self.assertNotIn("oneOf", index["root"])
+
+    def test_compiled(self):
+        shards.split(SCHEMA, self.directory, compiled=True)
+        self.assertIn("1.compiled", os.listdir(self.directory))
+
+    def test_schemas_which_cannot_be_split(self):
+        for schema in [
+            {"anyOf": [{}, {}]},
+            {"properties": {"kind": {"enum": [1]}}},
+            {"$ref": "#/definitions/a", "oneOf": SCHEMA["oneOf"]},
+            {"oneOf": [{"$ref": "#/oneOf/1"}, SCHEMA["oneOf"][2]]},
+            {"oneOf": [{"$ref": "#/definitions/a"}, SCHEMA["oneOf"][2]]},
+        ]:
+            with self.assertRaises(ValueError):
+                shards.split(schema, self.directory)
+
+    def test_main(self):
+        path = os.path.join(self.directory, "schema.json")
+        with open(path, "w") as file:
+            json.dump(SCHEMA, file)
+        shards.main([path, os.path.join(self.directory, "shards")])
+        self.assertIn("shards", os.listdir(self.directory))
+
+
+class ShardedValidatorTestMixin(object):
+    compiled = False
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        shards.split(SCHEMA, self.directory, compiled=self.compiled)
+        self.validator = shards.ShardedValidator(
+            self.directory, compiled=self.compiled,
+        )
+
+    def test_same_verdicts_as_the_whole_schema(self):
+        whole = Draft4Validator(SCHEMA)
+        for instance in [
+            {"kind": "a", "name": "x"},
+            {"kind": "a", "name": ""},
+            {"kind": "b", "names": ["x"]},
+            {"kind": "b", "names": [""]},
+            {"kind": "c"},
+            {"kind": "c", "size": 1},
+            {"kind": "c", "names": [], "size": 1},
+            {"kind": "d", "size": 1},
+            {"kind": "e"},
+            {"kind": []},
+            {},
+            12,
+        ]:
+            self.assertEqual(
+                self.validator.is_valid(instance),
+                whole.is_valid(instance),
+                instance,
+            )
+
+    def test_only_needed_shards_are_loaded(self):
+        self.validator.validate({"kind": "a", "name": "x"})
+        self.validator.validate({"kind": "a", "name": "y"})
+        self.assertEqual(list(self.validator._validators), [(0,)])
+
+        self.assertFalse(self.validator.is_valid({"kind": "c", "names": [1]}))
+        self.assertFalse(self.validator.is_valid({"kind": "e"}))
+        self.assertEqual(
+            sorted(self.validator._validators), [(), (0,), (1, 2)],
+        )
+
+    def test_was_split_from(self):
+        self.assertTrue(self.validator.was_split_from(SCHEMA))
+        self.assertTrue(self.validator.was_split_from(json.loads(
+            json.dumps(SCHEMA, indent=4),
+        )))
+
+        changed = dict(SCHEMA, type="array")
+        self.assertFalse(self.validator.was_split_from(changed))
+
+    def test_instances_without_a_discriminator_load_every_shard(self):
+        self.assertFalse(self.validator.is_valid({"name": "x"}))
+        self.assertEqual(list(self.validator._validators), [(0, 1, 2)])
+
+    def test_errors_are_located_as_in_the_whole_schema(self):
+        instance = {"kind": "c", "names": [""]}
+        error, = self.validator.iter_errors(instance)
+        whole, = Draft4Validator(SCHEMA).iter_errors(instance)
+        self.assertEqual(error.message, whole.message)
+        self.assertEqual(
+            sorted(list(each.schema_path) for each in error.context),
+            sorted(
+                list(each.schema_path) for each in whole.context
+                if each.schema_path[0] in (1, 2)
+            ),
+        )
+
+
+class TestShardedValidator(ShardedValidatorTestMixin, unittest.TestCase):
+    def test_validators(self):
+        self.validator.validate({"kind": "a"})
+        self.assertIsInstance(self.validator.load([0]), Draft4Validator)
+
+
+class TestCompiledShardedValidator(
+    ShardedValidatorTestMixin, unittest.TestCase,
+):
+    compiled = True
+
+    def test_saved_validators_are_loaded(self):
+        with mock.patch.object(shards, "compile_schema") as compile_schema:
+            self.assertIsInstance(self.validator.load([0]), CompiledValidator)
+        self.assertFalse(compile_schema.called)
+
+    def test_groups_of_shards_are_compiled(self):
+        self.assertIsInstance(self.validator.load([1, 2]), CompiledValidator)
+
+    def test_unloadable_validators_are_compiled_again(self):
+        with open(os.path.join(self.directory, "0.compiled"), "wb") as file:
+            file.write(b"jsonschema-compiled 1 OtherPython-1.0\n")
+        validator = self.validator.load([0])
+        self.assertIsInstance(validator, CompiledValidator)
+        self.assertTrue(validator.is_valid({"kind": "a"}))
@@ -0,0 +1,225 @@
+from jsonschema import Draft4Validator, ValidationError
+from jsonschema.compiler import compile_schema
+from jsonschema.streaming import ArrayStream
+from jsonschema.tests.compat import unittest
+
+
+SCHEMA = {
+    "definitions": {"id": {"type": "string", "minLength": 1}},
+    "type": "object",
+    "required": ["event"],
+    "additionalProperties": False,
+    "properties": {
+        "event": {
+            "additionalProperties": False,
+            "properties": {
+                "name": {"enum": ["Discover"]},
+                "endpoints": {
+                    "type": "array",
+                    "description": "The endpoints",
+                    "minItems": 1,
+                    "maxItems": 3,
+                    "uniqueItems": True,
+                    "items": {
+                        "required": ["id"],
+                        "properties": {"id": {"$ref": "#/definitions/id"}},
+                    },
+                },
+            },
+        },
+    },
+}
+PATH = ["event", "endpoints"]
+
+
+class StreamTestMixin(object):
+    def setUp(self):
+        self.stream = ArrayStream(self.validator(SCHEMA), PATH)
+
+    def assertRaisesAt(self, path, schema_path, fn, *args):
+        with self.assertRaises(ValidationError) as e:
+            fn(*args)
+        self.assertEqual(list(e.exception.path), path)
+        self.assertEqual(list(e.exception.schema_path), schema_path)
+        return e.exception
+
+    def test_valid(self):
+        endpoints = [{"id": "a"}, {"id": "b"}]
+        for endpoint in endpoints:
+            self.stream.append(endpoint)
+        self.stream.finish(
+            {"event": {"name": "Discover", "endpoints": endpoints}},
+        )
+        self.assertEqual(self.stream.count, 2)
+
+    def test_invalid_item(self):
+        self.stream.append({"id": "a"})
+        error = self.assertRaisesAt(
+            ["event", "endpoints", 1, "id"],
+            [
+                "properties", "event", "properties", "endpoints",
+                "items", "properties", "id", "minLength",
+            ],
+            self.stream.append, {"id": ""},
+        )
+        self.assertEqual(error.validator, "minLength")
+
+    def test_too_many_items(self):
+        for id in "abc":
+            self.stream.append({"id": id})
+        error = self.assertRaisesAt(
+            ["event", "endpoints"],
+            ["properties", "event", "properties", "endpoints", "maxItems"],
+            self.stream.append, {"id": "d"},
+        )
+        self.assertEqual(error.message, "The array has more than 3 items")
+
+    def test_duplicate_item(self):
+        self.stream.append({"id": "a", "n": 1})
+        error = self.assertRaisesAt(
+            ["event", "endpoints"],
+            ["properties", "event", "properties", "endpoints", "uniqueItems"],
+            self.stream.append, {"id": "a", "n": 1.0},
+        )
+        self.assertEqual(error.validator, "uniqueItems")
+        self.assertEqual(self.stream.count, 1)
+
+    def test_too_few_items(self):
+        self.assertRaisesAt(
+            ["event", "endpoints"],
+            ["properties", "event", "properties", "endpoints", "minItems"],
+            self.stream.finish, {"event": {"endpoints": []}},
+        )
+
+    def test_invalid_envelope(self):
+        self.stream.append({"id": "a"})
+        error = self.assertRaisesAt(
+            ["event", "name"],
+            ["properties", "event", "properties", "name", "enum"],
+            self.stream.finish, {"event": {"name": "Other", "endpoints": []}},
+        )
+        self.assertEqual(error.validator, "enum")
+
+    def test_envelope_does_not_descend_into_the_appended_items(self):
+        endpoint = {"id": "a"}
+        self.stream.append(endpoint)
+        endpoint["id"] = ""
+        self.stream.finish({"event": {"endpoints": [endpoint]}})
+        self.assertRaisesAt(
+            ["event", "endpoints"],
+            ["properties", "event", "properties", "endpoints", "type"],
+            self.stream.finish, {"event": {"endpoints": {}}},
+        )
+
+    def test_array_which_was_not_appended_is_validated_whole(self):
+        self.stream.append({"id": "a"})
+        self.stream.reset()
+        error = self.assertRaisesAt(
+            ["event", "endpoints", 0, "id"],
+            [
+                "properties", "event", "properties", "endpoints",
+                "items", "properties", "id", "minLength",
+            ],
+            self.stream.finish, {"event": {"endpoints": [{"id": ""}]}},
+        )
+        self.assertEqual(error.validator, "minLength")
+
+        self.stream.append({"id": "a"})
+        self.assertRaisesAt(
+            ["event", "endpoints"],
+            ["properties", "event", "properties", "endpoints", "maxItems"],
+            self.stream.finish, {"event": {"endpoints": [{"id": "a"}] * 4}},
+        )
+        self.stream.finish({"event": {"endpoints": [{"id": "b"}]}})
+
+    def test_missing_array(self):
+        self.stream.append({"id": "a"})
+        self.stream.finish({"event": {"name": "Discover"}})
+
+    def test_errors_are_located_within_the_whole_schema(self):
+        schema = {"definitions": SCHEMA["definitions"], "oneOf": [SCHEMA]}
+        stream = ArrayStream(
+            self.validator(schema), PATH, SCHEMA, schema_path=["oneOf", 0],
+        )
+        whole = Draft4Validator(schema)
+
+        for instance in [
+            {"event": {"endpoints": [{"id": ""}]}},
+            {"event": {"name": "Other", "endpoints": [{"id": "a"}]}},
+        ]:
+            stream.reset()
+            with self.assertRaises(ValidationError) as e:
+                for endpoint in instance["event"]["endpoints"]:
+                    stream.append(endpoint)
+                stream.finish(instance)
+
+            error, = whole.iter_errors(instance)
+            expected, = error.context
+            self.assertEqual(
+                list(e.exception.schema_path),
+                list(expected.absolute_schema_path),
+            )
+
+    def test_reset(self):
+        for id in "abc":
+            self.stream.append({"id": id})
+        self.stream.reset()
+        self.stream.append({"id": "a"})
+        self.assertEqual(self.stream.count, 1)
+
+
+class TestArrayStream(StreamTestMixin, unittest.TestCase):
+    validator = Draft4Validator
+
+    def test_bools_are_unique_from_numbers_at_the_top_level(self):
+        stream = ArrayStream(
+            Draft4Validator({}), ["a"], {"properties": {"a": {
+                "uniqueItems": True,
+            }}},
+        )
+        for item in [1, True, 0, False, [1], {"a": {"b": 1}}, ["x"]]:
+            stream.append(item)
+        for item in [1.0, [True], {"a": {"b": True}}, False]:
+            with self.assertRaises(ValidationError):
+                stream.append(item)
+
+    def test_unhashable_items(self):
+        stream = ArrayStream(
+            Draft4Validator({}), ["a"], {"properties": {"a": {
+                "uniqueItems": True,
+            }}},
+        )
+        stream.append(set([1]))
+        stream.append(set([2]))
+        with self.assertRaises(ValidationError):
+            stream.append(set([1]))
+
+    def test_path_must_be_in_properties(self):
+        with self.assertRaises(ValueError):
+            ArrayStream(Draft4Validator(SCHEMA), ["event", "other"])
+        with self.assertRaises(ValueError):
+            ArrayStream(Draft4Validator(SCHEMA), [])
+
+    def test_keywords_which_cannot_be_streamed(self):
+        schema = {"properties": {"a": {"items": {}, "not": {"maxItems": 2}}}}
+        with self.assertRaises(ValueError):
+            ArrayStream(Draft4Validator(schema), ["a"])
+
+        schema = {"properties": {"a": {"items": [{}, {}]}}}
+        with self.assertRaises(ValueError):
+            ArrayStream(Draft4Validator(schema), ["a"])
+
+    def test_schema_is_not_modified(self):
+        self.assertEqual(
+            list(self.stream.envelope_schema["properties"]["event"]),
+            ["additionalProperties", "properties"],
+        )
+        endpoints = SCHEMA["properties"]["event"]["properties"]["endpoints"]
+        self.assertIn("items", endpoints)
+        self.assertIs(self.stream.array_schema, endpoints)
+
+
+class TestCompiledArrayStream(StreamTestMixin, unittest.TestCase):
+    @staticmethod
+    def validator(schema):
+        return compile_schema(schema, Draft4Validator)
@@ -1,12 +1,16 @@
 from collections import deque
 from contextlib import contextmanager
+import codecs
 import json
+import threading
 
-from jsonschema import FormatChecker, ValidationError
+from jsonschema import FormatChecker, SchemaError, ValidationError, _utils
+from jsonschema.compat import JSON_LOADS_BYTES
 from jsonschema.tests.compat import mock, unittest
 from jsonschema.validators import (
     RefResolutionError, UnknownType, Draft3Validator,
-    Draft4Validator, RefResolver, create, extend, validator_for, validate,
+    Draft4Validator, RefResolver, create, extend, parse, validator_for,
+    validate,
 )
 
 
@@ -612,6 +616,41 @@ class TestValidationErrorDetails(unittest.TestCase):
         self.assertEqual(e1.validator, "type")
         self.assertEqual(e2.validator, "minimum")
 
+    def test_anyOf_context_is_only_created_when_read(self):
+        schema = {"anyOf": [{"minimum": 20}, {"type": "string"}]}
+        validator = Draft4Validator(schema)
+
+        with mock.patch.object(
+            validator, "descend", wraps=validator.descend,
+        ) as descend:
+            error, = validator.iter_errors(5)
+            self.assertFalse(descend.called)
+            self.assertEqual(len(error.context), 2)
+        self.assertEqual(descend.call_count, 2)
+
+    def test_context_is_read_in_the_scope_it_was_created_in(self):
+        schema = {
+            "id": "http://example.com/",
+            "properties": {
+                "foo": {
+                    "id": "nested/",
+                    "oneOf": [{"$ref": "item.json"}, {"type": "null"}],
+                },
+            },
+        }
+        resolver = RefResolver.from_schema(
+            schema,
+            store={"http://example.com/nested/item.json": {"type": "integer"}},
+        )
+        validator = Draft4Validator(schema, resolver=resolver)
+
+        error, = validator.iter_errors({"foo": "bar"})
+        self.assertEqual(resolver.resolution_scope, "http://example.com/")
+        self.assertEqual(
+            [each.validator for each in error.context], ["type", "type"],
+        )
+        self.assertEqual(resolver.resolution_scope, "http://example.com/")
+
 
 class ValidatorTestMixin(object):
     def setUp(self):
@@ -621,24 +660,32 @@ class ValidatorTestMixin(object):
         self.validator = self.validator_class(self.schema)
 
     def test_valid_instances_are_valid(self):
-        errors = iter([])
-
-        with mock.patch.object(
-            self.validator, "iter_errors", return_value=errors,
-        ):
-            self.assertTrue(
-                self.validator.is_valid(self.instance, self.schema)
-            )
+        self.assertTrue(
+            self.validator.is_valid(self.instance, self.schema)
+        )
 
     def test_invalid_instances_are_not_valid(self):
-        errors = iter([mock.Mock()])
+        self.assertFalse(
+            self.validator.is_valid(self.instance, {"type": "string"})
+        )
 
-        with mock.patch.object(
-            self.validator, "iter_errors", return_value=errors,
-        ):
-            self.assertFalse(
-                self.validator.is_valid(self.instance, self.schema)
-            )
+    def test_is_valid_uses_validators_without_a_predicate(self):
+        def even(validator, value, instance, schema):
+            if instance % 2:
+                yield ValidationError("%r is odd" % (instance,))
+
+        Validator = extend(self.validator_class, {"even": even})
+        self.assertTrue(Validator({"even": True}).is_valid(2))
+        self.assertFalse(Validator({"even": True}).is_valid(3))
+
+    def test_extending_a_validator_drops_its_predicate(self):
+        def minimum(validator, value, instance, schema):
+            if instance != value:
+                yield ValidationError("%r is not %r" % (instance, value))
+
+        Validator = extend(self.validator_class, {"minimum": minimum})
+        self.assertNotIn("minimum", Validator.PREDICATES)
+        self.assertFalse(Validator({"minimum": 2}).is_valid(3))
 
     def test_non_existent_properties_are_ignored(self):
         instance, my_property, my_value = mock.Mock(), mock.Mock(), mock.Mock()
@@ -677,6 +724,129 @@ class ValidatorTestMixin(object):
         with self.assertRaises(ValidationError):
             self.validator_class(schema, resolver=resolver).validate(None)
 
+    def test_enums_are_looked_up_as_with_in(self):
+        enum = [1, "foo", None, {"bar": [1]}, [2]]
+        validator = self.validator_class({"enum": enum})
+        self.assertEqual(validator._enums, {})
+        for instance in [1, 1.0, True, "foo", None, {"bar": [1]}, [2]]:
+            self.assertTrue(validator.is_valid(instance), instance)
+            self.assertEqual(list(validator.iter_errors(instance)), [])
+        for instance in [False, 0, "bar", {"bar": [2]}, [1], {}]:
+            self.assertFalse(validator.is_valid(instance), instance)
+        self.assertEqual(list(validator._enums), [id(enum)])
+
+    def test_enums_are_scanned_once_the_index_is_full(self):
+        enum = [1, [2]]
+        with mock.patch.object(_utils, "INDEX_SIZE", 0):
+            self.assertTrue(self.validator.is_valid([2], {"enum": enum}))
+            self.assertFalse(self.validator.is_valid(2, {"enum": enum}))
+        self.assertEqual(self.validator._enums, {})
+
+    def test_additional_properties_are_found_with_the_index(self):
+        schema = {
+            "properties": {"foo": {}, "bar": {}},
+            "patternProperties": {"^x-": {}, "^y-": {}},
+            "additionalProperties": False,
+        }
+        validator = self.validator_class(schema)
+        self.assertEqual(validator._additional_properties, {})
+
+        with mock.patch.object(_utils, "find_additional_properties") as find:
+            self.assertTrue(validator.is_valid({"foo": 1, "x-1": 2, "y-": 3}))
+            self.assertFalse(validator.is_valid({"foo": 1, "baz": 2}))
+            error, = validator.iter_errors({"bar": 1, "z-": 2, "x-": 3})
+        self.assertFalse(find.called)
+        self.assertEqual(list(validator._additional_properties), [id(schema)])
+        self.assertEqual(
+            error.message,
+            "'z-' does not match any of the regexes: '^x-', '^y-'",
+        )
+
+    def test_additional_properties_are_found_once_the_index_is_full(self):
+        schema = {"properties": {"foo": {}}, "additionalProperties": False}
+        with mock.patch.object(_utils, "INDEX_SIZE", 0):
+            self.assertTrue(self.validator.is_valid({"foo": 1}, schema))
+            self.assertFalse(self.validator.is_valid({"bar": 1}, schema))
+        self.assertEqual(self.validator._additional_properties, {})
+
+    def test_patterns_are_compiled_once(self):
+        schema = {
+            "patternProperties": {"^x-": {"pattern": "^[a-z]+$"}},
+            "additionalProperties": False,
+        }
+        validator = self.validator_class(schema)
+        instance = {"x-foo": "bar", "x-baz": "quux"}
+        validator.validate(instance)
+
+        before = _utils.compile_pattern.cache_info()
+        validator.validate(instance)
+        self.assertFalse(validator.is_valid({"x-foo": "BAR"}))
+        after = _utils.compile_pattern.cache_info()
+        self.assertEqual(after.misses, before.misses)
+        self.assertGreater(after.hits, before.hits)
+
+    def test_memoizes_valid_subtrees(self):
+        calls = []
+
+        def counted(validator, value, instance, schema):
+            calls.append(instance)
+            return ()
+
+        Validator = extend(self.validator_class, {"counted": counted})
+        schema = {"items": {"counted": True}}
+        instance = [{"a": [1]}, {"a": [1]}, {"a": [1]}, {"a": [True]}]
+
+        validator = Validator(schema, memo_size=10)
+        validator.validate(instance)
+        self.assertEqual(calls, [{"a": [1]}, {"a": [True]}])
+        self.assertTrue(validator.is_valid(instance))
+        self.assertEqual(len(calls), 2)
+
+        del calls[:]
+        Validator(schema).validate(instance)
+        self.assertEqual(len(calls), 4)
+
+    def test_memo_only_remembers_valid_subtrees(self):
+        validator = self.validator_class(
+            {"items": {"properties": {"a": {"type": "string"}}}},
+            memo_size=10,
+        )
+        instance = [{"a": 1}, {"a": 1}]
+        self.assertEqual(len(list(validator.iter_errors(instance))), 2)
+        self.assertFalse(validator.is_valid(instance))
+        self.assertEqual(len(validator._memo), 0)
+
+    def test_memo_freezes_each_node_once_per_validation(self):
+        instance = []
+        for _ in range(100):
+            instance = [instance]
+        for method in "is_valid", "validate":
+            validator = self.validator_class(
+                {"items": {"$ref": "#"}}, memo_size=1000,
+            )
+            with mock.patch.object(
+                _utils, "freeze", wraps=_utils.freeze,
+            ) as freeze:
+                getattr(validator, method)(instance)
+            # rather than the thousands it takes to freeze each subtree anew
+            self.assertLess(freeze.call_count, 5 * 100)
+            self.assertFalse(hasattr(validator._calls, "frozen"))
+
+    def test_memo_sees_changes_between_validations(self):
+        validator = self.validator_class(
+            {"items": {"items": {"type": "integer"}}}, memo_size=10,
+        )
+        instance = [[1]]
+        self.assertTrue(validator.is_valid(instance))
+        instance[0][0] = "1"
+        self.assertFalse(validator.is_valid(instance))
+        self.assertEqual(len(list(validator.iter_errors(instance))), 1)
+
+    def test_memo_is_bounded(self):
+        validator = self.validator_class({"items": {}}, memo_size=2)
+        validator.validate([[1], [2], [3], [4]])
+        self.assertEqual(validator._memo.info().currsize, 2)
+
     def test_is_type_is_true_for_valid_type(self):
         self.assertTrue(self.validator.is_type("foo", "string"))
 
@@ -691,6 +861,20 @@ class ValidatorTestMixin(object):
         with self.assertRaises(UnknownType):
             self.validator.is_type("foo", object())
 
+    def test_is_type_does_not_evade_bool_if_it_is_a_custom_type(self):
+        validator = self.validator_class(
+            {}, types={"flag": (bool, (int, float))},
+        )
+        self.assertTrue(validator.is_type(True, "flag"))
+        self.assertTrue(validator.is_type(1.5, "flag"))
+
+    def test_is_type_checks_are_precomputed(self):
+        validator = self.validator_class({}, types={"nested": ((int,),)})
+        with mock.patch("jsonschema._utils.flatten") as flatten:
+            self.assertFalse(validator.is_type(True, "nested"))
+            self.assertTrue(validator.is_type(3, "nested"))
+        self.assertFalse(flatten.called)
+
 
 class TestDraft3Validator(ValidatorTestMixin, unittest.TestCase):
     validator_class = Draft3Validator
@@ -711,6 +895,17 @@ class TestDraft3Validator(ValidatorTestMixin, unittest.TestCase):
 class TestDraft4Validator(ValidatorTestMixin, unittest.TestCase):
     validator_class = Draft4Validator
 
+    def test_is_valid_does_not_create_errors(self):
+        schema = {
+            "anyOf": [{"type": "string"}, {"minimum": 2}],
+            "not": {"enum": [4]},
+        }
+        with mock.patch("jsonschema._validators.ValidationError") as error:
+            self.assertFalse(self.validator.is_valid(1, schema))
+            self.assertFalse(self.validator.is_valid(4, schema))
+            self.assertTrue(self.validator.is_valid(3, schema))
+        self.assertFalse(error.called)
+
 
 class TestBuiltinFormats(unittest.TestCase):
     """
@@ -782,6 +977,91 @@ class TestValidate(unittest.TestCase):
             validate({}, {})
             chk_schema.assert_called_once_with({})
 
+    def test_schemas_are_only_checked_once(self):
+        schema = {"properties": {"checked": {"type": "integer"}}}
+        with mock.patch.object(Draft4Validator, "iter_errors") as iter_errors:
+            iter_errors.return_value = iter(())
+            Draft4Validator.check_schema(schema)
+            Draft4Validator.check_schema(dict(schema))
+            Draft3Validator.check_schema(schema)
+        self.assertEqual(iter_errors.call_count, 1)
+
+    def test_invalid_schemas_are_checked_every_time(self):
+        schema = {"properties": {"checked": {"type": 12}}}
+        for _ in range(2):
+            with self.assertRaises(SchemaError):
+                validate(12, schema)
+
+    def test_schemas_which_cannot_be_frozen_are_checked_every_time(self):
+        schema = {"enum": [set()]}
+        with mock.patch.object(Draft4Validator, "iter_errors") as iter_errors:
+            iter_errors.return_value = iter(())
+            Draft4Validator.check_schema(schema)
+            Draft4Validator.check_schema(schema)
+        self.assertEqual(iter_errors.call_count, 2)
+
+    def test_schemas_differing_only_outside_json_are_checked_apart(self):
+        with mock.patch.object(Draft4Validator, "iter_errors") as iter_errors:
+            iter_errors.return_value = iter(())
+            Draft4Validator.check_schema({"enum": [[1, 2]]})
+            Draft4Validator.check_schema({"enum": [(1, 2)]})
+            Draft4Validator.check_schema({"enum": [{1: 2}]})
+            Draft4Validator.check_schema({"enum": [{"1": 2}]})
+        self.assertEqual(iter_errors.call_count, 4)
+
+    def test_checking_the_same_schema_again_does_not_freeze_it(self):
+        schema = {"properties": {"again": {"type": "string"}}}
+        Draft4Validator.check_schema(schema)
+        with mock.patch.object(_utils, "freeze") as freeze:
+            Draft4Validator.check_schema(schema)
+        self.assertFalse(freeze.called)
+
+
+class TestParse(unittest.TestCase):
+    validator = Draft4Validator({"properties": {"a": {"maxItems": 2}}})
+
+    def test_valid(self):
+        self.assertEqual(
+            parse(u'{"a": [1, 2], "b": null}', self.validator),
+            ({"a": [1, 2], "b": None}, True),
+        )
+
+    def test_invalid(self):
+        self.assertEqual(
+            parse(u'{"a": [1, 2, 3]}', self.validator),
+            ({"a": [1, 2, 3]}, False),
+        )
+
+    def test_bytes_are_decoded_as_utf8(self):
+        document = u'{"a": ["\u00e9"]}'.encode("utf-8")
+        instance, valid = parse(document, self.validator)
+        self.assertEqual(instance, {"a": [u"\u00e9"]})
+        self.assertTrue(valid)
+
+    def test_bytes_with_a_byte_order_mark(self):
+        document = codecs.BOM_UTF8 + u'{"a": ["\u00e9"]}'.encode("utf-8")
+        instance, valid = parse(document, self.validator)
+        self.assertEqual(instance, {"a": [u"\u00e9"]})
+        self.assertTrue(valid)
+
+    @unittest.skipUnless(JSON_LOADS_BYTES, "bytes are only read as UTF-8")
+    def test_bytes_are_decoded_as_utf16_or_utf32(self):
+        for encoding in "utf-16", "utf-16-le", "utf-32", "utf-32-be":
+            document = u'{"a": [1, 2, 3]}'.encode(encoding)
+            self.assertEqual(
+                parse(document, self.validator), ({"a": [1, 2, 3]}, False),
+            )
+
+    def test_documents_which_are_not_json(self):
+        with self.assertRaises(ValueError):
+            parse(u'{"a": ', self.validator)
+
+    def test_instance_is_validated_once(self):
+        with mock.patch.object(self.validator, "is_valid") as is_valid:
+            is_valid.return_value = True
+            parse(u"[]", self.validator)
+        is_valid.assert_called_once_with([])
+
 
 class TestRefResolver(unittest.TestCase):
 
@@ -909,6 +1189,45 @@ class TestRefResolver(unittest.TestCase):
                 pass
         self.assertEqual(str(err.exception), "Oh no! What's this?")
 
+    def test_it_binds_local_refs_to_their_targets(self):
+        schema = {
+            "definitions": {"a": {"type": "integer"}},
+            "properties": {"foo": {"$ref": "#/definitions/a"}},
+            "remote": {"$ref": "foo://stored"},
+            "missing": {"$ref": "#/nope"},
+        }
+        resolver = RefResolver.from_schema(schema)
+        foo = schema["properties"]["foo"]
+        self.assertIs(resolver.bind(foo), schema["definitions"]["a"])
+        with mock.patch.object(resolver, "resolve") as resolve:
+            self.assertIs(resolver.bind(foo), schema["definitions"]["a"])
+        self.assertFalse(resolve.called)
+        self.assertIsNone(resolver.bind(schema["remote"]))
+        self.assertIsNone(resolver.bind(schema["missing"]))
+
+    def test_it_binds_local_refs_again_from_a_different_scope(self):
+        schema = {"a": {"$ref": "#/b"}, "b": 1}
+        other = {"b": 2}
+        resolver = RefResolver.from_schema(
+            schema, store={"http://example.com/": other},
+        )
+        self.assertEqual(resolver.bind(schema["a"]), 1)
+        with resolver.in_scope("http://example.com/"):
+            self.assertEqual(resolver.bind(schema["a"]), 2)
+        self.assertEqual(resolver.bind(schema["a"]), 1)
+
+    def test_bound_refs_do_not_use_the_resolver(self):
+        schema = {
+            "definitions": {"a": {"type": "integer"}},
+            "items": {"$ref": "#/definitions/a"},
+        }
+        validator = Draft4Validator(schema)
+        self.assertTrue(validator.is_valid([1]))
+        with mock.patch.object(validator.resolver, "resolve") as resolve:
+            self.assertTrue(validator.is_valid([1, 2]))
+            self.assertFalse(validator.is_valid([1, "2"]))
+        self.assertFalse(resolve.called)
+
     def test_helpful_error_message_on_failed_pop_scope(self):
         resolver = RefResolver("", {})
         resolver.pop_scope()
@@ -916,6 +1235,66 @@ class TestRefResolver(unittest.TestCase):
             resolver.pop_scope()
         self.assertIn("Failed to pop the scope", str(exc.exception))
 
+    def test_each_thread_has_its_own_scopes(self):
+        resolver = RefResolver("http://example.com/", {})
+        pushed, checked = threading.Event(), threading.Event()
+        scopes = []
+
+        def other_thread():
+            scopes.append(resolver.resolution_scope)
+            with resolver.in_scope("nested/"):
+                pushed.set()
+                checked.wait()
+                scopes.append(resolver.resolution_scope)
+
+        thread = threading.Thread(target=other_thread)
+        with resolver.in_scope("elsewhere/"):
+            thread.start()
+            pushed.wait()
+            self.assertEqual(
+                resolver.resolution_scope, "http://example.com/elsewhere/",
+            )
+            checked.set()
+            thread.join()
+        self.assertEqual(
+            scopes,
+            ["http://example.com/", "http://example.com/nested/"],
+        )
+        self.assertEqual(resolver.resolution_scope, "http://example.com/")
+
+    def test_a_validator_can_be_shared_between_threads(self):
+        schema = {
+            "id": "http://example.com/",
+            "items": {
+                "anyOf": [
+                    {"id": "a/", "$ref": "item.json"},
+                    {"id": "b/", "$ref": "item.json"},
+                ],
+            },
+        }
+        store = {
+            "http://example.com/a/item.json": {"type": "integer"},
+            "http://example.com/b/item.json": {"type": "string"},
+        }
+        validator = Draft4Validator(
+            schema, resolver=RefResolver.from_schema(schema, store=store),
+        )
+        valid, invalid = [1, "2"] * 50, [1, "2", None] * 50
+        results = []
+
+        def validate_many():
+            for _ in range(20):
+                results.append(validator.is_valid(valid))
+                results.append(validator.is_valid(invalid))
+
+        threads = [threading.Thread(target=validate_many) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(results.count(True), results.count(False))
+        self.assertEqual(len(results), 160)
+
 
 class UniqueTupleItemsMixin(object):
     """
@@ -935,6 +1314,45 @@ class UniqueTupleItemsMixin(object):
         self.assertIn("(1, 1) has non-unique elements", str(e.exception))
 
 
+class TestUniq(unittest.TestCase):
+    def test_objects_and_arrays(self):
+        self.assertTrue(_utils.uniq([{"a": 1}, {"a": 2}, {"b": 1}, {}]))
+        self.assertTrue(_utils.uniq([{"a": [1]}, {"a": [2]}, [1], [[1]]]))
+        self.assertFalse(_utils.uniq([{"a": 1, "b": [2]}, {"b": [2], "a": 1}]))
+        self.assertFalse(_utils.uniq([{"a": {"b": [1]}}, {"a": {"b": [1]}}]))
+        self.assertFalse(_utils.uniq([[1], {}, [1.0]]))
+
+    def test_bools_are_only_unique_from_numbers_at_the_top_level(self):
+        self.assertTrue(_utils.uniq([1, True, {}]))
+        self.assertTrue(_utils.uniq([0, False, []]))
+        self.assertFalse(_utils.uniq([{"a": 1}, {"a": True}]))
+        self.assertFalse(_utils.uniq([[0], [False]]))
+
+    def test_unhashable_values_which_are_not_json(self):
+        self.assertTrue(_utils.uniq([{"a": set([1])}, {"a": set([2])}]))
+        self.assertFalse(_utils.uniq([{"a": set([1])}, {"a": set([1])}]))
+
+    def test_similar_objects_are_keyed_structurally(self):
+        distinct = _utils.Distinct()
+        uniq_key = mock.patch.object(
+            _utils, "uniq_key", wraps=_utils.uniq_key,
+        )
+        with uniq_key as key:
+            for id in range(100):
+                self.assertTrue(distinct.add({"id": id, "caps": [id]}))
+            self.assertFalse(key.called)
+            self.assertTrue(distinct.add({"id": 1, "caps": [2]}))
+            self.assertFalse(distinct.add({"caps": [1.0], "id": 1}))
+        keyed = [args for args, kwargs in key.call_args_list if not kwargs]
+        self.assertEqual(
+            keyed, [
+                ({"id": 1, "caps": [1]},),
+                ({"id": 1, "caps": [2]},),
+                ({"caps": [1.0], "id": 1},),
+            ],
+        )
+
+
 class TestDraft4UniqueTupleItems(UniqueTupleItemsMixin, unittest.TestCase):
     validator_class = Draft4Validator
 
@@ -1,18 +1,20 @@
 from __future__ import division
 
 import contextlib
+import hashlib
 import json
 import numbers
+import threading
 
 try:
     import requests
 except ImportError:
     requests = None
 
-from jsonschema import _utils, _validators
+from jsonschema import _predicates, _shapes, _utils, _validators
 from jsonschema.compat import (
     Sequence, urljoin, urlsplit, urldefrag, unquote, urlopen,
-    str_types, int_types, iteritems, lru_cache,
+    str_types, int_types, iteritems, lru_cache, JSON_LOADS_BYTES,
 )
 from jsonschema.exceptions import ErrorTree  # Backwards compat  # noqa: F401
 from jsonschema.exceptions import RefResolutionError, SchemaError, UnknownType
@@ -23,6 +25,12 @@ _unset = _utils.Unset()
 validators = {}
 meta_schemas = _utils.URIDict()
 
+# The schemas which check_schema already found to be valid, by their frozen
+# contents, and by their id() for repeated checks of the same schema object
+# (kept in the entry, so that its id is not reused while it is remembered)
+_checked_schemas = _utils.LRUCache(128)
+_checked_schema_ids = _utils.LRUCache(128)
+
 
 def validates(version):
     """
@@ -51,7 +59,13 @@ def validates(version):
     return _validates
 
 
-def create(meta_schema, validators=(), version=None, default_types=None):  # noqa: C901, E501
+def create(
+    meta_schema,
+    validators=(),
+    version=None,
+    default_types=None,
+    predicates=(),
+):  # noqa: C901
     if default_types is None:
         default_types = {
             u"array": list, u"boolean": bool, u"integer": int_types,
@@ -61,14 +75,23 @@ def create(meta_schema, validators=(), version=None, default_types=None):  # noq
 
     class Validator(object):
         VALIDATORS = dict(validators)
+        PREDICATES = dict(predicates)
         META_SCHEMA = dict(meta_schema)
         DEFAULT_TYPES = dict(default_types)
 
         def __init__(
-            self, schema, types=(), resolver=None, format_checker=None,
+            self,
+            schema,
+            types=(),
+            resolver=None,
+            format_checker=None,
+            memo_size=None,
+            profiler=None,
+            shape_cache_size=None,
         ):
             self._types = dict(self.DEFAULT_TYPES)
             self._types.update(types)
+            self._type_checks = _utils.type_checks(self._types)
 
             if resolver is None:
                 resolver = RefResolver.from_schema(schema)
@@ -77,25 +100,77 @@ def create(meta_schema, validators=(), version=None, default_types=None):  # noq
             self.format_checker = format_checker
             self.schema = schema
 
+            # Filled in for each subschema the first time it is used
+            self._enums = {}
+            self._additional_properties = {}
+
+            if memo_size:
+                self._memo = _utils.LRUCache(memo_size)
+            else:
+                self._memo = None
+            # The memo keys frozen during each thread's current validation
+            self._calls = threading.local()
+
+            if shape_cache_size:
+                self._shapes = _shapes.ShapeCache(self, shape_cache_size)
+            else:
+                self._shapes = None
+
+            if profiler is not None:
+                profiler.attach(self)
+
         @classmethod
         def check_schema(cls, schema):
+            # Like validators, this assumes schemas are not changed once used
+            if _checked_schema_ids.get((cls, id(schema))) is schema:
+                return
+            try:
+                key = cls, _utils.freeze(schema)
+            except TypeError:
+                key = None
+            if key is not None and _checked_schemas.get(key):
+                _checked_schema_ids[cls, id(schema)] = schema
+                return
+
             for error in cls(cls.META_SCHEMA).iter_errors(schema):
                 raise SchemaError.create_from(error)
 
+            if key is not None:
+                _checked_schemas[key] = True
+                _checked_schema_ids[cls, id(schema)] = schema
+
         def iter_errors(self, instance, _schema=None):
             if _schema is None:
+                shapes = self._shapes
+                if shapes is not None and shapes.is_valid(instance):
+                    return
                 _schema = self.schema
 
+                if self._memo is not None and not self._freezing():
+                    self._calls.frozen = {}
+                    try:
+                        for error in self.iter_errors(instance, _schema):
+                            yield error
+                    finally:
+                        del self._calls.frozen
+                    return
+
             scope = _schema.get(u"id")
             if scope:
                 self.resolver.push_scope(scope)
             try:
+                memo_key = self._memo_key(instance, _schema)
+                if memo_key is not None:
+                    if self._memo.get(memo_key) is _schema:
+                        return
+
                 ref = _schema.get(u"$ref")
                 if ref is not None:
                     validators = [(u"$ref", ref)]
                 else:
                     validators = iteritems(_schema)
 
+                failed = False
                 for k, v in validators:
                     validator = self.VALIDATORS.get(k)
                     if validator is None:
@@ -103,6 +178,7 @@ def create(meta_schema, validators=(), version=None, default_types=None):  # noq
 
                     errors = validator(self, v, instance, _schema) or ()
                     for error in errors:
+                        failed = True
                         # set details if not already set by the called fn
                         error._set(
                             validator=k,
@@ -113,6 +189,9 @@ def create(meta_schema, validators=(), version=None, default_types=None):  # noq
                         if k != u"$ref":
                             error.schema_path.appendleft(k)
                         yield error
+
+                if memo_key is not None and not failed:
+                    self._memo[memo_key] = _schema
             finally:
                 if scope:
                     self.resolver.pop_scope()
@@ -130,39 +209,131 @@ def create(meta_schema, validators=(), version=None, default_types=None):  # noq
                 raise error
 
         def is_type(self, instance, type):
-            if type not in self._types:
+            try:
+                pytypes, reject_bool = self._type_checks[type]
+            except KeyError:
                 raise UnknownType(type, instance, self.schema)
-            pytypes = self._types[type]
 
             # bool inherits from int, so ensure bools aren't reported as ints
-            if isinstance(instance, bool):
-                pytypes = _utils.flatten(pytypes)
-                is_number = any(
-                    issubclass(pytype, numbers.Number) for pytype in pytypes
-                )
-                if is_number and bool not in pytypes:
-                    return False
+            if reject_bool and isinstance(instance, bool):
+                return False
             return isinstance(instance, pytypes)
 
         def is_valid(self, instance, _schema=None):
-            error = next(self.iter_errors(instance, _schema), None)
-            return error is None
+            if _schema is None:
+                if self._shapes is not None:
+                    return self._shapes.is_valid(instance)
+                _schema = self.schema
+
+                if self._memo is not None and not self._freezing():
+                    self._calls.frozen = {}
+                    try:
+                        return self.is_valid(instance, _schema)
+                    finally:
+                        del self._calls.frozen
+
+            scope = _schema.get(u"id")
+            if scope:
+                self.resolver.push_scope(scope)
+            try:
+                memo_key = self._memo_key(instance, _schema)
+                if memo_key is not None:
+                    if self._memo.get(memo_key) is _schema:
+                        return True
+
+                ref = _schema.get(u"$ref")
+                if ref is not None:
+                    validators = [(u"$ref", ref)]
+                else:
+                    validators = iteritems(_schema)
+
+                for k, v in validators:
+                    predicate = self.PREDICATES.get(k)
+                    if predicate is not None:
+                        if not predicate(self, v, instance, _schema):
+                            return False
+                        continue
+
+                    validator = self.VALIDATORS.get(k)
+                    if validator is None:
+                        continue
+                    for _ in validator(self, v, instance, _schema) or ():
+                        return False
+
+                if memo_key is not None:
+                    self._memo[memo_key] = _schema
+                return True
+            finally:
+                if scope:
+                    self.resolver.pop_scope()
+
+        def _memo_key(self, instance, schema):
+            """
+            Key the verdict for ``instance`` under ``schema``, when memoizing.
+
+            Only objects and arrays are worth remembering, and the key
+            includes the resolution scope since ``$ref``s depend on it. The
+            memo keeps the schema itself as its value, so that its ``id()``
+            cannot be reused by another schema while the entry is alive.
+
+            The keys of an instance's objects and arrays are kept for the
+            rest of the validation which froze it, so that keying each node
+            of a tree doesn't freeze its subtree over and over again.
+
+            """
+
+            if self._memo is None or not isinstance(instance, (dict, list)):
+                return None
+            try:
+                frozen = _utils.freeze(
+                    instance, getattr(self._calls, "frozen", None),
+                )
+            except TypeError:
+                return None
+            scope = getattr(self.resolver, "resolution_scope", None)
+            return id(schema), scope, frozen
+
+        def _freezing(self):
+            return hasattr(self._calls, "frozen")
 
     if version is not None:
         Validator = validates(version)(Validator)
         Validator.__name__ = version.title().replace(" ", "") + "Validator"
+        # Let pickle find registered validators (e.g. for worker processes)
+        Validator.__qualname__ = Validator.__name__
 
     return Validator
 
 
-def extend(validator, validators, version=None):
+def _schema_digest(schema):
+    """
+    Digest the contents of a schema, or return None if it isn't plain JSON.
+
+    """
+
+    try:
+        dumped = json.dumps(schema, sort_keys=True)
+    except (TypeError, ValueError):
+        return None
+    return hashlib.sha1(dumped.encode("utf-8")).hexdigest()
+
+
+def extend(validator, validators, version=None, predicates=()):
     all_validators = dict(validator.VALIDATORS)
     all_validators.update(validators)
+
+    # A predicate must never shadow the validator function it mirrors
+    all_predicates = dict(
+        (k, v) for k, v in iteritems(getattr(validator, "PREDICATES", {}))
+        if k not in validators
+    )
+    all_predicates.update(predicates)
     return create(
         meta_schema=validator.META_SCHEMA,
         validators=all_validators,
         version=version,
         default_types=validator.DEFAULT_TYPES,
+        predicates=all_predicates,
     )
 
 
@@ -193,6 +364,30 @@ Draft3Validator = create(
         u"uniqueItems": _validators.uniqueItems,
     },
     version="draft3",
+    predicates={
+        u"$ref": _predicates.ref,
+        u"additionalItems": _predicates.additionalItems,
+        u"additionalProperties": _predicates.additionalProperties,
+        u"dependencies": _predicates.dependencies,
+        u"disallow": _predicates.disallow_draft3,
+        u"divisibleBy": _predicates.multipleOf,
+        u"enum": _predicates.enum,
+        u"extends": _predicates.extends_draft3,
+        u"format": _predicates.format,
+        u"items": _predicates.items,
+        u"maxItems": _predicates.maxItems,
+        u"maxLength": _predicates.maxLength,
+        u"maximum": _predicates.maximum,
+        u"minItems": _predicates.minItems,
+        u"minLength": _predicates.minLength,
+        u"minimum": _predicates.minimum,
+        u"multipleOf": _predicates.multipleOf,
+        u"pattern": _predicates.pattern,
+        u"patternProperties": _predicates.patternProperties,
+        u"properties": _predicates.properties_draft3,
+        u"type": _predicates.type_draft3,
+        u"uniqueItems": _predicates.uniqueItems,
+    },
 )
 
 Draft4Validator = create(
@@ -226,6 +421,34 @@ Draft4Validator = create(
         u"uniqueItems": _validators.uniqueItems,
     },
     version="draft4",
+    predicates={
+        u"$ref": _predicates.ref,
+        u"additionalItems": _predicates.additionalItems,
+        u"additionalProperties": _predicates.additionalProperties,
+        u"allOf": _predicates.allOf_draft4,
+        u"anyOf": _predicates.anyOf_draft4,
+        u"dependencies": _predicates.dependencies,
+        u"enum": _predicates.enum,
+        u"format": _predicates.format,
+        u"items": _predicates.items,
+        u"maxItems": _predicates.maxItems,
+        u"maxLength": _predicates.maxLength,
+        u"maxProperties": _predicates.maxProperties_draft4,
+        u"maximum": _predicates.maximum,
+        u"minItems": _predicates.minItems,
+        u"minLength": _predicates.minLength,
+        u"minProperties": _predicates.minProperties_draft4,
+        u"minimum": _predicates.minimum,
+        u"multipleOf": _predicates.multipleOf,
+        u"not": _predicates.not_draft4,
+        u"oneOf": _predicates.oneOf_draft4,
+        u"pattern": _predicates.pattern,
+        u"patternProperties": _predicates.patternProperties,
+        u"properties": _predicates.properties_draft4,
+        u"required": _predicates.required_draft4,
+        u"type": _predicates.type_draft4,
+        u"uniqueItems": _predicates.uniqueItems,
+    },
 )
 
 
@@ -287,7 +510,8 @@ class RefResolver(object):
         self.cache_remote = cache_remote
         self.handlers = dict(handlers)
 
-        self._scopes_stack = [base_uri]
+        self._base_uri = base_uri
+        self._scopes = threading.local()
         self.store = _utils.URIDict(
             (id, validator.META_SCHEMA)
             for id, validator in iteritems(meta_schemas)
@@ -297,6 +521,7 @@ class RefResolver(object):
 
         self._urljoin_cache = urljoin_cache
         self._remote_cache = remote_cache
+        self._bound = {}
 
     @classmethod
     def from_schema(cls, schema, *args, **kwargs):
@@ -317,6 +542,16 @@ class RefResolver(object):
 
         return cls(schema.get(u"id", u""), schema, *args, **kwargs)
 
+    @property
+    def _scopes_stack(self):
+        # Each thread walks its own scopes, so that one resolver (and the
+        # validator holding it) can be used by several threads at once.
+        try:
+            return self._scopes.stack
+        except AttributeError:
+            stack = self._scopes.stack = [self._base_uri]
+            return stack
+
     def push_scope(self, scope):
         self._scopes_stack.append(
             self._urljoin_cache(self.resolution_scope, scope),
@@ -349,6 +584,19 @@ class RefResolver(object):
         finally:
             self.pop_scope()
 
+    @contextlib.contextmanager
+    def _resolved_scope(self, url):
+        """
+        Enter a scope which was already joined against its parent scopes.
+
+        """
+
+        self._scopes_stack.append(url)
+        try:
+            yield
+        finally:
+            self.pop_scope()
+
     @contextlib.contextmanager
     def resolving(self, ref):
         """
@@ -374,6 +622,45 @@ class RefResolver(object):
         url = self._urljoin_cache(self.resolution_scope, ref)
         return url, self._remote_cache(url)
 
+    def bind(self, node):
+        """
+        Resolve the same-document ``$ref`` of ``node``, remembering its target.
+
+        A ``$ref`` which is only a fragment resolves to the same target from
+        anywhere within the same document, so it is resolved the first time
+        it is followed from the current resolution scope, and its target is
+        then returned straight away whenever it is followed from that scope
+        again. Entering the target's scope can be skipped too, as the
+        references within it resolve just as they would from the current one.
+
+        Arguments:
+
+            node (dict):
+
+                the schema whose ``$ref`` to resolve
+
+        Returns:
+
+            the target of the reference, or ``None`` if it is not only a
+            fragment or cannot be resolved (so that following it raises the
+            usual error)
+
+        """
+
+        scope = self.resolution_scope
+        bound = self._bound.get(id(node))
+        if bound is not None and bound[0] is node and bound[1] == scope:
+            return bound[2]
+
+        ref = node.get(u"$ref")
+        if not isinstance(ref, str_types) or not ref.startswith(u"#"):
+            return None
+        try:
+            _, target = self.resolve(ref)
+        except RefResolutionError:
+            return None
+        return _utils.remember(self._bound, node, (scope, target))[2]
+
     def resolve_from_url(self, url):
         url, fragment = urldefrag(url)
         try:
@@ -495,7 +782,8 @@ def validate(instance, schema, cls=None, *args, **kwargs):
 
     :func:`validate` will first verify that the provided schema is itself
     valid, since not doing so can lead to less obvious error messages and fail
-    in less obvious or consistent ways. If you know you have a valid schema
+    in less obvious or consistent ways. Schemas whose contents were already
+    found valid are not checked again. If you know you have a valid schema
     already or don't care, you might prefer using the
     :meth:`~IValidator.validate` method directly on a specific validator
     (e.g. :meth:`Draft4Validator.validate`).
@@ -539,3 +827,45 @@ def validate(instance, schema, cls=None, *args, **kwargs):
         cls = validator_for(schema)
     cls.check_schema(schema)
     cls(schema, *args, **kwargs).validate(instance)
+
+
+def parse(document, validator):
+    """
+    Parse a JSON document and check whether the instance it holds is valid.
+
+        >>> parse('{"name": "TurnOn"}', Draft4Validator({"type": "object"}))
+        ({'name': 'TurnOn'}, True)
+
+    The document is parsed only once, by :func:`json.loads`, and the parsed
+    instance is returned so that callers need not parse it again. Validating
+    each object as the parser builds it (with an ``object_pairs_hook``) would
+    make parsing alone slower than parsing and then validating with a
+    compiled validator.
+
+    Arguments:
+
+        document (str or bytes):
+
+            The JSON document. If bytes, it may be encoded as UTF-8, UTF-16
+            or UTF-32, with or without a byte order mark, as for
+            :func:`json.loads` (but only as UTF-8 before Python 3.6).
+
+        validator (:class:`IValidator`):
+
+            The validator to check the instance with, such as a
+            :class:`~jsonschema.compiler.CompiledValidator`
+
+    Returns:
+
+        a tuple of the instance and whether it is valid
+
+    Raises:
+
+        :exc:`ValueError` if the document is not JSON
+
+    """
+
+    if isinstance(document, (bytes, bytearray)) and not JSON_LOADS_BYTES:
+        document = document.decode("utf-8-sig")
+    instance = json.loads(document)
+    return instance, validator.is_valid(instance)
@@ -0,0 +1,186 @@
+from collections import Counter, defaultdict
+import contextlib
+import io
+import os
+import unittest
+
+from jsonschema import Draft4Validator
+from jsonschema.compiler import compile_schema
+from jsonschema.exceptions import ValidationError
+
+from alexa.skills.smarthome import AlexaDiscoverResponse
+from endpoint_cloud.api_validation import ApiValidation, ApiValidationPolicy
+
+
+SCHEMA = {
+    "$schema": "http://json-schema.org/draft-04/schema#",
+    "properties": {"event": {"required": ["header", "payload"]}},
+}
+
+MESSAGE_SCHEMA_PATH = os.path.join(
+    os.path.dirname(__file__), os.pardir,
+    "alexa_smart_home_message_schema.json",
+)
+
+DISCOVER = ("Alexa.Discovery", "Discover.Response")
+TURN_ON = ("Alexa", "Response")
+
+
+def message(message_type, payload=True):
+    namespace, name = message_type
+    event = {"header": {"namespace": namespace, "name": name}}
+    if payload:
+        event["payload"] = {}
+    return {"event": event}
+
+
+class TestApiValidationPolicy(unittest.TestCase):
+    def verdicts(self, policy, message_type, count):
+        return [policy.should_validate(message_type) for _ in range(count)]
+
+    def test_modes(self):
+        always = ApiValidationPolicy(ApiValidationPolicy.ALWAYS)
+        self.assertEqual(
+            self.verdicts(always, TURN_ON, 3), [True, True, True],
+        )
+        off = ApiValidationPolicy(ApiValidationPolicy.OFF)
+        self.assertEqual(
+            self.verdicts(off, TURN_ON, 3), [False, False, False],
+        )
+
+    def test_unknown_modes(self):
+        with self.assertRaises(ValueError):
+            ApiValidationPolicy("sometimes")
+
+    def test_sampling_starts_with_the_first_of_each_message_type(self):
+        policy = ApiValidationPolicy(ApiValidationPolicy.SAMPLED, rate=3)
+        self.assertEqual(
+            self.verdicts(policy, TURN_ON, 5),
+            [True, False, False, True, False],
+        )
+        self.assertEqual(
+            self.verdicts(policy, DISCOVER, 2), [True, False],
+        )
+
+    def test_rates_per_message_type(self):
+        policy = ApiValidationPolicy(
+            ApiValidationPolicy.SAMPLED,
+            rate=1,
+            rates={"Discover.Response": 2, ("Alexa", "Response"): 0},
+        )
+        self.assertEqual(
+            self.verdicts(policy, DISCOVER, 3), [True, False, True],
+        )
+        self.assertEqual(self.verdicts(policy, TURN_ON, 2), [False, False])
+        self.assertEqual(
+            self.verdicts(policy, ("Alexa", "ErrorResponse"), 2),
+            [True, True],
+        )
+
+    def test_from_environment(self):
+        policy = ApiValidationPolicy.from_environment({
+            "validation_mode": ApiValidationPolicy.SAMPLED,
+            "validation_sample_rate": "10",
+            "validation_rates": "Discover.Response=2, Alexa:Response=0,",
+        })
+        self.assertEqual(policy.mode, ApiValidationPolicy.SAMPLED)
+        self.assertEqual(policy.rate, 10)
+        self.assertEqual(
+            policy.rates, {"Discover.Response": 2, ("Alexa", "Response"): 0},
+        )
+
+    def test_from_an_empty_environment(self):
+        policy = ApiValidationPolicy.from_environment({})
+        self.assertEqual(policy.mode, ApiValidationPolicy.ALWAYS)
+        self.assertEqual(policy.rate, 1)
+        self.assertEqual(policy.rates, {})
+
+    def test_invalid_environment_values_fall_back_to_the_defaults(self):
+        stdout = io.StringIO()
+        with contextlib.redirect_stdout(stdout):
+            policy = ApiValidationPolicy.from_environment({
+                "validation_mode": "sometimes",
+                "validation_sample_rate": "often",
+                "validation_rates": "Discover.Response=x,Response=3",
+            })
+        self.assertEqual(policy.mode, ApiValidationPolicy.ALWAYS)
+        self.assertEqual(policy.rate, 1)
+        self.assertEqual(policy.rates, {"Response": 3})
+        self.assertEqual(stdout.getvalue().count("WARN"), 3)
+
+
+class TestApiValidation(unittest.TestCase):
+    def setUp(self):
+        for name in [
+            "schema_path", "policy", "_validator", "_discovery_stream",
+            "_stats",
+        ]:
+            original = getattr(ApiValidation, name)
+            self.addCleanup(setattr, ApiValidation, name, original)
+        ApiValidation._validator = compile_schema(SCHEMA, Draft4Validator)
+        ApiValidation._discovery_stream = None
+        ApiValidation._stats = defaultdict(Counter)
+
+    def test_counts_validated_skipped_and_failed_messages(self):
+        ApiValidation.policy = ApiValidationPolicy(
+            ApiValidationPolicy.SAMPLED, rate=2,
+        )
+        self.assertTrue(ApiValidation.validate(message(TURN_ON)))
+        self.assertFalse(ApiValidation.validate(message(TURN_ON)))
+        with self.assertRaises(ValidationError):
+            ApiValidation.validate(message(DISCOVER, payload=False))
+        self.assertEqual(
+            ApiValidation.get_stats(), {
+                TURN_ON: {"validated": 1, "skipped": 1},
+                DISCOVER: {"validated": 1, "failed": 1},
+            },
+        )
+
+    def test_skipped_discovery_responses_are_counted(self):
+        ApiValidation.policy = ApiValidationPolicy(ApiValidationPolicy.OFF)
+        discovery = ApiValidation.get_discovery_validation()
+        self.assertFalse(discovery.validate(message(DISCOVER)))
+        self.assertEqual(ApiValidation.get_stats(), {DISCOVER: {"skipped": 1}})
+
+    def test_discovery_responses_must_hold_the_streamed_endpoints(self):
+        ApiValidation.schema_path = MESSAGE_SCHEMA_PATH
+        ApiValidation._validator = None
+        request = {"directive": {"header": {"payloadVersion": "3"}}}
+
+        validation = ApiValidation.get_discovery_validation()
+        discover = AlexaDiscoverResponse(request, validation=validation)
+        discover.add_endpoint({"thingName": "switch_1"})
+        self.assertTrue(validation.validate(discover.get_response()))
+
+        # Nothing was streamed after the reset, so the endpoints are checked
+        validation = ApiValidation.get_discovery_validation()
+        response = discover.get_response()
+        endpoint, = response["event"]["payload"]["endpoints"]
+        endpoint["displayCategories"] = ["BOGUS"]
+        with self.assertRaises(ValidationError):
+            validation.validate(response)
+        self.assertEqual(
+            ApiValidation.get_stats(),
+            {DISCOVER: {"validated": 2, "failed": 1}},
+        )
+
+    def test_discovery_responses_without_a_stream_are_validated_whole(self):
+        # SCHEMA has no oneOf telling Discover.Response messages apart
+        ApiValidation.policy = ApiValidationPolicy(ApiValidationPolicy.ALWAYS)
+        for _ in range(2):
+            validation = ApiValidation.get_discovery_validation()
+            self.assertIs(validation.stream, False)
+            validation.add_endpoint({})
+            self.assertTrue(validation.validate(message(DISCOVER)))
+        with self.assertRaises(ValidationError):
+            ApiValidation.get_discovery_validation().validate(
+                message(DISCOVER, payload=False),
+            )
+        self.assertEqual(
+            ApiValidation.get_stats(),
+            {DISCOVER: {"validated": 3, "failed": 1}},
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
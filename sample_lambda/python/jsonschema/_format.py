@@ -1,4 +1,3 @@
-import datetime
 import re
 import socket
 
@@ -202,25 +201,48 @@ else:
         return rfc3987.parse(instance, rule="URI")
 
 
-try:
-    import strict_rfc3339
-except ImportError:
-    try:
-        import isodate
-    except ImportError:
-        pass
-    else:
-        @_checks_drafts("date-time", raises=(ValueError, isodate.ISO8601Error))
-        def is_datetime(instance):
-            if not isinstance(instance, str_types):
-                return True
-            return isodate.parse_datetime(instance)
-else:
-    @_checks_drafts("date-time")
-    def is_datetime(instance):
-        if not isinstance(instance, str_types):
-            return True
-        return strict_rfc3339.validate_rfc3339(instance)
+# RFC 3339 timestamps are checked with a regex and arithmetic rather than by
+# parsing them, which is faster than strict_rfc3339 or isodate (see
+# jsonschema.benchmarks.date_time) and does not depend on the locale.
+_datetime_re = re.compile(
+    r"^([0-9]{4})-([0-9]{2})-([0-9]{2})[Tt]"
+    r"([0-9]{2}):([0-9]{2}):([0-9]{2})(?:\.[0-9]+)?"
+    r"(?:[Zz]|[+-]([0-9]{2}):([0-9]{2}))\Z"
+)
+_date_re = re.compile(r"^([0-9]{4})-([0-9]{2})-([0-9]{2})\Z")
+_time_re = re.compile(r"^([0-9]{2}):([0-9]{2}):([0-9]{2})\Z")
+_days_in_month = (31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
+
+
+def _is_date(year, month, day):
+    if not 1 <= month <= 12:
+        return False
+    days = _days_in_month[month - 1]
+    if month == 2 and year % 4 == 0 and (year % 100 != 0 or year % 400 == 0):
+        days = 29
+    return 1 <= year and 1 <= day <= days
+
+
+def _is_time(hour, minute, second):
+    # Compares the two digit strings, and allows a leap second (60)
+    return hour <= "23" and minute <= "59" and second <= "60"
+
+
+@_checks_drafts("date-time")
+def is_datetime(instance):
+    if not isinstance(instance, str_types):
+        return True
+    match = _datetime_re.match(instance)
+    if match is None:
+        return False
+    year, month, day, hour, minute, second, offset_hour, offset_minute = (
+        match.groups()
+    )
+    return (
+        _is_date(int(year), int(month), int(day)) and
+        _is_time(hour, minute, second) and
+        (offset_hour is None or _is_time(offset_hour, offset_minute, "00"))
+    )
 
 
 @_checks_drafts("regex", raises=re.error)
@@ -230,18 +252,20 @@ def is_regex(instance):
     return re.compile(instance)
 
 
-@_checks_drafts(draft3="date", raises=ValueError)
+@_checks_drafts(draft3="date")
 def is_date(instance):
     if not isinstance(instance, str_types):
         return True
-    return datetime.datetime.strptime(instance, "%Y-%m-%d")
+    match = _date_re.match(instance)
+    return match is not None and _is_date(*map(int, match.groups()))
 
 
-@_checks_drafts(draft3="time", raises=ValueError)
+@_checks_drafts(draft3="time")
 def is_time(instance):
     if not isinstance(instance, str_types):
         return True
-    return datetime.datetime.strptime(instance, "%H:%M:%S")
+    match = _time_re.match(instance)
+    return match is not None and _is_time(*match.groups())
 
 
 try:
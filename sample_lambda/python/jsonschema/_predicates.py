@@ -0,0 +1,271 @@
+"""
+Boolean counterparts of the keyword functions in :mod:`jsonschema._validators`.
+
+Each predicate takes the same arguments as the corresponding validator
+function but only answers whether the instance is valid, without creating any
+:exc:`ValidationError` (or formatting its message). They back
+:meth:`IValidator.is_valid`, which is what ``anyOf``, ``oneOf`` and ``not``
+use to try their subschemas.
+
+"""
+
+from __future__ import division
+
+from jsonschema import _utils
+from jsonschema.compat import iteritems
+
+
+def patternProperties(validator, patternProperties, instance, schema):
+    if not validator.is_type(instance, "object"):
+        return True
+
+    for pattern, subschema in iteritems(patternProperties):
+        search = _utils.compile_pattern(pattern).search
+        for k, v in iteritems(instance):
+            if search(k) and not validator.is_valid(v, subschema):
+                return False
+    return True
+
+
+def additionalProperties(validator, aP, instance, schema):
+    if not validator.is_type(instance, "object"):
+        return True
+
+    index = getattr(validator, "_additional_properties", None)
+    if validator.is_type(aP, "object"):
+        extras = _utils.additional_properties(index, instance, schema)
+        return all(
+            validator.is_valid(instance[extra], aP) for extra in extras
+        )
+    elif not aP:
+        return not _utils.additional_properties(index, instance, schema)
+    return True
+
+
+def items(validator, items, instance, schema):
+    if not validator.is_type(instance, "array"):
+        return True
+
+    if validator.is_type(items, "object"):
+        return all(validator.is_valid(item, items) for item in instance)
+    return all(
+        validator.is_valid(item, subschema)
+        for item, subschema in zip(instance, items)
+    )
+
+
+def additionalItems(validator, aI, instance, schema):
+    if (
+        not validator.is_type(instance, "array") or
+        validator.is_type(schema.get("items", {}), "object")
+    ):
+        return True
+
+    len_items = len(schema.get("items", []))
+    if validator.is_type(aI, "object"):
+        return all(
+            validator.is_valid(item, aI) for item in instance[len_items:]
+        )
+    elif not aI:
+        return len(instance) <= len_items
+    return True
+
+
+def minimum(validator, minimum, instance, schema):
+    if not validator.is_type(instance, "number"):
+        return True
+
+    if schema.get("exclusiveMinimum", False):
+        return not instance <= minimum
+    return not instance < minimum
+
+
+def maximum(validator, maximum, instance, schema):
+    if not validator.is_type(instance, "number"):
+        return True
+
+    if schema.get("exclusiveMaximum", False):
+        return not instance >= maximum
+    return not instance > maximum
+
+
+def multipleOf(validator, dB, instance, schema):
+    if not validator.is_type(instance, "number"):
+        return True
+
+    if isinstance(dB, float):
+        quotient = instance / dB
+        return int(quotient) == quotient
+    return not instance % dB
+
+
+def minItems(validator, mI, instance, schema):
+    return not validator.is_type(instance, "array") or len(instance) >= mI
+
+
+def maxItems(validator, mI, instance, schema):
+    return not validator.is_type(instance, "array") or len(instance) <= mI
+
+
+def uniqueItems(validator, uI, instance, schema):
+    return (
+        not uI or
+        not validator.is_type(instance, "array") or
+        _utils.uniq(instance)
+    )
+
+
+def pattern(validator, patrn, instance, schema):
+    return (
+        not validator.is_type(instance, "string") or
+        _utils.compile_pattern(patrn).search(instance) is not None
+    )
+
+
+def format(validator, format, instance, schema):
+    return (
+        validator.format_checker is None or
+        validator.format_checker.conforms(instance, format)
+    )
+
+
+def minLength(validator, mL, instance, schema):
+    return not validator.is_type(instance, "string") or len(instance) >= mL
+
+
+def maxLength(validator, mL, instance, schema):
+    return not validator.is_type(instance, "string") or len(instance) <= mL
+
+
+def dependencies(validator, dependencies, instance, schema):
+    if not validator.is_type(instance, "object"):
+        return True
+
+    for property, dependency in iteritems(dependencies):
+        if property not in instance:
+            continue
+
+        if validator.is_type(dependency, "object"):
+            if not validator.is_valid(instance, dependency):
+                return False
+        else:
+            for each in _utils.ensure_list(dependency):
+                if each not in instance:
+                    return False
+    return True
+
+
+def enum(validator, enums, instance, schema):
+    index = getattr(validator, "_enums", None)
+    return _utils.enum_contains(index, enums, instance)
+
+
+def ref(validator, ref, instance, schema):
+    bind = getattr(validator.resolver, "bind", None)
+    bound = None if bind is None else bind(schema)
+    if bound is not None:
+        return validator.is_valid(instance, bound)
+
+    resolve = getattr(validator.resolver, "resolve", None)
+    if resolve is None:
+        with validator.resolver.resolving(ref) as resolved:
+            return validator.is_valid(instance, resolved)
+
+    scope, resolved = validator.resolver.resolve(ref)
+    validator.resolver.push_scope(scope)
+    try:
+        return validator.is_valid(instance, resolved)
+    finally:
+        validator.resolver.pop_scope()
+
+
+def type_draft3(validator, types, instance, schema):
+    for type in _utils.ensure_list(types):
+        if type == "any":
+            return True
+        if validator.is_type(type, "object"):
+            if validator.is_valid(instance, type):
+                return True
+        elif validator.is_type(instance, type):
+            return True
+    return False
+
+
+def properties_draft3(validator, properties, instance, schema):
+    if not validator.is_type(instance, "object"):
+        return True
+
+    for property, subschema in iteritems(properties):
+        if property in instance:
+            if not validator.is_valid(instance[property], subschema):
+                return False
+        elif subschema.get("required", False):
+            return False
+    return True
+
+
+def disallow_draft3(validator, disallow, instance, schema):
+    return not any(
+        validator.is_valid(instance, {"type": [disallowed]})
+        for disallowed in _utils.ensure_list(disallow)
+    )
+
+
+def extends_draft3(validator, extends, instance, schema):
+    if validator.is_type(extends, "object"):
+        return validator.is_valid(instance, extends)
+    return all(
+        validator.is_valid(instance, subschema) for subschema in extends
+    )
+
+
+def type_draft4(validator, types, instance, schema):
+    types = _utils.ensure_list(types)
+    return any(validator.is_type(instance, type) for type in types)
+
+
+def properties_draft4(validator, properties, instance, schema):
+    if not validator.is_type(instance, "object"):
+        return True
+
+    for property, subschema in iteritems(properties):
+        if property in instance:
+            if not validator.is_valid(instance[property], subschema):
+                return False
+    return True
+
+
+def required_draft4(validator, required, instance, schema):
+    if not validator.is_type(instance, "object"):
+        return True
+    return all(property in instance for property in required)
+
+
+def minProperties_draft4(validator, mP, instance, schema):
+    return not validator.is_type(instance, "object") or len(instance) >= mP
+
+
+def maxProperties_draft4(validator, mP, instance, schema):
+    return not validator.is_type(instance, "object") or len(instance) <= mP
+
+
+def allOf_draft4(validator, allOf, instance, schema):
+    return all(validator.is_valid(instance, subschema) for subschema in allOf)
+
+
+def oneOf_draft4(validator, oneOf, instance, schema):
+    found = False
+    for subschema in oneOf:
+        if validator.is_valid(instance, subschema):
+            if found:
+                return False
+            found = True
+    return found
+
+
+def anyOf_draft4(validator, anyOf, instance, schema):
+    return any(validator.is_valid(instance, subschema) for subschema in anyOf)
+
+
+def not_draft4(validator, not_schema, instance, schema):
+    return not validator.is_valid(instance, not_schema)
@@ -0,0 +1,220 @@
+"""
+A cache of validation verdicts keyed by the shape of instances.
+
+Instances with the same shape (the same keys, array lengths and types of
+values throughout) usually only differ in leaf values (ids, tokens,
+timestamps). Once an instance has been validated, the verdict for its shape
+is remembered along with every check which looked at a value rather than at
+the shape, such as ``enum``, ``pattern`` or ``format`` on leaves, or
+``uniqueItems`` on arrays. For a later instance of the same shape only these
+keywords are checked again, and if each gives the same answer as before, so
+does the instance as a whole, since the rest of validation only depends on
+the shape and on these answers.
+
+"""
+
+import threading
+
+from jsonschema import _predicates, _utils
+from jsonschema.compat import iteritems
+
+
+# The keywords whose (built-in) predicates only look at the shape of any
+# instance, and descend into it with is_valid
+_SHAPE_KEYWORDS = frozenset([
+    u"$ref", u"additionalItems", u"additionalProperties", u"allOf",
+    u"anyOf", u"dependencies", u"disallow", u"extends", u"items",
+    u"maxItems", u"maxProperties", u"minItems", u"minProperties", u"not",
+    u"oneOf", u"patternProperties", u"properties", u"required", u"type",
+])
+
+# ... and those which only look at the shape of objects and arrays
+_CONTAINER_KEYWORDS = _SHAPE_KEYWORDS | frozenset([
+    u"maxLength", u"maximum", u"minLength", u"minimum", u"multipleOf",
+    u"pattern",
+])
+
+
+def shape(instance):
+    """
+    Return a hashable key which is equal for instances of the same shape.
+
+    """
+
+    if isinstance(instance, dict):
+        return dict, frozenset(
+            (key, shape(value)) for key, value in iteritems(instance)
+        )
+    elif isinstance(instance, (list, tuple)):
+        return type(instance), tuple(shape(each) for each in instance)
+    return type(instance)
+
+
+class ShapeCache(object):
+    """
+    Remember the verdicts of a validator for instances of up to ``maxsize``
+    shapes.
+
+    """
+
+    def __init__(self, validator, maxsize):
+        self.validator = validator
+        self._verdicts = _utils.LRUCache(maxsize)
+        self._tracer = None
+        self._local = threading.local()
+
+    def is_valid(self, instance):
+        resolver = self.validator.resolver
+        if getattr(resolver, "_resolved_scope", None) is None:
+            return self.validator.is_valid(instance, self.validator.schema)
+
+        try:
+            key = shape(instance)
+        except TypeError:
+            return self.validator.is_valid(instance, self.validator.schema)
+
+        cached = self._verdicts.get(key)
+        if cached is not None:
+            verdict, checks = cached
+            if all(
+                self._recheck(instance, *check) == result
+                for check, result in checks
+            ):
+                return verdict
+
+        verdict, checks = self._trace(instance)
+        if checks is not None:
+            self._verdicts[key] = verdict, checks
+        return verdict
+
+    def _recheck(self, instance, path, schema, scope):
+        for key in path:
+            instance = instance[key]
+        resolver = self.validator.resolver
+        if scope == resolver.resolution_scope:
+            return self.validator.is_valid(instance, schema)
+        with resolver._resolved_scope(scope):
+            return self.validator.is_valid(instance, schema)
+
+    def _trace(self, instance):
+        """
+        Validate ``instance``, recording the checks which look at values.
+
+        Returns the verdict, and the checks with their results (or ``None``
+        if some check could not be located within ``instance``).
+
+        """
+
+        tracer = self._tracer
+        if tracer is None:
+            tracer = self._tracer = self._create_tracer()
+
+        local = self._local
+        local.stack = [(instance, [()])]
+        local.checks = {}
+        local.lost = False
+        try:
+            verdict = tracer.is_valid(instance, tracer.schema)
+        finally:
+            checks, lost = local.checks, local.lost
+            del local.stack, local.checks
+        if lost:
+            return verdict, None
+        return verdict, tuple(
+            (check, result) for check, result in checks.values()
+        )
+
+    def _create_tracer(self):
+        """
+        Create a validator like ours whose ``is_valid`` records the checks.
+
+        """
+
+        validator = self.validator
+        tracer = type(validator)(
+            validator.schema,
+            types=validator._types,
+            resolver=validator.resolver,
+            format_checker=validator.format_checker,
+        )
+        is_valid = type(tracer).is_valid
+        validators, predicates = tracer.VALIDATORS, tracer.PREDICATES
+        local = self._local
+
+        def builtin(keyword):
+            module = getattr(predicates.get(keyword), "__module__", None)
+            return module == _predicates.__name__
+
+        def value_schema(schema, ignored):
+            """
+            Return ``schema`` without the built-in keywords which are
+            ``ignored``, or ``None`` if it has no other keywords left.
+
+            """
+
+            if not isinstance(schema, dict):
+                return schema
+            if u"$ref" in schema:
+                keywords = [u"$ref"]
+            else:
+                keywords = [each for each in schema if each in validators]
+
+            kept = [
+                keyword for keyword in keywords
+                if keyword not in ignored or not builtin(keyword)
+            ]
+            if not kept:
+                return None
+            elif len(kept) == len(keywords):
+                return schema
+            return dict(
+                (keyword, value) for keyword, value in iteritems(schema)
+                if keyword in kept or keyword not in validators
+            )
+
+        def traced(instance, _schema=None):
+            if _schema is None:
+                _schema = tracer.schema
+
+            node, paths = local.stack[-1]
+            if instance is not node:
+                paths = _child_paths(node, paths, instance)
+                if not paths:
+                    local.lost = True
+                    return is_valid(tracer, instance, _schema)
+
+            if isinstance(instance, (dict, list, tuple)):
+                local.stack.append((instance, paths))
+                try:
+                    result = is_valid(tracer, instance, _schema)
+                finally:
+                    local.stack.pop()
+                schema = value_schema(_schema, _CONTAINER_KEYWORDS)
+            else:
+                result = is_valid(tracer, instance, _schema)
+                schema = value_schema(_schema, _SHAPE_KEYWORDS)
+
+            if schema is not None:
+                scope = tracer.resolver.resolution_scope
+                for path in paths:
+                    check = path, schema, scope
+                    local.checks[path, id(_schema), scope] = check, result
+            return result
+
+        tracer.is_valid = traced
+        return tracer
+
+
+def _child_paths(node, paths, child):
+    """
+    Extend each of the ``paths`` of ``node`` to those of ``child`` within it.
+
+    """
+
+    if isinstance(node, dict):
+        keys = [key for key, value in iteritems(node) if value is child]
+    elif isinstance(node, (list, tuple)):
+        keys = [index for index, value in enumerate(node) if value is child]
+    else:
+        keys = []
+    return [path + (key,) for path in paths for key in keys]
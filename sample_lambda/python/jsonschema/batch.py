@@ -0,0 +1,122 @@
+"""
+Validation of many instances at once, spread over a pool of processes.
+
+"""
+
+from timeit import default_timer
+import multiprocessing
+
+from jsonschema.compiler import compile_schema
+from jsonschema.validators import validator_for
+
+
+# The validator of the current worker process, created once by _initialize
+_validator = None
+
+
+def _initialize(schema, cls, kwargs):
+    global _validator
+    _validator = compile_schema(schema, cls, **kwargs)
+
+
+def _errors(indexed):
+    index, instance = indexed
+    return index, list(_validator.iter_errors(instance))
+
+
+def _timed_errors(indexed):
+    start = default_timer()
+    index, errors = _errors(indexed)
+    return index, errors, default_timer() - start
+
+
+def validate_many(
+    instances,
+    schema,
+    cls=None,
+    workers=None,
+    chunksize=1,
+    timed=False,
+    **kwargs
+):
+    """
+    Validate each of ``instances`` under ``schema``, in a pool of processes.
+
+    The schema is checked once, and each worker process compiles its own
+    validator for it once, which then validates every instance sent to it.
+
+    Arguments:
+
+        instances (iterable):
+
+            The instances to validate
+
+        schema:
+
+            The schema to validate them with
+
+        cls (:class:`IValidator`):
+
+            The class that will be used to validate the instances, chosen
+            as :func:`validate` does if not provided
+
+        workers (int):
+
+            The number of worker processes, by default one per CPU. With
+            ``1``, the instances are validated in the current process.
+
+        chunksize (int):
+
+            The number of instances sent to a worker at a time
+
+        timed (bool):
+
+            Whether to also return how long validating each instance took
+
+    Any other keyword arguments are passed on when instantiating ``cls``, and
+    so must be picklable.
+
+    Returns:
+
+        iterable: ``(index, errors)`` tuples, in the order of ``instances``,
+        where ``errors`` is the list of :exc:`ValidationError`\\ s of the
+        instance at ``index``, followed when ``timed`` by the seconds spent
+        validating it
+
+    Raises:
+
+        :exc:`SchemaError` if the schema itself is invalid
+
+    """
+
+    if cls is None:
+        cls = validator_for(schema)
+    cls.check_schema(schema)
+    return _validate_many(
+        instances, schema, cls, workers, chunksize, timed, kwargs,
+    )
+
+
+def _validate_many(instances, schema, cls, workers, chunksize, timed, kwargs):
+    if workers == 1:
+        validator = compile_schema(schema, cls, **kwargs)
+        for index, instance in enumerate(instances):
+            start = default_timer()
+            errors = list(validator.iter_errors(instance))
+            if timed:
+                yield index, errors, default_timer() - start
+            else:
+                yield index, errors
+        return
+
+    pool = multiprocessing.Pool(
+        workers, initializer=_initialize, initargs=(schema, cls, kwargs),
+    )
+    work = _timed_errors if timed else _errors
+    try:
+        for result in pool.imap(work, enumerate(instances), chunksize):
+            yield result
+        pool.close()
+    finally:
+        pool.terminate()
+        pool.join()
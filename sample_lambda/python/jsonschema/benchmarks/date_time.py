@@ -0,0 +1,75 @@
+"""
+A benchmark of the ``date-time`` format checker against the optional
+``strict_rfc3339`` and ``isodate`` packages it replaced, for those which are
+installed.
+
+Run it with ``python -m jsonschema.benchmarks.date_time``.
+
+"""
+
+from __future__ import print_function
+import time
+import timeit
+
+from jsonschema._format import is_datetime
+
+
+# Each shape of timestamp the Alexa message builders emit (timeOfSample)
+TIMESTAMPS = [
+    time.strftime("%Y-%m-%dT%H:%M:%S.00Z", time.gmtime(0)),
+    "2017-02-03T16:20:50.52Z",
+    "2017-09-27T18:30:30.450000Z",
+    "2017-09-27T18:30:30Z",
+    "2017-09-27T18:30:30+01:00",
+    "2016-02-29T23:59:60.1-08:00",
+]
+INVALID = [
+    "2017-02-29T16:20:50.52Z",
+    "2017-02-03T24:20:50.52Z",
+    "2017-02-03 16:20:50.52Z",
+    "2017-02-03T16:20:50.52",
+]
+
+
+def _checkers():
+    yield "jsonschema", is_datetime
+
+    try:
+        import strict_rfc3339
+    except ImportError:
+        pass
+    else:
+        yield "strict_rfc3339", strict_rfc3339.validate_rfc3339
+
+    try:
+        import isodate
+    except ImportError:
+        pass
+    else:
+        def parse(instance):
+            try:
+                return isodate.parse_datetime(instance)
+            except (ValueError, isodate.ISO8601Error):
+                return False
+        yield "isodate", parse
+
+
+def main(number=10000):
+    for name, check in _checkers():
+        results = [bool(check(each)) for each in TIMESTAMPS + INVALID]
+        seconds = timeit.timeit(
+            lambda: [check(each) for each in TIMESTAMPS],
+            number=number,
+        )
+        print(
+            "%-16s %8.3f us per timestamp, %d/%d valid, %d/%d invalid" % (
+                name,
+                seconds / number / len(TIMESTAMPS) * 1e6,
+                sum(results[:len(TIMESTAMPS)]), len(TIMESTAMPS),
+                len(INVALID) - sum(results[len(TIMESTAMPS):]), len(INVALID),
+            ),
+        )
+
+
+if __name__ == "__main__":
+    main()
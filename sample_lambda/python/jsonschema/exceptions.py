@@ -13,6 +13,40 @@ STRONG_MATCHES = frozenset()
 _unset = _utils.Unset()
 
 
+class _LazyMessage(object):
+    """
+    An error message which is only rendered when it is first read.
+
+    Messages usually embed the ``repr`` of the instance, which can be large,
+    while many errors (e.g. those of the branches of ``anyOf``) are never
+    shown to anyone.
+
+    Arguments:
+
+        template:
+
+            A ``%``-format string, or a callable returning the message
+
+        args:
+
+            The arguments to format the template with (or call it with)
+
+    """
+
+    __slots__ = ("template", "args")
+
+    def __init__(self, template, *args):
+        self.template = template
+        self.args = args
+
+    def render(self):
+        if callable(self.template):
+            return self.template(*self.args)
+        return self.template % self.args
+
+    __str__ = render
+
+
 class _Error(Exception):
     def __init__(
         self,
@@ -42,7 +76,7 @@ class _Error(Exception):
         self.message = message
         self.path = self.relative_path = deque(path)
         self.schema_path = self.relative_schema_path = deque(schema_path)
-        self.context = list(context)
+        self.context = context
         self.cause = self.__cause__ = cause
         self.validator = validator
         self.validator_value = validator_value
@@ -50,8 +84,44 @@ class _Error(Exception):
         self.schema = schema
         self.parent = parent
 
-        for error in context:
-            error.parent = self
+    @property
+    def message(self):
+        message = self._message
+        if isinstance(message, _LazyMessage):
+            message = self._message = message.render()
+        return message
+
+    @message.setter
+    def message(self, message):
+        self._message = message
+
+    @property
+    def context(self):
+        """
+        The errors of the subschemas which caused this one, if any.
+
+        Lists and tuples are taken as is, but any other iterable is only
+        consumed (and its errors created) when this attribute is first read.
+
+        """
+
+        context = self._context
+        if not isinstance(context, list):
+            context = self.context = list(context)
+        return context
+
+    @context.setter
+    def context(self, context):
+        if isinstance(context, (list, tuple)):
+            context = list(context)
+            for error in context:
+                error.parent = self
+        self._context = context
+
+    def __reduce__(self):
+        # Render the lazy parts, which may not be picklable, beforehand.
+        self.message, self.context
+        return self.__class__, (self.message,), self.__dict__
 
     def __repr__(self):
         return "<%s: %r>" % (self.__class__.__name__, self.message)
@@ -0,0 +1,267 @@
+"""
+Validation of an instance with a large array in it, one item at a time.
+
+An :class:`ArrayStream` validates each item of the array as it is produced,
+so that invalid items are reported straight away rather than once the whole
+instance has been built, and the rest of the instance (its envelope) once at
+the end without descending into the array again.
+
+"""
+
+from jsonschema import _utils
+from jsonschema.compiler import CompiledValidator, compile_schema
+from jsonschema.compat import iteritems
+from jsonschema.exceptions import ValidationError, _LazyMessage
+
+
+# The keywords of the array's own schema which are checked incrementally
+_STREAMED = frozenset(["items", "maxItems", "minItems", "type", "uniqueItems"])
+
+
+class ArrayStream(object):
+    """
+    Validate an instance whose array at ``path`` is built one item at a time.
+
+    Arguments:
+
+        validator (:class:`IValidator`):
+
+            A validator for the schema the instance is valid under (or for
+            a schema containing it), used to validate the items and the
+            envelope and to resolve their ``$ref``\\ s. If it is a
+            :class:`CompiledValidator`, the items schema is compiled too.
+
+        path (iterable):
+
+            The property names leading from the instance to the array, each
+            of which must be in the ``properties`` of the (sub)schema before
+            it, without going through ``$ref``\\ s or the like
+
+        schema (dict):
+
+            The schema of the instance, by default ``validator.schema``
+
+        schema_path (iterable):
+
+            The location of ``schema`` within ``validator.schema`` (such as
+            ``["oneOf", 2]``), prefixed to the ``schema_path`` of errors so
+            that they are located as if validated by ``validator`` itself
+
+    Raises:
+
+        :exc:`ValueError` if the array's schema is not reached by ``path`` or
+        uses keywords which cannot be checked one item at a time
+
+    """
+
+    def __init__(self, validator, path, schema=None, schema_path=()):
+        if schema is None:
+            schema = validator.schema
+
+        self.validator = validator
+        self.path = tuple(path)
+        self.schema_path = tuple(schema_path)
+        self.envelope_schema, self.array_schema = _split(schema, self.path)
+
+        if isinstance(validator, CompiledValidator):
+            keywords = validator.validator.VALIDATORS
+        else:
+            keywords = validator.VALIDATORS
+        for keyword in self.array_schema:
+            if keyword in keywords and keyword not in _STREAMED:
+                raise ValueError(
+                    "%r cannot be checked one item at a time" % (keyword,),
+                )
+
+        items = self.array_schema.get(u"items", {})
+        if not validator.is_type(items, "object"):
+            raise ValueError("Only a single items schema can be streamed")
+        self.items_schema = items
+        self._items = _subschema_validator(validator, items)
+        self._array = None
+        self.reset()
+
+    def reset(self):
+        """
+        Start over with another instance.
+
+        Reusing a stream avoids preparing (and compiling) its schemas again.
+
+        """
+
+        self.count = 0
+        self._appended = []
+        if self.array_schema.get(u"uniqueItems", False):
+            self._distinct, self._unhashable = _utils.Distinct(), []
+        else:
+            self._distinct = self._unhashable = None
+
+    def append(self, item):
+        """
+        Validate the next item of the array.
+
+        Raises:
+
+            :exc:`ValidationError` if the item is invalid under the items
+            schema, makes the array too long or is a duplicate of an earlier
+            item (with ``uniqueItems``)
+
+        """
+
+        index = self.count
+        for error in self._items.iter_errors(item):
+            error.path.appendleft(index)
+            error.schema_path.appendleft(u"items")
+            raise self._located(error)
+
+        max_items = self.array_schema.get(u"maxItems")
+        if max_items is not None and index >= max_items:
+            raise self._array_error(
+                "maxItems",
+                max_items,
+                "The array has more than %r items" % (max_items,),
+            )
+
+        if self._distinct is not None and not self._unique(item):
+            raise self._array_error(
+                "uniqueItems", True, _LazyMessage(
+                    "%r is a duplicate of an earlier item", item,
+                ),
+            )
+
+        self._appended.append(item)
+        self.count += 1
+
+    def finish(self, instance):
+        """
+        Validate the rest of the instance, once all of the array was added.
+
+        The items of the array within ``instance`` are not descended into
+        again as long as they are the very items which were appended (and
+        were not changed since), so this takes the same time however long it
+        is. Any other array is validated as a whole instead.
+
+        Raises:
+
+            :exc:`ValidationError` if the envelope is invalid, or the array
+            has too few items or is invalid
+
+        """
+
+        errors = self.validator.iter_errors(instance, self.envelope_schema)
+        for error in errors:
+            error.schema_path.extendleft(reversed(self.schema_path))
+            raise error
+
+        array = instance
+        for name in self.path:
+            if not self.validator.is_type(array, "object"):
+                return
+            elif name not in array:
+                return
+            array = array[name]
+
+        if not self._was_appended(array):
+            if self._array is None:
+                self._array = _subschema_validator(
+                    self.validator, self.array_schema,
+                )
+            for error in self._array.iter_errors(array):
+                raise self._located(error)
+            return
+
+        min_items = self.array_schema.get(u"minItems")
+        if min_items is not None and self.count < min_items:
+            raise self._array_error(
+                "minItems",
+                min_items,
+                "The array has fewer than %r items" % (min_items,),
+            )
+
+    def _was_appended(self, array):
+        appended = self._appended
+        if not self.validator.is_type(array, "array"):
+            return False
+        return len(array) == len(appended) and all(
+            item is each for item, each in zip(array, appended)
+        )
+
+    def _unique(self, item):
+        try:
+            return self._distinct.add(item)
+        except TypeError:
+            item = _utils.unbool(item)
+            if item in self._unhashable:
+                return False
+            self._unhashable.append(item)
+            return True
+
+    def _array_error(self, keyword, value, message):
+        error = ValidationError(
+            message,
+            validator=keyword,
+            validator_value=value,
+            schema=self.array_schema,
+            schema_path=[keyword],
+        )
+        return self._located(error)
+
+    def _located(self, error):
+        for name in reversed(self.path):
+            error.path.appendleft(name)
+            error.schema_path.extendleft([name, u"properties"])
+        error.schema_path.extendleft(reversed(self.schema_path))
+        return error
+
+
+def _subschema_validator(validator, schema):
+    if not isinstance(validator, CompiledValidator):
+        return _Subschema(validator, schema)
+    return compile_schema(
+        schema,
+        type(validator.validator),
+        resolver=validator.resolver,
+        format_checker=validator.format_checker,
+    )
+
+
+class _Subschema(object):
+    def __init__(self, validator, schema):
+        self.validator = validator
+        self.schema = schema
+
+    def iter_errors(self, instance):
+        return self.validator.iter_errors(instance, self.schema)
+
+
+def _split(schema, path):
+    """
+    Return a copy of ``schema`` not descending into the array at ``path``, and
+    the array's schema.
+
+    Only the schemas along ``path`` are copied, and in the copy the array's
+    schema keeps only its ``type``.
+
+    """
+
+    if not path:
+        raise ValueError("The path to the array is empty")
+
+    name, rest = path[0], path[1:]
+    properties = schema.get(u"properties", {})
+    if not isinstance(properties, dict) or name not in properties:
+        raise ValueError("%r is not one of the schema's properties" % (name,))
+
+    if rest:
+        subschema, array = _split(properties[name], rest)
+    else:
+        array = properties[name]
+        subschema = dict(
+            (keyword, value) for keyword, value in iteritems(array)
+            if keyword == u"type"
+        )
+
+    envelope = dict(schema)
+    envelope[u"properties"] = dict(properties)
+    envelope[u"properties"][name] = subschema
+    return envelope, array
@@ -5,7 +5,10 @@ Tests for the parts of jsonschema related to the :validator:`format` property.
 
 from jsonschema.tests.compat import mock, unittest
 
-from jsonschema import FormatError, ValidationError, FormatChecker
+from jsonschema import (
+    FormatError, ValidationError, FormatChecker, draft3_format_checker,
+    draft4_format_checker,
+)
 from jsonschema.validators import Draft4Validator
 
 
@@ -61,3 +64,63 @@ class TestFormatChecker(unittest.TestCase):
             validator.validate("bar")
 
         self.assertIs(cm.exception.__cause__, cause)
+
+
+class TestDateTime(unittest.TestCase):
+    def assertConforms(self, instances, format, checker=draft4_format_checker):
+        for instance in instances:
+            self.assertTrue(checker.conforms(instance, format), instance)
+
+    def assertDoesNotConform(
+        self, instances, format, checker=draft4_format_checker,
+    ):
+        for instance in instances:
+            self.assertFalse(checker.conforms(instance, format), instance)
+
+    def test_date_time(self):
+        self.assertConforms(
+            [
+                "2017-02-03T16:20:50.52Z",
+                "2017-02-03T16:20:50.00Z",
+                "2017-02-03T16:20:50.123456Z",
+                "2017-02-03t16:20:50z",
+                "2017-02-03T16:20:50+01:00",
+                "2016-02-29T23:59:60-23:59",
+                12,
+            ],
+            "date-time",
+        )
+
+    def test_invalid_date_time(self):
+        self.assertDoesNotConform(
+            [
+                "2017-02-29T16:20:50Z",
+                "1900-02-29T16:20:50Z",
+                "0000-01-01T16:20:50Z",
+                "2017-13-03T16:20:50Z",
+                "2017-04-31T16:20:50Z",
+                "2017-02-03T24:20:50Z",
+                "2017-02-03T16:60:50Z",
+                "2017-02-03T16:20:61Z",
+                "2017-02-03T16:20:50+24:00",
+                "2017-02-03T16:20:50.Z",
+                "2017-02-03T16:20:50",
+                "2017-02-03 16:20:50Z",
+                "2017-2-3T16:20:50Z",
+                "2017-02-03T16:20:50Z\n",
+                u"\u0662017-02-03T16:20:50Z",
+            ],
+            "date-time",
+        )
+
+    def test_date_and_time(self):
+        self.assertConforms(["2000-02-29"], "date", draft3_format_checker)
+        self.assertDoesNotConform(
+            ["2001-02-29", "2001-2-3", "20010203"],
+            "date",
+            draft3_format_checker,
+        )
+        self.assertConforms(["23:59:60"], "time", draft3_format_checker)
+        self.assertDoesNotConform(
+            ["24:00:00", "1:02:03", "12:00"], "time", draft3_format_checker,
+        )
@@ -0,0 +1,191 @@
+from jsonschema import (
+    Draft3Validator, Draft4Validator, RefResolver, ValidationError, _shapes,
+    validators,
+)
+from jsonschema.tests.compat import mock, unittest
+
+
+SCHEMA = {
+    "definitions": {
+        "id": {"type": "string", "minLength": 1, "pattern": "^[a-z]+$"},
+    },
+    "type": "object",
+    "required": ["header", "endpoints"],
+    "properties": {
+        "header": {
+            "properties": {
+                "name": {"enum": ["Discover", "Response"]},
+                "id": {"$ref": "#/definitions/id"},
+            },
+        },
+        "endpoints": {
+            "type": "array",
+            "uniqueItems": True,
+            "items": {
+                "oneOf": [
+                    {"properties": {"id": {"$ref": "#/definitions/id"}}},
+                    {"properties": {"id": {"type": "integer"}}},
+                ],
+            },
+        },
+    },
+}
+
+
+def message(name=u"Discover", id=u"abc", endpoints=(u"a", u"b")):
+    return {
+        u"header": {u"name": name, u"id": id},
+        u"endpoints": [{u"id": each} for each in endpoints],
+    }
+
+
+class TestShape(unittest.TestCase):
+    def test_equal_for_different_leaf_values(self):
+        self.assertEqual(
+            _shapes.shape({"a": [1, "x"], "b": None}),
+            _shapes.shape({"b": None, "a": [2, "y"]}),
+        )
+
+    def test_differs_for_keys_lengths_and_types(self):
+        shape = _shapes.shape({"a": [1, "x"]})
+        self.assertNotEqual(shape, _shapes.shape({"b": [1, "x"]}))
+        self.assertNotEqual(shape, _shapes.shape({"a": [1, "x", "y"]}))
+        self.assertNotEqual(shape, _shapes.shape({"a": [1.0, "x"]}))
+        self.assertNotEqual(shape, _shapes.shape({"a": [True, "x"]}))
+        self.assertNotEqual(shape, _shapes.shape({"a": (1, "x")}))
+
+
+class TestShapeCache(unittest.TestCase):
+    def setUp(self):
+        self.validator = Draft4Validator(SCHEMA, shape_cache_size=10)
+        self.shapes = self.validator._shapes
+
+    def assertVerdicts(self, instances):
+        uncached = Draft4Validator(SCHEMA)
+        for instance in instances:
+            self.assertEqual(
+                self.validator.is_valid(instance),
+                uncached.is_valid(instance),
+                instance,
+            )
+
+    def test_same_shape_is_not_validated_again(self):
+        self.assertTrue(self.validator.is_valid(message()))
+        with mock.patch.object(self.shapes, "_trace") as trace:
+            self.assertTrue(self.validator.is_valid(message(id=u"xyz")))
+            self.assertTrue(
+                self.validator.is_valid(message(endpoints=[u"c", u"d"])),
+            )
+        self.assertFalse(trace.called)
+
+    def test_only_values_are_checked_again(self):
+        self.validator.is_valid(message())
+        _, checks = self.shapes._verdicts.get(_shapes.shape(message()))
+        self.assertEqual(
+            sorted((path, sorted(schema)) for (path, schema, _), _ in checks),
+            [
+                (("endpoints",), ["uniqueItems"]),
+                (("endpoints", 0, "id"), ["minLength", "pattern"]),
+                (("endpoints", 1, "id"), ["minLength", "pattern"]),
+                (("header", "id"), ["minLength", "pattern"]),
+                (("header", "name"), ["enum"]),
+            ],
+        )
+
+    def test_invalid_values(self):
+        self.assertVerdicts([
+            message(),
+            message(name=u"Other"),
+            message(id=u""),
+            message(id=u"ABC"),
+            message(endpoints=[u"a", u"a"]),
+            message(endpoints=[u"a", u"B"]),
+            message(),
+        ])
+
+    def test_values_deciding_between_subschemas(self):
+        self.assertVerdicts([
+            message(endpoints=[u"a", 1]),
+            message(endpoints=[u"a", 2]),
+            message(endpoints=[u"A", 1]),
+            message(endpoints=[u"a", u"b"]),
+            message(endpoints=[1, 1]),
+        ])
+
+    def test_different_shapes(self):
+        self.assertVerdicts([
+            message(),
+            message(id=1),
+            message(endpoints=[u"a"]),
+            message(endpoints=[]),
+            {u"header": {}},
+            [],
+        ])
+        self.assertEqual(self.shapes._verdicts.info().currsize, 6)
+
+    def test_objects_appearing_more_than_once(self):
+        header = {u"name": u"Discover", u"id": u"abc"}
+        endpoint = {u"id": u"a"}
+        instance = {u"header": header, u"endpoints": [endpoint, endpoint]}
+        self.assertVerdicts([instance])
+
+        endpoint[u"id"] = u"A"
+        self.assertVerdicts([instance])
+
+    def test_iter_errors(self):
+        self.assertEqual(list(self.validator.iter_errors(message())), [])
+        errors = list(self.validator.iter_errors(message(id=u"ABC")))
+        self.assertEqual(
+            [list(error.path) for error in errors], [["header", "id"]],
+        )
+
+    def test_scopes(self):
+        child = {
+            "id": "http://example.com/child.json",
+            "definitions": {"s": {"enum": [1]}},
+            "properties": {"x": {"$ref": "#/definitions/s"}},
+        }
+        schema = {
+            "id": "http://example.com/root.json",
+            "definitions": {"s": {"enum": [2]}},
+            "properties": {
+                "a": {"$ref": "child.json"},
+                "b": {"$ref": "#/definitions/s"},
+            },
+        }
+        resolver = RefResolver.from_schema(
+            schema, store={child["id"]: child},
+        )
+        validator = Draft4Validator(
+            schema, resolver=resolver, shape_cache_size=10,
+        )
+        self.assertTrue(validator.is_valid({"a": {"x": 1}, "b": 2}))
+        self.assertFalse(validator.is_valid({"a": {"x": 2}, "b": 2}))
+        self.assertFalse(validator.is_valid({"a": {"x": 1}, "b": 1}))
+
+    def test_value_keywords_of_other_validators(self):
+        def small(validator, value, instance, schema):
+            if validator.is_type(instance, "array") and sum(instance) > value:
+                yield ValidationError("too big")
+
+        Validator = validators.extend(Draft4Validator, {"maxItems": small})
+        validator = Validator({"maxItems": 3}, shape_cache_size=10)
+        self.assertTrue(validator.is_valid([1, 2]))
+        self.assertFalse(validator.is_valid([1, 3]))
+
+    def test_draft3(self):
+        schema = {
+            "properties": {
+                "a": {"type": ["null", {"pattern": "^a"}], "required": True},
+            },
+        }
+        validator = Draft3Validator(schema, shape_cache_size=10)
+        self.assertTrue(validator.is_valid({"a": "ab"}))
+        self.assertFalse(validator.is_valid({"a": "ba"}))
+        self.assertFalse(validator.is_valid({}))
+
+    def test_is_bounded(self):
+        validator = Draft4Validator({}, shape_cache_size=2)
+        for instance in [[], [1], [1, 2], [1, 2, 3]]:
+            validator.is_valid(instance)
+        self.assertEqual(validator._shapes._verdicts.info().currsize, 2)
@@ -30,7 +30,8 @@ from urllib.parse import urlparse
 from datetime import datetime
 
 # Imports for v3 validation
-from validation import validate_message
+from validation import (EXECUTE_ASYNC, ValidationWorker, execution_from_environment, preload_validator,
+                        validate_message)
 
 import boto3
 from boto3.dynamodb.conditions import Attr
@@ -46,6 +47,18 @@ logging.getLogger('nose').setLevel(logging.WARNING)
 DYNAMODB = boto3.resource('dynamodb')
 USERS_TABLE = DYNAMODB.Table('users')
 
+# Load and check the v3 validation schema once, while the container initializes. If that fails, the
+# error is logged and v3 responses go unvalidated, rather than every directive failing.
+preload_validator(logger)
+
+# Set VALIDATION_EXECUTION to "async" to validate v3 responses in a background thread, which logs
+# failures instead of raising them. "sync" validates before responding. In async mode, the handler can
+# also wait up to VALIDATION_DRAIN_TIMEOUT seconds (0 by default) for the worker before returning.
+# Waiting puts validation back on the response path, trading latency for not losing failures when the
+# container is frozen, so keep it short.
+VALIDATION_EXECUTION, VALIDATION_DRAIN_TIMEOUT = execution_from_environment(logger=logger)
+VALIDATION_WORKER = ValidationWorker(logger)
+
 # To simplify this sample Lambda, we omit validation of access tokens and retrieval of a specific
 # user's appliances. Instead, this array includes a variety of virtual appliances in v2 API syntax,
 # and will be used to demonstrate transformation between v2 appliances and v3 endpoints.
@@ -99,8 +112,17 @@ def lambda_handler(request, context):
         logger.info(json.dumps(response, indent=4, sort_keys=True))
 
         if version == "3":
-            logger.info("Validate v3 response")
-            validate_message(request, response)
+            if VALIDATION_EXECUTION == EXECUTE_ASYNC:
+                logger.info("Queue v3 response for validation")
+                VALIDATION_WORKER.submit(request, response)
+                # Lambda freezes the container once the handler returns. Responses still pending then
+                # are validated (and their failures logged) only when the container thaws for its next
+                # invocation, and never if it is not reused, unless the worker is given time to finish.
+                if VALIDATION_DRAIN_TIMEOUT:
+                    VALIDATION_WORKER.drain(VALIDATION_DRAIN_TIMEOUT)
+            else:
+                logger.info("Validate v3 response")
+                validate_message(request, response)
 
         return response
     except KeyError as error:
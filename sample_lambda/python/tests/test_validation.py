@@ -0,0 +1,335 @@
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+import validation
+from jsonschema.compiler import CompiledValidator
+from jsonschema.exceptions import ValidationError
+from jsonschema.shards import ShardedValidator
+from validation import (
+    VALIDATE_ALWAYS, VALIDATE_OFF, VALIDATE_SAMPLED, ValidationPolicy,
+)
+
+
+SCHEMA = {
+    "$schema": "http://json-schema.org/draft-04/schema#",
+    "properties": {"event": {"required": ["header", "payload"]}},
+}
+
+SHARDED_SCHEMA = {
+    "$schema": "http://json-schema.org/draft-04/schema#",
+    "oneOf": [
+        {
+            "properties": {
+                "event": {
+                    "properties": {
+                        "header": {
+                            "properties": {"name": {"enum": [name]}},
+                        },
+                    },
+                },
+            },
+        } for name in ["Response", "Discover.Response"]
+    ],
+}
+
+DISCOVER = ("Alexa.Discovery", "Discover.Response")
+TURN_ON = ("Alexa", "Response")
+
+
+def message(message_type, payload=True):
+    namespace, name = message_type
+    event = {"header": {"namespace": namespace, "name": name}}
+    if payload:
+        event["payload"] = {}
+    return {"event": event}
+
+
+class TestExecutionFromEnvironment(unittest.TestCase):
+    def test_from_environment(self):
+        self.assertEqual(
+            validation.execution_from_environment({
+                "VALIDATION_EXECUTION": "async",
+                "VALIDATION_DRAIN_TIMEOUT": "0.5",
+            }),
+            ("async", 0.5),
+        )
+
+    def test_from_an_empty_environment(self):
+        self.assertEqual(
+            validation.execution_from_environment({}), ("sync", 0),
+        )
+
+    def test_invalid_values_fall_back_to_the_defaults(self):
+        for drain_timeout in "soon", "-1", "nan":
+            with self.assertLogs(validation.__name__, "WARNING") as logs:
+                execution = validation.execution_from_environment({
+                    "VALIDATION_EXECUTION": "asynch",
+                    "VALIDATION_DRAIN_TIMEOUT": drain_timeout,
+                })
+            self.assertEqual(execution, ("sync", 0))
+            self.assertEqual(len(logs.records), 2)
+
+
+class TestLoadValidator(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.addCleanup(validation.clear_validator)
+        self.schema_path = os.path.join(self.directory, "schema.json")
+        self.shards_path = os.path.join(self.directory, "schema.shards")
+        self.write_schema(SHARDED_SCHEMA)
+
+    def write_schema(self, schema):
+        with open(self.schema_path, "w") as schema_file:
+            json.dump(schema, schema_file)
+
+    def load(self):
+        return validation.load_validator(
+            self.schema_path,
+            path_to_artifact=None,
+            path_to_shards=self.shards_path,
+        )
+
+    def test_uses_shards_of_the_same_schema(self):
+        validation.build_schema_shards(self.schema_path, self.shards_path)
+        self.assertIsInstance(self.load(), ShardedValidator)
+
+    def test_ignores_shards_of_another_schema(self):
+        validation.build_schema_shards(self.schema_path, self.shards_path)
+        stat = os.stat(self.schema_path)
+        changed = dict(SHARDED_SCHEMA, required=["context"])
+        self.write_schema(changed)
+        # e.g. as flattened by zipping the deployment package
+        os.utime(self.schema_path, (stat.st_atime, stat.st_mtime - 60))
+
+        validator = self.load()
+        self.assertNotIsInstance(validator, ShardedValidator)
+        self.assertFalse(validator.is_valid(message(TURN_ON)))
+
+    def test_without_shards(self):
+        self.assertNotIsInstance(self.load(), ShardedValidator)
+
+    def test_without_prebuilt_validators_interprets_the_schema(self):
+        validator = self.load()
+        self.assertNotIsInstance(validator, CompiledValidator)
+        self.assertTrue(validator.is_valid(message(TURN_ON)))
+
+    def test_uses_an_artifact_of_the_same_schema(self):
+        artifact_path = os.path.join(self.directory, "schema.compiled")
+        validation.build_validator_artifact(self.schema_path, artifact_path)
+        validator = validation.load_validator(
+            self.schema_path,
+            path_to_artifact=artifact_path,
+            path_to_shards=None,
+        )
+        self.assertIsInstance(validator, CompiledValidator)
+
+
+class TestValidationPolicy(unittest.TestCase):
+    def verdicts(self, policy, message_type, count):
+        return [policy.should_validate(message_type) for _ in range(count)]
+
+    def test_modes(self):
+        self.assertEqual(
+            self.verdicts(ValidationPolicy(VALIDATE_ALWAYS), TURN_ON, 3),
+            [True, True, True],
+        )
+        self.assertEqual(
+            self.verdicts(ValidationPolicy(VALIDATE_OFF), TURN_ON, 3),
+            [False, False, False],
+        )
+
+    def test_unknown_modes(self):
+        with self.assertRaises(ValueError):
+            ValidationPolicy("sometimes")
+
+    def test_sampling_starts_with_the_first_of_each_message_type(self):
+        policy = ValidationPolicy(VALIDATE_SAMPLED, rate=3)
+        self.assertEqual(
+            self.verdicts(policy, TURN_ON, 5),
+            [True, False, False, True, False],
+        )
+        self.assertEqual(
+            self.verdicts(policy, DISCOVER, 2), [True, False],
+        )
+
+    def test_rates_per_message_type(self):
+        policy = ValidationPolicy(
+            VALIDATE_SAMPLED,
+            rate=1,
+            rates={"Discover.Response": 2, ("Alexa", "Response"): 0},
+        )
+        self.assertEqual(
+            self.verdicts(policy, DISCOVER, 3), [True, False, True],
+        )
+        self.assertEqual(self.verdicts(policy, TURN_ON, 2), [False, False])
+        self.assertEqual(
+            self.verdicts(policy, ("Alexa", "ErrorResponse"), 2),
+            [True, True],
+        )
+
+    def test_from_environment(self):
+        policy = ValidationPolicy.from_environment({
+            "VALIDATION_MODE": VALIDATE_SAMPLED,
+            "VALIDATION_SAMPLE_RATE": "10",
+            "VALIDATION_RATES": "Discover.Response=2, Alexa:Response=0,",
+        })
+        self.assertEqual(policy.mode, VALIDATE_SAMPLED)
+        self.assertEqual(policy.rate, 10)
+        self.assertEqual(
+            policy.rates, {"Discover.Response": 2, ("Alexa", "Response"): 0},
+        )
+
+    def test_from_an_empty_environment(self):
+        policy = ValidationPolicy.from_environment({})
+        self.assertEqual(policy.mode, VALIDATE_ALWAYS)
+        self.assertEqual(policy.rate, 1)
+        self.assertEqual(policy.rates, {})
+
+    def test_invalid_environment_values_fall_back_to_the_defaults(self):
+        with self.assertLogs(validation.__name__, "WARNING") as logs:
+            policy = ValidationPolicy.from_environment({
+                "VALIDATION_MODE": "sometimes",
+                "VALIDATION_SAMPLE_RATE": "often",
+                "VALIDATION_RATES": "Discover.Response=x,Response=3",
+            })
+        self.assertEqual(policy.mode, VALIDATE_ALWAYS)
+        self.assertEqual(policy.rate, 1)
+        self.assertEqual(policy.rates, {"Response": 3})
+        self.assertEqual(len(logs.records), 3)
+
+
+class LoadedValidatorMixin(object):
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        path = os.path.join(directory, "schema.json")
+        with open(path, "w") as schema_file:
+            json.dump(SCHEMA, schema_file)
+
+        validation.load_validator(
+            path, path_to_artifact=None, path_to_shards=None,
+        )
+        self.addCleanup(validation.clear_validator)
+        self.addCleanup(validation.set_validation_policy, validation._policy)
+        validation.reset_validation_stats()
+        self.addCleanup(validation.reset_validation_stats)
+
+
+class TestValidateMessage(LoadedValidatorMixin, unittest.TestCase):
+
+    def test_counts_validated_skipped_and_failed_messages(self):
+        validation.set_validation_policy(
+            ValidationPolicy(VALIDATE_SAMPLED, rate=2),
+        )
+        self.assertTrue(validation.validate_message({}, message(TURN_ON)))
+        self.assertFalse(validation.validate_message({}, message(TURN_ON)))
+        with self.assertRaises(ValidationError):
+            validation.validate_message({}, message(DISCOVER, payload=False))
+        self.assertEqual(
+            validation.get_validation_stats(), {
+                TURN_ON: {"validated": 1, "skipped": 1},
+                DISCOVER: {"validated": 1, "failed": 1},
+            },
+        )
+
+    def test_messages_without_a_header(self):
+        self.assertTrue(validation.validate_message({}, {}))
+        self.assertEqual(
+            validation.get_validation_stats(),
+            {(None, None): {"validated": 1}},
+        )
+
+
+class TestPreloadValidator(unittest.TestCase):
+    def setUp(self):
+        self.addCleanup(validation.set_validation_policy, validation._policy)
+
+    def test_loads_the_validator(self):
+        with mock.patch.object(validation, "load_validator") as load:
+            self.assertTrue(validation.preload_validator())
+        self.assertTrue(load.called)
+
+    def test_turns_validation_off_if_the_schema_cannot_be_loaded(self):
+        with mock.patch.object(
+            validation, "load_validator", side_effect=IOError("missing"),
+        ):
+            with self.assertLogs(validation.__name__, "ERROR"):
+                self.assertFalse(validation.preload_validator())
+        self.assertEqual(validation._policy.mode, VALIDATE_OFF)
+        self.assertFalse(validation.validate_message({}, message(TURN_ON)))
+
+
+class BlockingValidator(object):
+    def __init__(self):
+        self.release = threading.Event()
+
+    def validate(self, response):
+        self.release.wait()
+
+
+class TestValidationWorker(LoadedValidatorMixin, unittest.TestCase):
+    def setUp(self):
+        super(TestValidationWorker, self).setUp()
+        self.logger = logging.getLogger("test-validation-worker")
+        self.worker = validation.ValidationWorker(self.logger)
+
+    def test_validates_submitted_responses(self):
+        self.worker.submit({}, message(TURN_ON))
+        self.worker.submit({}, message(DISCOVER))
+        self.assertTrue(self.worker.drain(timeout=5))
+        self.assertEqual(
+            validation.get_validation_stats(), {
+                TURN_ON: {"validated": 1},
+                DISCOVER: {"validated": 1},
+            },
+        )
+
+    def test_logs_and_counts_invalid_responses(self):
+        with self.assertLogs(self.logger, "ERROR") as logs:
+            self.worker.submit({}, message(DISCOVER, payload=False))
+            self.assertTrue(self.worker.drain(timeout=5))
+        record, = logs.records
+        self.assertIn("Discover.Response", record.getMessage())
+        self.assertEqual(
+            validation.get_validation_stats(),
+            {DISCOVER: {"validated": 1, "failed": 1}},
+        )
+
+    def test_logs_other_errors_and_keeps_running(self):
+        with mock.patch.object(
+            validation, "get_validator", side_effect=[IOError("missing")],
+        ):
+            with self.assertLogs(self.logger, "ERROR") as logs:
+                self.worker.submit({}, message(TURN_ON))
+                self.assertTrue(self.worker.drain(timeout=5))
+        self.assertIsNotNone(logs.records[0].exc_info)
+
+        self.worker.submit({}, message(TURN_ON))
+        self.assertTrue(self.worker.drain(timeout=5))
+        self.assertEqual(
+            validation.get_validation_stats(),
+            {TURN_ON: {"validated": 2}},
+        )
+
+    def test_drain_times_out(self):
+        validator = BlockingValidator()
+        self.addCleanup(validator.release.set)
+        with mock.patch.object(validation, "_validator", validator):
+            self.worker.submit({}, message(TURN_ON))
+            self.assertFalse(self.worker.drain(timeout=0.01))
+            validator.release.set()
+            self.assertTrue(self.worker.drain(timeout=5))
+
+    def test_drain_without_submitted_responses(self):
+        self.assertTrue(self.worker.drain(timeout=0))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -24,16 +24,375 @@ of the JSON Schema Draft 4 to perform the actual validation against the validati
 """
 
 import json
+import logging
+import os
+import queue
+import shutil
+import threading
+from collections import Counter, defaultdict
+
+from jsonschema.compiler import compile_schema, load
+from jsonschema.exceptions import ValidationError
+from jsonschema.profiler import Profiler
+from jsonschema.shards import ShardedValidator, split
+from jsonschema.validators import validator_for
+
+# update below with path to your validation schema
+# this path works if you copy the latest validation schema into the same directory as this file
+# validation schema: https://github.com/alexa/alexa-smarthome/wiki/Validation-Schema
+PATH_TO_VALIDATION_SCHEMA = "alexa_smart_home_message_schema.json"
+
+# the pre-compiled validator written by running this module (python validation.py) next to the schema
+# before zipping the deployment package; without it (or the shards below), the validation schema is
+# checked and interpreted as is, since compiling it on every cold start costs more than it saves
+PATH_TO_VALIDATOR_ARTIFACT = "alexa_smart_home_message_schema.compiled"
+
+# the validation schema split into one shard per message family, also written by running this module;
+# with it, only the shards of the message types a container actually sends are loaded
+PATH_TO_SCHEMA_SHARDS = "alexa_smart_home_message_schema.shards"
+
+# validation modes: validate every response, a sample of each message type, or none at all
+VALIDATE_ALWAYS = "always"
+VALIDATE_SAMPLED = "sampled"
+VALIDATE_OFF = "off"
+
+# validation executions: before responding, or in a background ValidationWorker
+EXECUTE_SYNC = "sync"
+EXECUTE_ASYNC = "async"
+
+# The validator is built once per process and reused by every later call, so that warm Lambda
+# containers do not re-read, re-parse and re-check the validation schema for each response.
+_validator = None
+
+
+def load_validator(path_to_validation_schema=PATH_TO_VALIDATION_SCHEMA,
+                   path_to_artifact=PATH_TO_VALIDATOR_ARTIFACT,
+                   path_to_shards=PATH_TO_SCHEMA_SHARDS):
+    """Load the validation schema, check it and cache a validator for it.
+
+    Call this during Lambda initialization to pay the schema loading cost before the first
+    directive arrives. Calling it again replaces the cached validator. If shards of the same schema
+    exist, a validator loading them as message types show up is used. Otherwise, if a pre-compiled
+    artifact of the same schema exists, it is loaded. Without either, the schema is interpreted by a
+    plain validator, as compiling it here would slow down every cold start.
+    """
+    global _validator
+
+    with open(path_to_validation_schema) as json_file:
+        schema = json.load(json_file)
+    validator = _load_shards(path_to_shards, schema)
+    if validator is None:
+        validator = _load_artifact(path_to_artifact, schema)
+    if validator is None:
+        cls = validator_for(schema)
+        cls.check_schema(schema)
+        validator = cls(schema)
+    _validator = validator
+    return _validator
+
+
+def _load_shards(path_to_shards, schema):
+    if not path_to_shards or not os.path.isdir(path_to_shards):
+        return None
+    try:
+        validator = ShardedValidator(path_to_shards, compiled=True)
+    except (EnvironmentError, ValueError, KeyError):
+        return None
+    if not validator.was_split_from(schema):
+        # split from another version of the schema (file times are not trusted, since editing the
+        # schema in place or zipping the deployment package can leave them unchanged)
+        return None
+    return validator
+
+
+def _load_artifact(path_to_artifact, schema):
+    if not path_to_artifact or not os.path.exists(path_to_artifact):
+        return None
+    try:
+        with open(path_to_artifact, "rb") as artifact_file:
+            validator = load(artifact_file)
+    except Exception:
+        # e.g. an artifact built by another Python version; interpreting the schema still works
+        return None
+    if validator.schema != schema:
+        return None
+    return validator
+
+
+def build_validator_artifact(path_to_validation_schema=PATH_TO_VALIDATION_SCHEMA,
+                             path_to_artifact=PATH_TO_VALIDATOR_ARTIFACT):
+    """Check and compile the validation schema, and save the result for load_validator.
+
+    Run this with the same Python version as the Lambda runtime, as compiled code is specific to it.
+    """
+    with open(path_to_validation_schema) as json_file:
+        schema = json.load(json_file)
+    cls = validator_for(schema)
+    cls.check_schema(schema)
+    with open(path_to_artifact, "wb") as artifact_file:
+        compile_schema(schema, cls).dump(artifact_file)
+
+
+def build_schema_shards(path_to_validation_schema=PATH_TO_VALIDATION_SCHEMA,
+                        path_to_shards=PATH_TO_SCHEMA_SHARDS):
+    """Check and split the validation schema into compiled shards, and save them for load_validator.
+
+    Raises a ValueError if the schema has no oneOf of message families told apart by their names.
+    As for build_validator_artifact, run this with the same Python version as the Lambda runtime.
+    """
+    with open(path_to_validation_schema) as json_file:
+        schema = json.load(json_file)
+    if os.path.isdir(path_to_shards):
+        # start afresh, so that no shards of an older version of the schema are left behind
+        shutil.rmtree(path_to_shards)
+    split(schema, path_to_shards, cls=validator_for(schema), compiled=True)
+
+
+def get_validator():
+    """Return the cached validator, loading it on first use."""
+    validator = _validator
+    if validator is None:
+        validator = load_validator()
+    return validator
+
+
+def clear_validator():
+    """Drop the cached validator, e.g. after the validation schema file has been updated."""
+    global _validator
+    _validator = None
+
+
+class ValidationPolicy(object):
+    """Decide which responses get validated.
+
+    When sampling, one in every `rate` messages of each message type is validated, starting with
+    the first one. `rates` maps message types, either (namespace, name) or just a name, to their own
+    rate, and a rate of 0 skips those messages entirely.
+    """
+
+    def __init__(self, mode=VALIDATE_ALWAYS, rate=1, rates=None):
+        if mode not in (VALIDATE_ALWAYS, VALIDATE_SAMPLED, VALIDATE_OFF):
+            raise ValueError("Unknown validation mode: {0}".format(mode))
+        self.mode = mode
+        self.rate = rate
+        self.rates = dict(rates or {})
+        self._seen = Counter()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_environment(cls, environ=os.environ, logger=None):
+        """Build the policy from the VALIDATION_MODE, VALIDATION_SAMPLE_RATE and VALIDATION_RATES variables.
+
+        VALIDATION_RATES holds the rates of particular message types, as comma-separated name=rate
+        or namespace:name=rate entries, e.g. "Discover.Response=10,Alexa:ErrorResponse=1". Invalid
+        values are logged as warnings and replaced by the defaults, validating every response,
+        instead of failing the container's initialization.
+        """
+        logger = logger or logging.getLogger(__name__)
+
+        mode = environ.get("VALIDATION_MODE", VALIDATE_ALWAYS)
+        if mode not in (VALIDATE_ALWAYS, VALIDATE_SAMPLED, VALIDATE_OFF):
+            logger.warning("Unknown VALIDATION_MODE %r, using %r", mode, VALIDATE_ALWAYS)
+            mode = VALIDATE_ALWAYS
+
+        try:
+            rate = int(environ.get("VALIDATION_SAMPLE_RATE", 1))
+        except ValueError:
+            logger.warning("Invalid VALIDATION_SAMPLE_RATE %r, using 1", environ["VALIDATION_SAMPLE_RATE"])
+            rate = 1
+
+        rates = {}
+        for entry in environ.get("VALIDATION_RATES", "").split(","):
+            if not entry.strip():
+                continue
+            message_type, _, value = entry.partition("=")
+            namespace, _, name = message_type.strip().rpartition(":")
+            try:
+                rates[(namespace, name) if namespace else name] = int(value)
+            except ValueError:
+                logger.warning("Ignoring invalid VALIDATION_RATES entry %r", entry)
+        return cls(mode=mode, rate=rate, rates=rates)
+
+    def should_validate(self, message_type):
+        if self.mode == VALIDATE_ALWAYS:
+            return True
+        if self.mode == VALIDATE_OFF:
+            return False
+
+        rate = self.rates.get(message_type)
+        if rate is None:
+            rate = self.rates.get(message_type[1], self.rate)
+        if rate <= 0:
+            return False
+        with self._lock:
+            seen = self._seen[message_type]
+            self._seen[message_type] += 1
+        return seen % rate == 0
+
+
+_policy = ValidationPolicy.from_environment()
+
+# Counts of validated, skipped and failed messages per message type, for this process
+_stats = defaultdict(Counter)
+_stats_lock = threading.Lock()
+
+
+def set_validation_policy(policy):
+    """Replace the policy deciding which responses validate_message checks."""
+    global _policy
+    _policy = policy
+
+
+def preload_validator(logger=None):
+    """Load the validator while the Lambda initializes, turning validation off if that fails.
+
+    A missing or invalid validation schema then leaves v3 responses unvalidated, with the error
+    logged once, instead of failing the container's initialization and with it every directive
+    (v2 ones included). Returns whether the validator was loaded.
+    """
+    try:
+        load_validator()
+    except Exception:
+        logger = logger or logging.getLogger(__name__)
+        logger.exception("Failed to load the validation schema, turning validation off")
+        set_validation_policy(ValidationPolicy(VALIDATE_OFF))
+        return False
+    return True
+
+
+def execution_from_environment(environ=os.environ, logger=None):
+    """Return the (execution, drain timeout) from the VALIDATION_EXECUTION and VALIDATION_DRAIN_TIMEOUT variables.
+
+    The drain timeout is how many seconds a handler validating asynchronously waits for the
+    ValidationWorker before returning, by default 0 (not waiting). Invalid values are logged as
+    warnings and replaced by the defaults, instead of failing the container's initialization.
+    """
+    logger = logger or logging.getLogger(__name__)
+
+    execution = environ.get("VALIDATION_EXECUTION", EXECUTE_SYNC)
+    if execution not in (EXECUTE_SYNC, EXECUTE_ASYNC):
+        logger.warning("Unknown VALIDATION_EXECUTION %r, using %r", execution, EXECUTE_SYNC)
+        execution = EXECUTE_SYNC
+
+    try:
+        drain_timeout = float(environ.get("VALIDATION_DRAIN_TIMEOUT", 0))
+    except ValueError:
+        drain_timeout = None
+    if drain_timeout is None or not drain_timeout >= 0:
+        logger.warning("Invalid VALIDATION_DRAIN_TIMEOUT %r, using 0", environ["VALIDATION_DRAIN_TIMEOUT"])
+        drain_timeout = 0
+    return execution, drain_timeout
+
+
+def get_message_type(message):
+    """Return the (namespace, name) of a message's event header, or (None, None)."""
+    try:
+        header = message["event"]["header"]
+        return header["namespace"], header["name"]
+    except (KeyError, TypeError):
+        return None, None
+
+
+def get_validation_stats():
+    """Return the validated, skipped and failed counts per message type.
+
+    Failed messages are counted as validated as well.
+    """
+    with _stats_lock:
+        return dict((message_type, dict(counts)) for message_type, counts in _stats.items())
+
+
+def reset_validation_stats():
+    with _stats_lock:
+        _stats.clear()
+
+
+def _count(message_type, outcome):
+    with _stats_lock:
+        _stats[message_type][outcome] += 1
 
-from jsonschema import validate
 
 def validate_message(request, response):
+    """Validate a response under the current validation policy.
+
+    Returns whether the response was validated, and raises a ValidationError if it is invalid.
+    """
+    message_type = get_message_type(response)
+    if not _policy.should_validate(message_type):
+        _count(message_type, "skipped")
+        return False
+
+    _count(message_type, "validated")
+    try:
+        get_validator().validate(response)
+    except ValidationError:
+        _count(message_type, "failed")
+        raise
+    return True
+
+
+class ValidationWorker(object):
+    """Validate responses in a background thread, off the response's critical path.
 
-    # update below with path to your validation schema
-    # this path works if you copy the latest validation schema into the same directory as this file
-    # validation schema: https://github.com/alexa/alexa-smarthome/wiki/Validation-Schema
-    path_to_validation_schema = "alexa_smart_home_message_schema.json"
+    Failures are logged and counted in the validation stats instead of being raised. Lambda freezes
+    the container as soon as the handler returns, so a response submitted at the very end of one
+    invocation may only get validated once the container thaws for the next one; call drain() to
+    wait for the pending responses instead.
+    """
 
+    def __init__(self, logger=None):
+        self.logger = logger or logging.getLogger(__name__)
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def submit(self, request, response):
+        """Queue a response for validation and return at once."""
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="validation-worker")
+                self._thread.daemon = True
+                self._thread.start()
+        self._queue.put((request, response))
+
+    def drain(self, timeout=None):
+        """Wait for every submitted response to be validated, returning False on timeout."""
+        with self._queue.all_tasks_done:
+            return self._queue.all_tasks_done.wait_for(
+                lambda: not self._queue.unfinished_tasks, timeout)
+
+    def _run(self):
+        while True:
+            request, response = self._queue.get()
+            try:
+                validate_message(request, response)
+            except ValidationError as error:
+                self.logger.error("Invalid %s response: %s", get_message_type(response), error.message)
+            except Exception:
+                self.logger.exception("Failed to validate response")
+            finally:
+                self._queue.task_done()
+
+
+def profile_messages(messages, path_to_validation_schema=PATH_TO_VALIDATION_SCHEMA, limit=20):
+    """Validate messages with a profiled (uncompiled) validator, for finding slow parts of the schema.
+
+    Returns a report per (namespace, name) message type of the subschemas and keywords that took
+    the most time validating messages of that type. This is a development aid, not for use in Lambda.
+    """
     with open(path_to_validation_schema) as json_file:
         schema = json.load(json_file)
-    validate(response, schema)
+    cls = validator_for(schema)
+    cls.check_schema(schema)
+
+    profilers = defaultdict(Profiler)
+    for message in messages:
+        profiler = profilers[get_message_type(message)]
+        cls(schema, profiler=profiler).is_valid(message)
+    return dict((message_type, profiler.report(limit=limit))
+                for message_type, profiler in profilers.items())
+
+
+if __name__ == "__main__":
+    build_validator_artifact()
+    build_schema_shards()